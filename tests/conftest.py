@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 包内模块按模块名互相导入（与直接运行main.py时相同），测试时把包目录加入导入路径
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "我的世界超级无敌自动汉化")
+sys.path.insert(0, os.path.abspath(PACKAGE_DIR))
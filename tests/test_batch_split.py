@@ -0,0 +1,105 @@
+import re
+
+import pytest
+
+from minecraft_translator import MinecraftTranslator
+from retry_policy import RetryPolicy, TranslationAPIError, ERROR_SERVER
+
+PROMPT_LINE_PATTERN = re.compile(r'^\[(\d+)\] (.*)$')
+
+class StubAPI:
+    """
+    代替翻译API：按提示中的编号返回 "[n] 译:原文"，原文包含bad中的任一文本时返回服务器错误
+    """
+    def __init__(self, bad=(), kind=ERROR_SERVER):
+        self.bad = set(bad)
+        self.kind = kind
+        self.requests = []
+
+    def __call__(self, prompt, expected_count=None, on_line=None):
+        body = prompt.split("每行以[编号]开头：\n", 1)[1].split("\n\n", 1)[0]
+        texts = [PROMPT_LINE_PATTERN.match(line).group(2) for line in body.split("\n") if line]
+        self.requests.append(texts)
+        if self.bad.intersection(texts):
+            raise TranslationAPIError("服务器错误", kind=self.kind)
+        return "\n".join(f"[{i}] 译:{text}" for i, text in enumerate(texts, start=1)), "test-model"
+
+@pytest.fixture
+def translator():
+    translator = MinecraftTranslator(
+        "http://127.0.0.1:1/api/generate", None, "test-model",
+        retry_policy=RetryPolicy(attempts=3, sleep=lambda delay: None)
+    )
+    yield translator
+    translator.close()
+
+def test_single_bad_text_in_full_first_batch_leaves_one_key_untranslated(translator):
+    texts = {f"k{i}": f"text {i}" for i in range(50)}
+    translator._call_translation_api = StubAPI(bad={"text 3"})
+
+    result = translator.translate_texts(texts)
+
+    assert translator.job_stats["untranslated_keys"] == ["k3"]
+    assert result["k3"] == "text 3"
+    assert result["k4"] == "译:text 4"
+    assert all(result[key] == f"译:{text}" for key, text in texts.items() if key != "k3")
+
+def make_texts(count):
+    return {f"k{i}": f"text {i}" for i in range(count)}
+
+@pytest.mark.parametrize("kind, requests", [
+    # 客户端错误不重试也不拆分
+    ("client_error", 1),
+    # 限流按重试策略重试，但拆分无法缓解
+    ("rate_limited", 3),
+    ("connection", 3),
+    # 重试后拆分为两半各请求一次，两半都以相同错误失败时抛出原批次的错误
+    ("server_error", 5),
+    ("timeout", 5)
+])
+def test_retry_counts_per_error_kind(translator, kind, requests):
+    texts = make_texts(4)
+    api = translator._call_translation_api = StubAPI(bad=texts.values(), kind=kind)
+
+    with pytest.raises(TranslationAPIError) as excinfo:
+        translator._translate_batch_with_split(list(texts), texts)
+
+    assert excinfo.value.kind == kind
+    assert len(api.requests) == requests
+
+def test_split_halves_are_requested_once(translator):
+    texts = make_texts(4)
+    api = translator._call_translation_api = StubAPI(bad={"text 0"})
+
+    result = translator._translate_batch_with_split(list(texts), texts)
+
+    # 整批重试3次，之后每层两半各请求一次，失败的一半继续拆分
+    assert [len(request) for request in api.requests] == [4, 4, 4, 2, 2, 1, 1]
+    assert result == {"k0": "text 0", "k1": "译:text 1", "k2": "译:text 2", "k3": "译:text 3"}
+    assert translator._failed_texts == {"text 0"}
+
+def test_both_halves_failing_deeper_keeps_splitting(translator):
+    texts = make_texts(8)
+    translator._call_translation_api = StubAPI(bad={"text 0", "text 3"})
+
+    result = translator._translate_batch_with_split(list(texts), texts)
+
+    assert translator._failed_texts == {"text 0", "text 3"}
+    assert [key for key, text in result.items() if text == texts[key]] == ["k0", "k3"]
+
+def test_first_batch_failing_as_a_whole_aborts_the_job(translator):
+    texts = make_texts(4)
+    translator._call_translation_api = StubAPI(bad=texts.values())
+
+    with pytest.raises(Exception, match="调用翻译API时出错"):
+        translator.translate_texts(texts)
+
+def test_failed_later_batch_fills_untranslated_report(translator):
+    translator.max_batch_size = 2
+    texts = make_texts(4)
+    translator._call_translation_api = StubAPI(bad={"text 2", "text 3"})
+
+    result = translator.translate_texts(texts)
+
+    assert result == {"k0": "译:text 0", "k1": "译:text 1", "k2": "text 2", "k3": "text 3"}
+    assert sorted(translator.job_stats["untranslated_keys"]) == ["k2", "k3"]
@@ -0,0 +1,141 @@
+import os
+
+import pytest
+
+from checkpoint import CheckpointJournal, make_job_id
+from minecraft_translator import MinecraftTranslator
+from retry_policy import RetryPolicy
+
+def write_file(path, content):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return str(path)
+
+def test_job_id_is_stable_for_unchanged_file(tmp_path):
+    source = write_file(tmp_path / "mod.jar", "data")
+    assert make_job_id("mod", source, "m", "1") == make_job_id("mod", source, "m", "1")
+
+def test_job_id_changes_with_inputs(tmp_path):
+    source = write_file(tmp_path / "mod.jar", "data")
+    job_id = make_job_id("mod", source, "m", "1")
+    assert make_job_id("minecraft", source, "m", "1") != job_id
+    assert make_job_id("mod", source, "n", "1") != job_id
+    assert make_job_id("mod", source, "m", "2") != job_id
+    assert make_job_id("mod", write_file(tmp_path / "other.jar", "data"), "m", "1") != job_id
+
+def test_job_id_changes_when_source_changes(tmp_path):
+    source = write_file(tmp_path / "mod.jar", "data")
+    stat = os.stat(source)
+    job_id = make_job_id("mod", source, "m", "1")
+
+    # 修改时间变化
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+    assert make_job_id("mod", source, "m", "1") != job_id
+
+    # 大小变化（修改时间不变）
+    write_file(source, "new data")
+    os.utime(source, (stat.st_atime, stat.st_mtime))
+    assert make_job_id("mod", source, "m", "1") != job_id
+
+def test_job_id_for_directory_ignores_mtime(tmp_path):
+    job_id = make_job_id("minecraft", str(tmp_path), "m", "1")
+    write_file(tmp_path / "zh_cn.json", "{}")
+    assert make_job_id("minecraft", str(tmp_path), "m", "1") == job_id
+
+def test_journal_survives_reopen(tmp_path):
+    path = str(tmp_path / "checkpoints" / "job.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append({"Stone": "石头"})
+    journal.append({})
+    journal.append({"Dirt": "泥土", "Stone": "石块"})
+    journal.close()
+
+    assert CheckpointJournal(path).load() == {"Stone": "石块", "Dirt": "泥土"}
+
+def test_journal_ignores_truncated_last_line(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append({"Stone": "石头"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"translations": {"Dirt": "泥')
+
+    assert CheckpointJournal(path).load() == {"Stone": "石头"}
+
+def test_journal_remove(tmp_path):
+    path = str(tmp_path / "job.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append({"Stone": "石头"})
+    journal.remove()
+    assert not os.path.exists(path)
+    assert CheckpointJournal(path).load() == {}
+
+class CountingAPI:
+    """
+    代替翻译API，记录每次请求的原文数量
+    """
+    def __init__(self):
+        self.requested = []
+
+    def __call__(self, prompt, expected_count=None, on_line=None):
+        self.requested.append(expected_count)
+        return "\n".join(f"[{i}] 译文{i}" for i in range(1, expected_count + 1)), "test-model"
+
+@pytest.fixture
+def translator(tmp_path):
+    translator = MinecraftTranslator(
+        "http://127.0.0.1:1/api/generate", None, "test-model", max_batch_size=2,
+        retry_policy=RetryPolicy(sleep=lambda delay: None), checkpoint_dir=str(tmp_path / "checkpoints")
+    )
+    yield translator
+    translator.close()
+
+TEXTS = {f"k{i}": f"text {i}" for i in range(6)}
+
+def run(translator, source, fail=False):
+    api = translator._call_translation_api = CountingAPI()
+
+    def job():
+        translator.translate_texts(TEXTS)
+        if fail:
+            raise RuntimeError("写出文件时中断")
+        return source
+
+    translator.run_job("mod", source, job)
+    return api
+
+def checkpoint_files(tmp_path):
+    directory = tmp_path / "checkpoints"
+    return sorted(os.listdir(directory)) if directory.exists() else []
+
+def test_interrupted_job_is_resumed(translator, tmp_path):
+    source = write_file(tmp_path / "mod.jar", "data")
+    with pytest.raises(RuntimeError):
+        run(translator, source, fail=True)
+    assert len(checkpoint_files(tmp_path)) == 1
+
+    api = run(translator, source)
+
+    assert api.requested == []
+    assert translator.job_stats["resumed_strings"] == len(TEXTS)
+    # 任务成功完成后删除检查点
+    assert checkpoint_files(tmp_path) == []
+
+def test_changed_source_does_not_reuse_checkpoint(translator, tmp_path):
+    source = write_file(tmp_path / "mod.jar", "data")
+    with pytest.raises(RuntimeError):
+        run(translator, source, fail=True)
+
+    write_file(source, "updated data")
+    api = run(translator, source)
+
+    assert sum(api.requested) == len(TEXTS)
+    assert translator.job_stats["resumed_strings"] == 0
+    # 旧的检查点属于另一个任务ID，不会被删除
+    assert len(checkpoint_files(tmp_path)) == 1
+
+def test_completed_job_leaves_no_checkpoint(translator, tmp_path):
+    source = write_file(tmp_path / "mod.jar", "data")
+    api = run(translator, source)
+    assert sum(api.requested) == len(TEXTS)
+    assert checkpoint_files(tmp_path) == []
@@ -0,0 +1,190 @@
+import threading
+from collections import Counter
+
+import pytest
+
+from endpoint_pool import EndpointPool, Endpoint
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class FakeChecker:
+    """
+    代替健康检查请求，按顺序返回预设的结果
+    """
+    def __init__(self, *results):
+        self.results = list(results)
+        self.checked = []
+
+    def __call__(self, url, model, api_key=None):
+        self.checked.append(url)
+        return self.results.pop(0), "健康检查失败"
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+# 测试中创建的节点池，测试结束后停止健康检查线程
+pools = []
+
+@pytest.fixture(autouse=True)
+def close_pools():
+    yield
+    while pools:
+        pools.pop().close()
+
+def make_pool(clock, *endpoints, checker=None, **kwargs):
+    kwargs.setdefault("health_check_interval", 0)
+    pool = EndpointPool(list(endpoints), clock=clock, checker=checker or FakeChecker(), **kwargs)
+    pools.append(pool)
+    return pool
+
+def test_requests_go_to_least_outstanding_endpoint_by_weight(clock):
+    heavy = Endpoint("http://a", "m", weight=2, max_concurrent=10)
+    light = Endpoint("http://b", "m", weight=1, max_concurrent=10)
+    pool = make_pool(clock, heavy, light)
+
+    acquired = [pool.acquire() for _ in range(6)]
+
+    assert Counter(endpoint.url for endpoint in acquired) == {"http://a": 4, "http://b": 2}
+    assert heavy.outstanding == 4 and light.outstanding == 2
+
+def test_released_endpoint_is_preferred_again(clock):
+    a = Endpoint("http://a", "m", max_concurrent=4)
+    b = Endpoint("http://b", "m", max_concurrent=4)
+    pool = make_pool(clock, a, b)
+
+    first, second = pool.acquire(), pool.acquire()
+    assert {first.url, second.url} == {"http://a", "http://b"}
+    pool.release(first)
+    assert pool.acquire() is first
+
+def test_max_concurrent_blocks_until_release(clock):
+    endpoint = Endpoint("http://a", "m", max_concurrent=1)
+    pool = make_pool(clock, endpoint)
+    held = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive() and acquired == []
+    assert endpoint.outstanding == 1
+
+    pool.release(held)
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert acquired == [endpoint] and endpoint.outstanding == 1
+
+def test_saturated_endpoint_is_skipped(clock):
+    a = Endpoint("http://a", "m", weight=10, max_concurrent=1)
+    b = Endpoint("http://b", "m", weight=1, max_concurrent=5)
+    pool = make_pool(clock, a, b)
+
+    assert [pool.acquire().url for _ in range(3)] == ["http://a", "http://b", "http://b"]
+
+def test_endpoint_is_ejected_after_consecutive_failures(clock):
+    a = Endpoint("http://a", "m", max_concurrent=4)
+    b = Endpoint("http://b", "m", max_concurrent=4)
+    pool = make_pool(clock, a, b, eject_after=3, eject_seconds=30)
+
+    for _ in range(3):
+        a.outstanding += 1
+        pool.release(a, "server_error")
+
+    assert a.ejected and a.ejected_until == clock.now + 30
+    assert [pool.acquire().url for _ in range(3)] == ["http://b"] * 3
+
+def test_success_resets_failures_and_rate_limits_do_not_count(clock):
+    a = Endpoint("http://a", "m")
+    pool = make_pool(clock, a, eject_after=2)
+
+    for kind in ("timeout", None, "timeout", "rate_limited", "malformed"):
+        a.outstanding += 1
+        pool.release(a, kind)
+
+    assert not a.ejected
+    assert a.failures == 1 and a.errors == 4
+
+def test_all_ejected_uses_endpoint_that_expires_first(clock):
+    a = Endpoint("http://a", "m")
+    b = Endpoint("http://b", "m")
+    pool = make_pool(clock, a, b, health_check_interval=3600)
+    a.ejected_until = clock.now + 20
+    b.ejected_until = clock.now + 10
+
+    assert pool.acquire() is b
+
+def test_without_health_check_endpoint_returns_when_ejection_expires(clock):
+    a = Endpoint("http://a", "m", weight=10, max_concurrent=4)
+    b = Endpoint("http://b", "m", max_concurrent=4)
+    pool = make_pool(clock, a, b, eject_seconds=30)
+    a.ejected_until = clock.now + 30
+
+    assert pool.acquire() is b
+    clock.now += 30
+    assert pool.acquire() is a
+    assert not a.ejected
+
+def test_health_check_readmits_recovered_endpoint(clock):
+    a = Endpoint("http://a", "m", weight=10, max_concurrent=4)
+    b = Endpoint("http://b", "m", max_concurrent=4)
+    checker = FakeChecker(False, True)
+    pool = make_pool(clock, a, b, checker=checker, eject_seconds=30, health_check_interval=3600)
+    a.ejected_until = clock.now + 30
+    a.failures = 3
+
+    # 剔除未到期时不检查
+    pool.check_ejected()
+    assert checker.checked == [] and a.ejected
+
+    # 到期后检查失败，继续剔除
+    clock.now += 30
+    pool.check_ejected()
+    assert checker.checked == ["http://a"]
+    assert a.ejected_until == clock.now + 30
+    assert pool.acquire() is b
+
+    # 检查成功后重新接入
+    clock.now += 30
+    pool.check_ejected()
+    assert not a.ejected and a.failures == 0
+    assert pool.acquire() is a
+
+def test_health_check_wakes_waiting_request(clock):
+    a = Endpoint("http://a", "m", max_concurrent=1)
+    b = Endpoint("http://b", "m", max_concurrent=1)
+    pool = make_pool(clock, a, b, checker=FakeChecker(True), health_check_interval=3600)
+    a.ejected_until = clock.now + 30
+    assert pool.acquire() is b
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+
+    waiter.start()
+    waiter.join(0.2)
+    assert waiter.is_alive()
+
+    clock.now += 30
+    pool.check_ejected()
+    waiter.join(5)
+    assert acquired == [a]
+
+def test_models_are_deduplicated_in_order(clock):
+    pool = make_pool(clock, Endpoint("http://a", "m2"), Endpoint("http://b", "m1"), Endpoint("http://c", "m2"))
+    assert pool.models == ["m2", "m1"]
+    assert pool.max_concurrent == 3
+
+def test_from_config(clock):
+    assert EndpointPool.from_config({}) is None
+    pool = EndpointPool.from_config({
+        "model": "m", "max_concurrent_requests": 3,
+        "endpoints": [{"url": "http://a"}, {"url": "http://b", "model": "n", "max_concurrent": 1, "weight": 2}]
+    })
+    pools.append(pool)
+    assert [(e.url, e.model, e.max_concurrent, e.weight) for e in pool.endpoints] == [
+        ("http://a", "m", 3, 1.0), ("http://b", "n", 1, 2.0)
+    ]
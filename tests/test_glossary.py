@@ -0,0 +1,112 @@
+import os
+import subprocess
+import sys
+
+from glossary import TermMatcher, Glossary, build_glossary, MAX_TERMS_PER_BATCH
+
+def find_all(matcher, text):
+    return [(start, end, matcher.terms[index]) for start, end, index in matcher.find(text)]
+
+def test_matcher_finds_overlapping_and_nested_terms():
+    matcher = TermMatcher(["he", "she", "his", "hers"])
+    assert sorted(find_all(matcher, "ushers")) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+def test_matcher_reports_every_occurrence():
+    matcher = TermMatcher(["stone"])
+    assert find_all(matcher, "stone and stone") == [(0, 5, "stone"), (10, 15, "stone")]
+
+def test_matcher_is_case_insensitive():
+    matcher = TermMatcher(["Iron Ingot"])
+    assert find_all(matcher, "an IRON ingot") == [(3, 13, "Iron Ingot")]
+
+def test_matcher_follows_failure_links():
+    # "iron in" 匹配失败后应从 "in" 继续，找到 "ingot"
+    matcher = TermMatcher(["iron ingot", "ingot"])
+    assert find_all(matcher, "iron ingot") == [(0, 10, "iron ingot"), (5, 10, "ingot")]
+    assert find_all(matcher, "iron iningot") == [(7, 12, "ingot")]
+
+def test_matcher_without_match():
+    assert find_all(TermMatcher(["stone"]), "") == []
+    assert find_all(TermMatcher(["stone"]), "cobble") == []
+
+def make_glossary(terms):
+    return Glossary(dict(terms), dict(terms))
+
+def test_longest_term_wins_over_covered_terms():
+    glossary = make_glossary({"Iron": "铁", "Iron Ingot": "铁锭", "Ingot": "锭"})
+    assert glossary.find_terms(["Craft an Iron Ingot"]) == {"Iron Ingot": "铁锭"}
+    assert glossary.find_terms(["Iron and Ingot"]) == {"Iron": "铁", "Ingot": "锭"}
+
+def test_terms_must_match_whole_words():
+    glossary = make_glossary({"Stone": "石头"})
+    assert glossary.find_terms(["Stoneware", "Cobblestone", "MyStone"]) == {}
+    assert glossary.find_terms(["Stone-like"]) == {"Stone": "石头"}
+
+def test_single_word_terms_require_capital_letter():
+    glossary = make_glossary({"Stone": "石头", "Oak Planks": "橡木木板"})
+    assert glossary.find_terms(["a stone wall"]) == {}
+    assert glossary.find_terms(["A Stone wall"]) == {"Stone": "石头"}
+    # 多个单词的术语不区分大小写
+    assert glossary.find_terms(["some oak planks"]) == {"Oak Planks": "橡木木板"}
+
+def test_find_terms_is_capped_and_prefers_longer_terms():
+    terms = {f"Term{i:02d}": f"术语{i}" for i in range(30)}
+    terms["Very Long Term"] = "很长的术语"
+    glossary = make_glossary(terms)
+    texts = [" ".join(terms)]
+
+    found = glossary.find_terms(texts)
+
+    assert len(found) == MAX_TERMS_PER_BATCH
+    assert "Very Long Term" in found
+    assert len(glossary.find_terms(texts, limit=5)) == 5
+
+def test_find_terms_without_terms():
+    assert Glossary({"Stone": "石头"}).find_terms(["Stone"]) == {}
+
+def test_fingerprint_ignores_insertion_order_and_tracks_content():
+    a = Glossary({"Stone": "石头", "Dirt": "泥土"}, {"Stone": "石头"})
+    b = Glossary({"Dirt": "泥土", "Stone": "石头"}, {"Stone": "石头"})
+    c = Glossary({"Stone": "石头", "Dirt": "土"}, {"Stone": "石头"})
+    assert a.fingerprint() == b.fingerprint()
+    assert a.fingerprint() != c.fingerprint()
+    assert a.fingerprint() != Glossary(a.translations).fingerprint()
+
+def test_fingerprint_is_stable_across_runs():
+    code = (
+        "from glossary import Glossary;"
+        "print(Glossary({'Stone': '石头', 'Dirt': '泥土'}, {'Stone': '石头'}).fingerprint())"
+    )
+    package_dir = os.path.dirname(sys.modules["glossary"].__file__)
+    fingerprints = set()
+    for seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, PYTHONIOENCODING="utf-8")
+        output = subprocess.run([sys.executable, "-c", code], cwd=package_dir, env=env,
+                                capture_output=True, text=True, encoding="utf-8", check=True).stdout
+        fingerprints.add(output.strip())
+    assert fingerprints == {Glossary({"Dirt": "泥土", "Stone": "石头"}, {"Stone": "石头"}).fingerprint()}
+
+def test_build_glossary():
+    en = {
+        "block.minecraft.stone": "Stone",
+        "item.minecraft.iron_ingot": "Iron Ingot",
+        "block.minecraft.stone.desc": "Stone",
+        "gui.done": "Done",
+        "item.minecraft.ab": "Ab",
+        "item.minecraft.missing": "Missing",
+        "item.minecraft.untranslated": "Untranslated"
+    }
+    zh = {
+        "block.minecraft.stone": "石头",
+        "item.minecraft.iron_ingot": "铁锭",
+        "block.minecraft.stone.desc": "石头",
+        "gui.done": "完成",
+        "item.minecraft.ab": "甲乙",
+        "item.minecraft.untranslated": "Untranslated"
+    }
+    glossary = build_glossary(en, zh)
+    assert glossary.translations == {"Stone": "石头", "Iron Ingot": "铁锭", "Done": "完成", "Ab": "甲乙"}
+    # 只收录三段式的名称键，过短的名称不作为术语
+    assert glossary.terms == {"Stone": "石头", "Iron Ingot": "铁锭"}
+    assert glossary.lookup("Done") == "完成"
+    assert glossary.lookup("done") is None
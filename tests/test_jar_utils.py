@@ -0,0 +1,183 @@
+import zipfile
+
+import pytest
+
+import jar_utils
+from jar_utils import OutputCodec, rewrite_jar, write_directory_zip, COMPRESSION_DEFLATE
+
+LANG_ENTRY = "assets/demo/lang/en_us.json"
+ZH_ENTRY = "assets/demo/lang/zh_cn.json"
+
+def make_jar(path):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n", compress_type=zipfile.ZIP_STORED)
+        zf.writestr("fabric.mod.json", '{"id": "demo"}', compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr(LANG_ENTRY, '{"item.demo.apple": "Apple"}', compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr(ZH_ENTRY, '{"item.demo.apple": "旧译文"}', compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr("com/example/Demo.class", bytes(range(256)) * 64, compress_type=zipfile.ZIP_DEFLATED,
+                    compresslevel=9)
+    return str(path)
+
+def read_raw_entries(path):
+    """
+    读取每个条目的原始压缩数据 {条目名称: (压缩方式, 压缩数据)}
+    """
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as fp:
+        return {info.filename: (info.compress_type, jar_utils._read_raw_entry(fp, info)) for info in zf.infolist()}
+
+def test_rewrite_jar_copies_untouched_entries_raw(tmp_path):
+    src = make_jar(tmp_path / "demo.jar")
+    dst = str(tmp_path / "out.jar")
+    rewrite_jar(src, dst, {ZH_ENTRY: '{"item.demo.apple": "苹果"}'.encode("utf-8")})
+
+    with zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        names = zf.namelist()
+        assert zf.read(ZH_ENTRY).decode("utf-8") == '{"item.demo.apple": "苹果"}'
+    assert sorted(names) == sorted(set(names))
+
+    # 未修改的条目保留原来的压缩方式和压缩数据
+    src_raw = read_raw_entries(src)
+    dst_raw = read_raw_entries(dst)
+    for name, raw in src_raw.items():
+        if name != ZH_ENTRY:
+            assert dst_raw[name] == raw
+
+def test_rewrite_jar_without_replacements(tmp_path):
+    # 所有条目都原样复制、没有通过ZipFile的接口写入任何条目时，关闭时仍要写出中央目录
+    src = make_jar(tmp_path / "demo.jar")
+    dst = str(tmp_path / "out.jar")
+    rewrite_jar(src, dst, {})
+
+    with zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+    assert read_raw_entries(dst) == read_raw_entries(src)
+
+def test_rewrite_jar_adds_new_entries(tmp_path):
+    src = make_jar(tmp_path / "demo.jar")
+    dst = str(tmp_path / "out.jar")
+    rewrite_jar(src, dst, {"assets/demo/lang/zh_cn_extra.json": b"{}"})
+
+    with zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        assert zf.read("assets/demo/lang/zh_cn_extra.json") == b"{}"
+        assert zf.read(ZH_ENTRY).decode("utf-8") == '{"item.demo.apple": "旧译文"}'
+
+def test_raw_copy_mixed_with_regular_writes(tmp_path):
+    # 原样复制的条目之后再用ZipFile的接口写入条目，中央目录的位置必须正确
+    src = make_jar(tmp_path / "demo.jar")
+    dst = str(tmp_path / "out.jar")
+    with zipfile.ZipFile(src) as zin, open(src, "rb") as src_fp, zipfile.ZipFile(dst, "w") as zout:
+        for info in zin.infolist():
+            jar_utils.copy_entry_raw(src_fp, zout, info)
+            zout.writestr(f"copy/{info.filename}", zin.read(info))
+
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        for info in zin.infolist():
+            assert zf.read(info.filename) == zin.read(info)
+            assert zf.read(f"copy/{info.filename}") == zin.read(info)
+
+    # 输出文件可以继续以追加模式写入
+    with zipfile.ZipFile(dst, "a") as zf:
+        zf.writestr("appended.txt", "x")
+    with zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        assert zf.read("appended.txt") == b"x"
+
+def test_copy_entry_raw_into_appended_zip(tmp_path):
+    # 以追加模式打开的压缩包只原样复制条目时，关闭时也要更新中央目录
+    src = make_jar(tmp_path / "demo.jar")
+    dst = str(tmp_path / "out.zip")
+    with zipfile.ZipFile(dst, "w") as zf:
+        zf.writestr("readme.txt", "x")
+    with zipfile.ZipFile(src) as zin, open(src, "rb") as src_fp, zipfile.ZipFile(dst, "a") as zout:
+        jar_utils.copy_entry_raw(src_fp, zout, zin.getinfo(LANG_ENTRY))
+
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["readme.txt", LANG_ENTRY]
+        assert zf.read(LANG_ENTRY) == zin.read(LANG_ENTRY)
+
+def test_rewrite_jar_deflate_is_reproducible(tmp_path):
+    src = make_jar(tmp_path / "demo.jar")
+    codec = OutputCodec(COMPRESSION_DEFLATE, level=9, workers=2)
+    outputs = []
+    for name in ("a.jar", "b.jar"):
+        dst = str(tmp_path / name)
+        rewrite_jar(src, dst, {ZH_ENTRY: "{}".encode("utf-8")}, codec)
+        with open(dst, "rb") as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(tmp_path / "a.jar") as zf:
+        assert zf.testzip() is None
+        assert all(info.compress_type == zipfile.ZIP_DEFLATED for info in zf.infolist())
+        for info in zin.infolist():
+            if info.filename != ZH_ENTRY:
+                assert zf.read(info.filename) == zin.read(info)
+
+def test_rewrite_jar_removes_partial_output(tmp_path):
+    src = make_jar(tmp_path / "demo.jar")
+    dst = tmp_path / "out.jar"
+    with pytest.raises(TypeError):
+        rewrite_jar(src, str(dst), {ZH_ENTRY: None})
+    assert not dst.exists()
+
+def test_write_directory_zip_is_sorted_and_reproducible(tmp_path):
+    src_dir = tmp_path / "pack"
+    (src_dir / "assets" / "demo" / "lang").mkdir(parents=True)
+    (src_dir / "pack.mcmeta").write_text("{}", encoding="utf-8")
+    (src_dir / "assets" / "demo" / "lang" / "zh_cn.json").write_text('{"a": "甲"}', encoding="utf-8")
+
+    outputs = []
+    for name in ("a.zip", "b.zip"):
+        dst = str(tmp_path / name)
+        write_directory_zip(str(src_dir), dst, OutputCodec(workers=2))
+        with open(dst, "rb") as f:
+            outputs.append(f.read())
+    assert outputs[0] == outputs[1]
+
+    with zipfile.ZipFile(tmp_path / "a.zip") as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["assets/demo/lang/zh_cn.json", "pack.mcmeta"]
+        assert all(info.date_time == jar_utils.FIXED_DATE_TIME for info in zf.infolist())
+        assert zf.read("assets/demo/lang/zh_cn.json").decode("utf-8") == '{"a": "甲"}'
+
+def test_raw_write_is_supported_on_this_python():
+    # zipfile的内部实现变化时这里会失败，提醒检查_write_raw_entry（输出仍可通过公开接口正确写出）
+    assert jar_utils.RAW_WRITE_SUPPORTED
+
+def test_raw_write_support_check_detects_missing_state(monkeypatch):
+    monkeypatch.setattr(jar_utils, "RAW_WRITE_ATTRIBUTES", jar_utils.RAW_WRITE_ATTRIBUTES + ("_no_such_state",))
+    assert not jar_utils._check_raw_write_support()
+
+@pytest.mark.parametrize("codec", [OutputCodec(), OutputCodec(COMPRESSION_DEFLATE, level=9, workers=2)])
+def test_rewrite_jar_without_raw_write_support(tmp_path, monkeypatch, codec):
+    monkeypatch.setattr(jar_utils, "RAW_WRITE_SUPPORTED", False)
+    src = make_jar(tmp_path / "demo.jar")
+    dst = str(tmp_path / "out.jar")
+    rewrite_jar(src, dst, {ZH_ENTRY: '{"item.demo.apple": "苹果"}'.encode("utf-8")}, codec)
+
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        assert zf.read(ZH_ENTRY).decode("utf-8") == '{"item.demo.apple": "苹果"}'
+        for info in zin.infolist():
+            if info.filename != ZH_ENTRY:
+                assert zf.read(info.filename) == zin.read(info)
+                expected = zipfile.ZIP_DEFLATED if codec.compression == COMPRESSION_DEFLATE else info.compress_type
+                assert zf.getinfo(info.filename).compress_type == expected
+
+def test_write_directory_zip_without_raw_write_support(tmp_path, monkeypatch):
+    monkeypatch.setattr(jar_utils, "RAW_WRITE_SUPPORTED", False)
+    src_dir = tmp_path / "pack"
+    src_dir.mkdir()
+    (src_dir / "pack.mcmeta").write_text("{}", encoding="utf-8")
+    (src_dir / "zh_cn.json").write_text('{"a": "甲"}' * 100, encoding="utf-8")
+    dst = str(tmp_path / "pack.zip")
+    write_directory_zip(str(src_dir), dst, OutputCodec(workers=2))
+
+    with zipfile.ZipFile(dst) as zf:
+        assert zf.testzip() is None
+        assert zf.read("zh_cn.json").decode("utf-8") == '{"a": "甲"}' * 100
+        assert all(info.date_time == jar_utils.FIXED_DATE_TIME for info in zf.infolist())
@@ -0,0 +1,130 @@
+import itertools
+
+import pytest
+
+from key_filter import (
+    KeyFilter, parse_rule, split_rules, build_key_filter, MOD_OPTION_RULES, MINECRAFT_OPTION_RULES
+)
+
+SAMPLE_KEYS = [
+    "item.minecraft.stone", "block.minecraft.stone", "entity.minecraft.zombie", "advancements.story.root.title",
+    "commands.give.success", "gui.mymod.Command_block", "item.mymod.gear.desc", "item.mymod.gear.tooltip",
+    "mymod.gui.title", "death.attack.mymod.saw", "tooltip.3", "mymod.lore", "subtitles.entity.cow.ambient"
+]
+
+def make_filter(*rules, include=()):
+    return KeyFilter(rules, include)
+
+@pytest.mark.parametrize("rule, matches, misses", [
+    ("prefix:death.attack.", ["death.attack.saw"], ["mymod.death.attack.saw", "deathXattack.saw"]),
+    ("death.attack.", ["death.attack.saw"], ["mymod.death.attack.saw"]),
+    ("contains:.desc", ["item.gear.desc", "item.gear.desc.1"], ["item.gear_desc"]),
+    ("glob:*.lore", ["item.gear.lore"], ["item.gear.lore.1"]),
+    ("*.lore", ["item.gear.lore"], ["item.gear.lore.1"]),
+    ("item.?.name", ["item.a.name"], ["item.ab.name"]),
+    ("re:^tooltip\\.\\d+$", ["tooltip.3"], ["tooltip.x", "mymod.tooltip.3"]),
+    ("re:tooltip\\.\\d", ["mymod.tooltip.3"], ["mymod.tooltip.x"]),
+    ("contains-i:command", ["commands.give", "gui.Command_block"], ["gui.comand"]),
+    ("prefix-i:GUI.", ["gui.title", "GUI.title"], ["mymod.gui.title"])
+])
+def test_rule_types(rule, matches, misses):
+    key_filter = make_filter(rule)
+    assert not any(key_filter(key) for key in matches)
+    assert all(key_filter(key) for key in misses)
+
+def test_rules_are_case_sensitive_without_i():
+    assert make_filter("contains:command")("gui.Command_block")
+    assert not make_filter("contains:command")("gui.command_block")
+
+def test_unknown_type_is_treated_as_prefix():
+    # "death:" 不是规则类型，整条规则按前缀处理
+    assert not make_filter("death:attack")("death:attack.saw")
+    assert make_filter("death:attack")("death.attack.saw")
+
+@pytest.mark.parametrize("rule", ["", "prefix:", "re:(unclosed", "glob:"])
+def test_invalid_rules(rule):
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+def test_split_rules():
+    assert split_rules(" *.lore, death.attack.\nre:^a,b$ ,, ") == ["*.lore", "death.attack.", "re:^a", "b$"]
+    assert split_rules(None) == []
+
+def test_include_rules_restrict_keys():
+    key_filter = make_filter("contains:.desc", include=["prefix:item."])
+    assert key_filter("item.gear")
+    assert not key_filter("item.gear.desc")
+    assert not key_filter("block.gear")
+
+def baseline_mod_allows(key, options):
+    """
+    改为规则过滤之前MOD语言文件的过滤逻辑
+    """
+    if key.startswith("commands.") or "command" in key.lower():
+        return False
+    if not options.get("translate_desc", True) and ".desc" in key:
+        return False
+    if not options.get("translate_tooltip", True) and ".tooltip" in key:
+        return False
+    if not options.get("translate_gui", True) and ".gui" in key:
+        return False
+    return True
+
+def baseline_minecraft_allows(key, options):
+    """
+    改为规则过滤之前Minecraft原版语言文件的过滤逻辑
+    """
+    if key.startswith("commands.") or "command" in key.lower():
+        return False
+    if not options.get("translate_items", True) and "item." in key:
+        return False
+    if not options.get("translate_entities", True) and "entity." in key:
+        return False
+    if not options.get("translate_advancements", True) and "advancements." in key:
+        return False
+    if not options.get("translate_misc", True) and not any(x in key for x in ["item.", "entity.", "advancements."]):
+        return False
+    return True
+
+def option_combinations(names):
+    for values in itertools.product((True, False), repeat=len(names)):
+        yield dict(zip(names, values))
+
+@pytest.mark.parametrize("options", list(option_combinations(list(MOD_OPTION_RULES))))
+def test_mod_options_match_baseline(options):
+    key_filter = build_key_filter(options)
+    assert [key_filter(key) for key in SAMPLE_KEYS] == [baseline_mod_allows(key, options) for key in SAMPLE_KEYS]
+
+@pytest.mark.parametrize("options", list(option_combinations(list(MINECRAFT_OPTION_RULES) + ["translate_misc"])))
+def test_minecraft_options_match_baseline(options):
+    key_filter = build_key_filter(options, minecraft=True)
+    assert [key_filter(key) for key in SAMPLE_KEYS] == [baseline_minecraft_allows(key, options) for key in SAMPLE_KEYS]
+
+def test_missing_options_translate_everything_but_commands():
+    key_filter = build_key_filter(None)
+    assert [key for key in SAMPLE_KEYS if not key_filter(key)] == ["commands.give.success", "gui.mymod.Command_block"]
+
+def test_custom_rules_are_merged_with_options():
+    key_filter = build_key_filter({"translate_desc": False, "exclude_keys": ["*.lore"]})
+    assert not key_filter("item.gear.desc")
+    assert not key_filter("mymod.lore")
+    assert key_filter("item.gear")
+
+def test_include_keys_with_misc_enabled():
+    key_filter = build_key_filter({"include_keys": ["prefix:block."]}, minecraft=True)
+    assert key_filter("block.minecraft.stone")
+    assert not key_filter("item.minecraft.stone")
+
+def test_include_keys_only_narrow_when_misc_disabled():
+    options = {"translate_misc": False, "include_keys": ["prefix:block.", "prefix:item.minecraft."]}
+    key_filter = build_key_filter(options, minecraft=True)
+    # 关闭其他文本时，自定义包含规则不会加入物品、实体和进度以外的键
+    assert not key_filter("block.minecraft.stone")
+    assert key_filter("item.minecraft.stone")
+    # 也不会翻译选项范围内但不匹配自定义规则的键
+    assert not key_filter("entity.minecraft.zombie")
+
+def test_filters_with_same_rules_are_reused():
+    options = {"translate_gui": False, "exclude_keys": ["*.lore"]}
+    assert build_key_filter(options) is build_key_filter(dict(options))
+    assert build_key_filter(options) is not build_key_filter(options, minecraft=True)
@@ -0,0 +1,112 @@
+import os
+import threading
+
+import pytest
+
+from glossary import Glossary
+from output_cache import OutputCache, make_output_key
+
+LANG_FILES = [("assets/mymod/lang/zh_cn.json", b'{"item.gear": "Gear"}', None)]
+OPTIONS = {"translate_desc": True}
+
+def key(lang_files=LANG_FILES, model="m", prompt_version=1, options=OPTIONS, glossary=None):
+    return make_output_key(lang_files, model, prompt_version, options, glossary)
+
+def test_key_is_deterministic_and_ignores_file_order():
+    files = LANG_FILES + [("assets/other/lang/zh_cn.json", b"{}", b'{"a": "b"}')]
+    assert key(files) == key(list(reversed(files)))
+    assert key() == key(options={"translate_desc": True})
+
+@pytest.mark.parametrize("changed", [
+    {"lang_files": [("assets/mymod/lang/zh_cn.json", b'{"item.gear": "Cog"}', None)]},
+    {"lang_files": [("assets/mymod/lang/zh_cn.json", b'{"item.gear": "Gear"}', b'{"item.gear": "x"}')]},
+    {"lang_files": [("assets/other/lang/zh_cn.json", b'{"item.gear": "Gear"}', None)]},
+    {"model": "n"},
+    {"prompt_version": 2},
+    {"options": {"translate_desc": False}},
+    {"options": {"translate_desc": True, "exclude_keys": ["*.lore"]}},
+    {"glossary": Glossary({"Gear": "齿轮"})}
+])
+def test_key_changes_with_each_input(changed):
+    assert key(**changed) != key()
+
+def test_key_tracks_glossary_fingerprint():
+    assert key(glossary=Glossary({"Gear": "齿轮"})) == key(glossary=Glossary({"Gear": "齿轮"}))
+    assert key(glossary=Glossary({"Gear": "齿轮"})) != key(glossary=Glossary({"Gear": "齿轮组"}))
+
+def test_key_parts_are_length_prefixed():
+    a = [("a", b"bc", None)]
+    b = [("ab", b"c", None)]
+    assert key(a) != key(b)
+
+def test_put_and_get(tmp_path):
+    cache = OutputCache(str(tmp_path))
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, {"assets/mymod/lang/zh_cn.json": '{"item.gear": "齿轮"}'.encode('utf-8')})
+    assert cache.get("ab" * 32) == {"assets/mymod/lang/zh_cn.json": '{"item.gear": "齿轮"}'.encode('utf-8')}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = OutputCache(str(tmp_path))
+    path = cache._get_path("cd" * 32)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+    assert cache.get("cd" * 32) is None
+
+def put_with_mtime(cache, key, mtime):
+    cache.put(key, {"lang.json": key.encode('utf-8')})
+    os.utime(cache._get_path(key), (mtime, mtime))
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = OutputCache(str(tmp_path), max_entries=10)
+    keys = [f"{i:02d}" * 32 for i in range(10)]
+    for i, cache_key in enumerate(keys):
+        put_with_mtime(cache, cache_key, 1000 + i)
+
+    # 读取最早写入的条目会更新其最后使用时间
+    assert cache.get(keys[0]) is not None
+    put_with_mtime(cache, "aa" * 32, 5000)
+
+    remaining = {cache_key for cache_key in keys + ["aa" * 32] if os.path.exists(cache._get_path(cache_key))}
+    # 超出容量时一次淘汰到容量的90%
+    assert len(remaining) == 9
+    assert remaining == {keys[0], "aa" * 32} | set(keys[3:])
+
+def test_existing_entries_are_counted(tmp_path):
+    for i in range(3):
+        put_with_mtime(OutputCache(str(tmp_path)), f"{i:02d}" * 32, 1000 + i)
+    cache = OutputCache(str(tmp_path), max_entries=3)
+    put_with_mtime(cache, "aa" * 32, 5000)
+    assert not os.path.exists(cache._get_path("00" * 32))
+    assert os.path.exists(cache._get_path("aa" * 32))
+
+def test_overwriting_entry_does_not_grow_count(tmp_path):
+    cache = OutputCache(str(tmp_path), max_entries=2)
+    for mtime in (1000, 1001, 1002):
+        put_with_mtime(cache, "00" * 32, mtime)
+    put_with_mtime(cache, "11" * 32, 2000)
+    assert os.path.exists(cache._get_path("00" * 32))
+    assert cache._count == 2
+
+def test_unlimited_cache_is_not_evicted(tmp_path):
+    cache = OutputCache(str(tmp_path), max_entries=0)
+    for i in range(5):
+        put_with_mtime(cache, f"{i:02d}" * 32, 1000 + i)
+    assert all(os.path.exists(cache._get_path(f"{i:02d}" * 32)) for i in range(5))
+
+def test_counters_are_thread_safe(tmp_path):
+    cache = OutputCache(str(tmp_path))
+    cache.put("ab" * 32, {"lang.json": b"{}"})
+
+    def lookup():
+        for _ in range(200):
+            cache.get("ab" * 32)
+            cache.get("cd" * 32)
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (cache.hits, cache.misses) == (1600, 1600)
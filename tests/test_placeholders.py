@@ -0,0 +1,49 @@
+import pytest
+
+from placeholders import mask_placeholders, restore_placeholders
+
+@pytest.mark.parametrize("text, masked, tokens", [
+    ("%s has %d items", "<0> has <1> items", ["%s", "%d"]),
+    ("%1$s of %2$s", "<0> of <1>", ["%1$s", "%2$s"]),
+    ("%.2f%% done", "<0><1> done", ["%.2f", "%%"]),
+    ("Hello {0}, {name}", "Hello <0>, <1>", ["{0}", "{name}"]),
+    ("§6Gold§r text", "<0>Gold<1> text", ["§6", "§r"]),
+    ("Line one\nLine two", "Line one<0>Line two", ["\n"]),
+    ("Costs $1", "Costs <0>", ["$1"]),
+    ("Literal <3> marker", "Literal <0> marker", ["<3>"]),
+    ("No placeholders", "No placeholders", []),
+])
+def test_mask_placeholders(text, masked, tokens):
+    assert mask_placeholders(text) == (masked, tokens)
+
+@pytest.mark.parametrize("text", [
+    "%s has %d items",
+    "§6Gold§r: {0}\n%1$s",
+    "Literal <3> and %s",
+    "No placeholders",
+])
+def test_round_trip(text):
+    masked, tokens = mask_placeholders(text)
+    assert restore_placeholders(masked, tokens) == text
+
+def test_restore_allows_reordering():
+    _, tokens = mask_placeholders("%s has %d items")
+    assert restore_placeholders("<1> 个物品属于 <0>", tokens) == "%d 个物品属于 %s"
+
+def test_restore_accepts_fullwidth_brackets_and_spaces():
+    _, tokens = mask_placeholders("§6Gold %s")
+    assert restore_placeholders("＜0＞金 < 1 >", tokens) == "§6金 %s"
+
+@pytest.mark.parametrize("translation", [
+    "<0> 有物品",            # 缺少 <1>
+    "<0> 有 <1> 个 <1>",     # 重复
+    "<0> 有 <1> 个 <2>",     # 多出的标记
+    "有物品",                # 全部丢失
+])
+def test_restore_rejects_mismatched_markers(translation):
+    _, tokens = mask_placeholders("%s has %d items")
+    assert restore_placeholders(translation, tokens) is None
+
+def test_restore_without_tokens():
+    assert restore_placeholders("苹果", []) == "苹果"
+    assert restore_placeholders("苹果 <0>", []) is None
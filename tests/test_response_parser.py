@@ -0,0 +1,68 @@
+import pytest
+
+from minecraft_translator import MinecraftTranslator
+from retry_policy import RetryPolicy
+
+@pytest.fixture
+def parse():
+    translator = MinecraftTranslator("http://127.0.0.1:1/api/generate", None, "test-model")
+    yield translator._parse_translation_response
+    translator.close()
+
+def test_bracketed_numbers(parse):
+    assert parse("[1] 苹果\n[2] 香蕉", 2) == {0: "苹果", 1: "香蕉"}
+
+def test_fullwidth_brackets_and_separators(parse):
+    assert parse("【1】苹果\n[2]：香蕉\n[ 3 ] . 樱桃", 3) == {0: "苹果", 1: "香蕉", 2: "樱桃"}
+
+def test_bare_numbers(parse):
+    assert parse("1. 苹果\n2：香蕉\n3) 樱桃", 3) == {0: "苹果", 1: "香蕉", 2: "樱桃"}
+
+def test_bracketed_numbers_take_precedence_over_bare_numbers(parse):
+    assert parse("[1] 苹果\n2. 香蕉", 2) == {0: "苹果"}
+
+def test_explanation_lines_are_ignored(parse):
+    assert parse("以下是翻译结果：\n\n[1] 苹果\n[2] 香蕉\n希望对你有帮助", 2) == {0: "苹果", 1: "香蕉"}
+
+def test_json_object(parse):
+    assert parse('{"1": "苹果", "2": "香蕉"}', 2) == {0: "苹果", 1: "香蕉"}
+
+def test_json_in_code_block(parse):
+    assert parse('```json\n{"1": "苹果", "2": "香蕉"}\n```', 2) == {0: "苹果", 1: "香蕉"}
+
+def test_json_list(parse):
+    content = '[{"id": 1, "text": "苹果"}, {"id": 2, "translation": "香蕉"}]'
+    assert parse(content, 2) == {0: "苹果", 1: "香蕉"}
+
+def test_invalid_json_falls_back_to_lines(parse):
+    assert parse("[1] 苹果 {\n[2] 香蕉", 2) == {0: "苹果 {", 1: "香蕉"}
+
+def test_out_of_range_duplicate_and_empty_lines_are_ignored(parse):
+    content = "[0] 零\n[1] 苹果\n[1] 重复\n[2]\n[3] 越界"
+    assert parse(content, 2) == {0: "苹果"}
+
+def test_unnumbered_lines_are_not_matched_by_position(parse):
+    assert parse("苹果\n香蕉", 2) == {}
+    assert parse("苹果\n香蕉", 3) == {}
+
+def test_unnumbered_lines_among_numbered_lines_are_ignored(parse):
+    # 模型合并了两行时，后面的行不能按顺序错位对应
+    assert parse("[1] 苹果\n香蕉和樱桃\n[3] 葡萄", 3) == {0: "苹果", 2: "葡萄"}
+
+@pytest.mark.parametrize("content", ["", None, "   \n  "])
+def test_empty_output(parse, content):
+    assert parse(content, 2) == {}
+
+def test_unnumbered_output_is_requested_again():
+    translator = MinecraftTranslator(
+        "http://127.0.0.1:1/api/generate", None, "test-model",
+        retry_policy=RetryPolicy(attempts=3, sleep=lambda delay: None)
+    )
+    replies = ["苹果\n香蕉", "[1] 苹果\n[2] 香蕉"]
+    translator._call_translation_api = lambda prompt, expected_count=None, on_line=None: (replies.pop(0), "test-model")
+    try:
+        result = translator._translate_batch(["a", "b"], {"a": "apple", "b": "banana"})
+    finally:
+        translator.close()
+    assert result == {"a": "苹果", "b": "香蕉"}
+    assert replies == []
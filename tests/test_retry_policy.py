@@ -0,0 +1,93 @@
+import pytest
+
+from retry_policy import (
+    RetryPolicy, TranslationAPIError, RETRYABLE_ERRORS, get_error_kind,
+    ERROR_TIMEOUT, ERROR_CONNECTION, ERROR_SERVER, ERROR_RATE_LIMITED, ERROR_MALFORMED, ERROR_CLIENT
+)
+
+class FailingCall:
+    """
+    前failures次调用抛出指定类型的错误，之后返回"ok"
+    """
+    def __init__(self, failures, kind, retry_after=None):
+        self.failures = failures
+        self.kind = kind
+        self.retry_after = retry_after
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TranslationAPIError("失败", kind=self.kind, retry_after=self.retry_after)
+        return "ok"
+
+def make_policy(**kwargs):
+    sleeps = []
+    kwargs.setdefault("jitter", 0)
+    policy = RetryPolicy(sleep=sleeps.append, **kwargs)
+    return policy, sleeps
+
+def test_exponential_backoff_capped_at_max_delay():
+    policy, _ = make_policy(base_delay=1.0, max_delay=5.0)
+    assert [policy.get_delay(n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+def test_jitter_stays_within_range():
+    policy, _ = make_policy(base_delay=4.0, jitter=0.5)
+    delays = [policy.get_delay(1) for _ in range(200)]
+    assert all(2.0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+def test_jitter_is_clamped():
+    assert RetryPolicy(jitter=2).jitter == 1.0
+    assert RetryPolicy(jitter=-1).jitter == 0.0
+    assert RetryPolicy(attempts=0).attempts == 1
+
+def test_retry_after_raises_delay_but_not_above_max_delay():
+    policy, _ = make_policy(base_delay=1.0, max_delay=30.0)
+    assert policy.get_delay(1, TranslationAPIError("限流", ERROR_RATE_LIMITED, retry_after=7)) == 7.0
+    assert policy.get_delay(1, TranslationAPIError("限流", ERROR_RATE_LIMITED, retry_after=120)) == 30.0
+    # 退避时间已超过Retry-After时不缩短
+    assert policy.get_delay(3, TranslationAPIError("限流", ERROR_RATE_LIMITED, retry_after=1)) == 4.0
+
+def test_retry_after_is_honoured_by_call():
+    policy, sleeps = make_policy(attempts=3, base_delay=1.0)
+    func = FailingCall(1, ERROR_RATE_LIMITED, retry_after=9)
+    assert policy.call(func) == "ok"
+    assert sleeps == [9.0]
+
+@pytest.mark.parametrize("kind", RETRYABLE_ERRORS)
+def test_retryable_errors_use_all_attempts(kind):
+    policy, sleeps = make_policy(attempts=3)
+    func = FailingCall(10, kind)
+    with pytest.raises(TranslationAPIError):
+        policy.call(func)
+    assert func.calls == 3
+    assert sleeps == [1.0, 2.0]
+
+@pytest.mark.parametrize("error", [TranslationAPIError("请求无效", kind=ERROR_CLIENT), ValueError("未分类")])
+def test_client_and_unclassified_errors_are_not_retried(error):
+    policy, sleeps = make_policy(attempts=5)
+    calls = []
+
+    def func():
+        calls.append(1)
+        raise error
+
+    with pytest.raises(type(error)):
+        policy.call(func)
+    assert len(calls) == 1
+    assert sleeps == []
+
+def test_success_after_retry_reports_each_retry():
+    policy, sleeps = make_policy(attempts=4)
+    retries = []
+    func = FailingCall(2, ERROR_TIMEOUT)
+    assert policy.call(func, on_retry=lambda n, e, delay: retries.append((n, get_error_kind(e), delay))) == "ok"
+    assert retries == [(1, ERROR_TIMEOUT, 1.0), (2, ERROR_TIMEOUT, 2.0)]
+    assert sleeps == [1.0, 2.0]
+
+def test_error_kinds():
+    assert get_error_kind(TranslationAPIError("超时", kind=ERROR_TIMEOUT)) == ERROR_TIMEOUT
+    assert get_error_kind(ConnectionError()) == ERROR_CLIENT
+    assert ERROR_CONNECTION in RETRYABLE_ERRORS and ERROR_MALFORMED in RETRYABLE_ERRORS
+    assert ERROR_SERVER in RETRYABLE_ERRORS and ERROR_CLIENT not in RETRYABLE_ERRORS
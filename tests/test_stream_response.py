@@ -0,0 +1,100 @@
+import json
+
+import pytest
+import requests
+
+from checkpoint import CheckpointJournal
+from minecraft_translator import MinecraftTranslator
+from retry_policy import RetryPolicy, TranslationAPIError, ERROR_TIMEOUT
+
+class FakeStreamResponse:
+    """
+    代替流式响应：依次返回Ollama格式的数据块，设置了interrupt时在最后一块之后连接超时
+    """
+    status_code = 200
+    reason = "OK"
+    text = ""
+    headers = {}
+
+    def __init__(self, pieces, interrupt=False):
+        self.pieces = pieces
+        self.interrupt = interrupt
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self):
+        for piece in self.pieces:
+            yield json.dumps({"response": piece, "done": False}).encode("utf-8")
+        if self.interrupt:
+            raise requests.exceptions.ConnectionError("Read timed out.")
+        yield json.dumps({"response": "", "done": True, "eval_count": 12}).encode("utf-8")
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def post(self, *args, **kwargs):
+        return self.response
+
+@pytest.fixture
+def translator(tmp_path):
+    translator = MinecraftTranslator(
+        "http://127.0.0.1:1/api/generate", None, "test-model", stream_response=True,
+        retry_policy=RetryPolicy(attempts=1, sleep=lambda delay: None)
+    )
+    translator._journal = CheckpointJournal(str(tmp_path / "job.jsonl"))
+    yield translator
+    translator.close()
+
+def use_response(translator, response):
+    translator._get_session = lambda: FakeSession(response)
+
+def test_stream_lines_are_reported_as_they_complete(translator):
+    use_response(translator, FakeStreamResponse(["[1] 苹", "果\n[2] 香蕉\n", "[3] 樱桃"]))
+    lines = []
+    usage = {}
+
+    content = translator._send_translation_request("prompt", 3, usage, on_line=lambda n, text: lines.append((n, text)))
+
+    assert content == "[1] 苹果\n[2] 香蕉\n[3] 樱桃"
+    # 最后一行没有换行，请求结束后才能确定完整
+    assert lines == [(1, "苹果"), (2, "香蕉")]
+    assert usage.get("output_tokens") == 12
+
+def test_interrupted_stream_keeps_completed_lines_in_journal(translator, tmp_path):
+    texts = {"a": "apple", "b": "banana", "c": "cherry"}
+    use_response(translator, FakeStreamResponse(["[1] 苹果\n[2] 香", "蕉\n[3] 樱"], interrupt=True))
+
+    with pytest.raises(TranslationAPIError) as excinfo:
+        translator._translate_batch(list(texts), texts, retry=False)
+
+    assert excinfo.value.kind == ERROR_TIMEOUT
+    translator._journal.close()
+    assert CheckpointJournal(str(tmp_path / "job.jsonl")).load() == {"apple": "苹果", "banana": "香蕉"}
+
+def test_completed_stream_journals_each_text_once(translator, tmp_path):
+    texts = {"a": "apple", "b": "§aBanana", "c": "cherry"}
+    # 第2行的格式标记与原文不一致，不写入检查点，由补充请求重新翻译
+    responses = [
+        FakeStreamResponse(["[1] 苹果\n[2] 香蕉\n[3] 樱桃"]),
+        FakeStreamResponse(["[1] <0>香蕉\n"])
+    ]
+    translator._get_session = lambda: FakeSession(responses[0])
+    original_request = translator._request_translations
+
+    def request(*args, **kwargs):
+        use_response(translator, responses.pop(0))
+        return original_request(*args, **kwargs)
+
+    translator._request_translations = request
+    result = translator._translate_batch(list(texts), texts)
+
+    assert result == {"a": "苹果", "b": "§a香蕉", "c": "樱桃"}
+    translator._journal.close()
+    with open(tmp_path / "job.jsonl", encoding="utf-8") as f:
+        records = [json.loads(line)["translations"] for line in f]
+    assert sorted(text for record in records for text in record) == ["apple", "cherry", "§aBanana"]
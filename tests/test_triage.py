@@ -0,0 +1,61 @@
+import pytest
+
+from triage import classify, TRIAGE_CJK, TRIAGE_NON_LINGUISTIC, TRIAGE_ACRONYM, TRIAGE_TRANSLATABLE
+
+@pytest.mark.parametrize("text", [
+    "铁锭",
+    "Iron 锭",
+    # 扩展A区汉字、兼容汉字和扩展B区汉字
+    "\u3400 Block",
+    "\uf900 Block",
+    "\U00020000 Block",
+    # 假名和中日文标点
+    "Stone ブロック",
+    "「Stone」",
+    "Stone！",
+])
+def test_cjk(text):
+    assert classify(text) == TRIAGE_CJK
+
+@pytest.mark.parametrize("text", [
+    "",
+    "%s: %s",
+    "100%",
+    "https://example.com/wiki",
+    "www.example.com",
+    "minecraft:stone",
+    "item.minecraft.stone",
+    "textures/block/stone.png",
+    "iron_ingot",
+    "ironIngot",
+    "100 mB",
+    "20 RF/t",
+    "x64",
+    "§6%s",
+])
+def test_non_linguistic(text):
+    assert classify(text) == TRIAGE_NON_LINGUISTIC
+
+@pytest.mark.parametrize("text", [
+    "RF",
+    "JEI",
+    "EMC",
+])
+def test_acronym(text):
+    assert classify(text) == TRIAGE_ACRONYM
+
+@pytest.mark.parametrize("text", [
+    "Iron Ingot",
+    "Press %s to open",
+    "on/off/auto",
+    "input/output/both",
+    "and/or",
+    "OK",
+    "ON",
+    "MAX",
+    "Apple",
+    # 全角英文字母不是中日文
+    "\uff21pple",
+])
+def test_translatable(text):
+    assert classify(text) == TRIAGE_TRANSLATABLE
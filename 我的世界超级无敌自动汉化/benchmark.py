@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import zipfile
+import argparse
+import tempfile
+import tracemalloc
+
+from minecraft_translator import MinecraftTranslator
+from mock_llm_server import MockLLMServer
+
+# 生成合成语言文件使用的单词表
+WORDS = [
+    "iron", "gold", "copper", "stone", "ancient", "glowing", "crystal", "storage", "energy", "machine",
+    "block", "ingot", "dust", "gear", "plate", "wire", "furnace", "generator", "pipe", "tank",
+    "shows", "the", "current", "amount", "of", "stored", "power", "right", "click", "to", "open"
+]
+
+# 合成MOD和版本文件中的语言文件，以及汉化输出中对应的中文语言文件
+MOD_LANG_ENTRY = "assets/bench/lang/en_us.json"
+MOD_OUTPUT_ENTRY = "assets/bench/lang/zh_cn.json"
+MINECRAFT_LANG_ENTRY = "assets/minecraft/lang/en_us.json"
+MINECRAFT_OUTPUT_ENTRY = "assets/minecraft/lang/en_us_zh_cn.json"
+
+def make_lang_data(count, rng, prefix="item.bench", duplicate_rate=0.2):
+    """
+    生成合成语言数据，包含短名称、长描述、占位符和一定比例的重复文本
+    """
+    lang_data = {}
+    values = []
+    for i in range(count):
+        if values and rng.random() < duplicate_rate:
+            value = rng.choice(values)
+        elif i % 5 == 4:
+            # 长提示文本
+            value = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 30))).capitalize() + ": %s"
+        else:
+            value = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).title()
+        values.append(value)
+        lang_data[f"{prefix}.key_{i}"] = value
+    return lang_data
+
+def make_mod_jar(path, string_count, filler_mb, rng):
+    """
+    生成合成MOD：一个语言文件加若干随机内容的class文件
+    """
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("fabric.mod.json", json.dumps({"id": "bench"}))
+        zf.writestr(MOD_LANG_ENTRY, json.dumps(make_lang_data(string_count, rng), indent=2))
+        chunk = 256 * 1024
+        for i in range(int(filler_mb * 1024 * 1024 / chunk)):
+            zf.writestr(f"com/example/bench/Class{i}.class", os.urandom(chunk))
+    return path
+
+def make_version_dir(path, string_count, filler_mb, rng):
+    """
+    生成合成Minecraft版本文件夹（只有客户端jar，没有assets目录）
+    """
+    os.makedirs(path, exist_ok=True)
+    jar_path = os.path.join(path, f"{os.path.basename(path)}.jar")
+    with zipfile.ZipFile(jar_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(MINECRAFT_LANG_ENTRY,
+                    json.dumps(make_lang_data(string_count, rng, prefix="block.minecraft"), indent=2))
+        chunk = 256 * 1024
+        for i in range(int(filler_mb * 1024 * 1024 / chunk)):
+            zf.writestr(f"net/minecraft/Class{i}.class", os.urandom(chunk))
+    return path
+
+def quiet_progress(progress, message=None):
+    pass
+
+def check_output(output_path, source_path, source_entry, output_entry):
+    """
+    检查汉化输出：中文语言文件必须存在、包含原语言文件的所有键，并且有文本被翻译
+
+    Returns:
+        已翻译（与原文不同）的文本数量
+
+    Raises:
+        ValueError: 输出不符合要求
+    """
+    with zipfile.ZipFile(source_path) as zf:
+        source_data = json.loads(zf.read(source_entry).decode("utf-8"))
+    with zipfile.ZipFile(output_path) as zf:
+        if output_entry not in zf.namelist():
+            raise ValueError(f"输出中没有中文语言文件 {output_entry}")
+        output_data = json.loads(zf.read(output_entry).decode("utf-8"))
+
+    missing = [key for key in source_data if key not in output_data]
+    if missing:
+        raise ValueError(f"中文语言文件缺少 {len(missing)} 个键，如 {missing[0]}")
+    translated = sum(1 for key, value in source_data.items() if output_data[key] != value)
+    if not translated:
+        raise ValueError("中文语言文件中没有翻译后的文本")
+    return translated
+
+def run_case(name, func, translator, server, string_count, verify):
+    """
+    运行一个基准测试用例并收集指标（各阶段耗时和请求延迟来自翻译器的运行报告）
+
+    verify(输出路径)检查汉化输出并返回已翻译的文本数量，检查不通过时记为错误
+    """
+    server.reset_stats()
+    tracemalloc.start()
+    start = time.perf_counter()
+    error = None
+    output_path = None
+    try:
+        output_path = func(quiet_progress)
+    except Exception as e:
+        error = str(e)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    translated = 0
+    if error is None:
+        try:
+            translated = verify(output_path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            error = f"输出检查失败: {str(e)}"
+
+    if output_path and os.path.exists(output_path):
+        os.remove(output_path)
+
+    report = translator.report.to_dict()
+    return {
+        "case": name,
+        "strings": string_count,
+        "unique_strings": translator.job_stats.get("unique_strings", 0),
+        "translated_strings": translated,
+        "untranslated_keys": len(translator.job_stats.get("untranslated_keys", [])),
+        "seconds": round(elapsed, 4),
+        "strings_per_sec": round(string_count / elapsed, 2) if elapsed else 0.0,
+        "requests": server.stats["requests"],
+        "failures": server.stats["failures"],
+        "max_in_flight": server.stats["max_in_flight"],
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+        "stages": {stage: values["seconds"] for stage, values in report["stages"].items()},
+        "request_summary": report["request_summary"],
+        "error": error
+    }
+
+def print_results(results):
+    header = f"{'用例':<24}{'文本数':>8}{'耗时(s)':>10}{'文本/秒':>10}{'请求数':>8}{'失败':>6}{'峰值内存(MB)':>14}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['case']:<24}{r['strings']:>8}{r['seconds']:>10.3f}{r['strings_per_sec']:>10.1f}"
+              f"{r['requests']:>8}{r['failures']:>6}{r['peak_memory_mb']:>14.2f}")
+        if r["error"]:
+            print(f"    错误: {r['error']}")
+        else:
+            print(f"    已翻译: {r['translated_strings']} 个文本，未能翻译: {r['untranslated_keys']} 个键")
+        for stage, seconds in r["stages"].items():
+            print(f"    {stage}: {seconds:.3f}s")
+        summary = r["request_summary"]
+        if summary["count"]:
+            print(f"    请求延迟: 平均 {summary['latency_mean']:.3f}s, P50 {summary['latency_p50']:.3f}s, "
+                  f"P95 {summary['latency_p95']:.3f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minecraft 自动汉化工具基准测试（使用本地模拟翻译后端）")
+    parser.add_argument("--sizes", default="100,1000,5000", help="每个用例的文本数量，逗号分隔")
+    parser.add_argument("--filler-mb", type=float, default=4.0, help="合成JAR中非语言文件的大小（MB）")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟后端每个请求的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机波动范围（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="模拟后端的失败率（0~1）")
+    parser.add_argument("--format", default="ollama", choices=["ollama", "openai", "openwebui"], help="模拟后端的响应格式")
+    parser.add_argument("--workers", type=int, default=2, help="并发请求数")
+    parser.add_argument("--stream", action="store_true", help="以流式方式接收模型输出")
+    parser.add_argument("--per-text-latency", type=float, default=0.0, help="模拟后端每条原文增加的延迟（秒）")
+    parser.add_argument("--cases", default="mod,minecraft", help="要运行的用例：mod、minecraft")
+    parser.add_argument("--seed", type=int, default=1234, help="随机种子")
+    parser.add_argument("--output", help="将结果以JSON格式写入文件")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+
+    server = MockLLMServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        response_format=args.format,
+        per_text_latency=args.per_text_latency,
+        seed=args.seed
+    ).start()
+
+    work_dir = tempfile.mkdtemp(prefix="minecraft_translator_bench_")
+    results = []
+    try:
+        for size in sizes:
+            translator = MinecraftTranslator(
+                server.url, None, "qwen2.5:1.5b",
+                max_workers=args.workers,
+                stream_response=args.stream
+            )
+            try:
+                if "mod" in cases:
+                    jar_path = make_mod_jar(os.path.join(work_dir, f"bench_{size}.jar"), size, args.filler_mb, rng)
+                    results.append(run_case(
+                        f"translate_mod[{size}]",
+                        lambda callback: translator.translate_mod(jar_path, progress_callback=callback),
+                        translator, server, size,
+                        lambda output_path: check_output(output_path, jar_path, MOD_LANG_ENTRY, MOD_OUTPUT_ENTRY)
+                    ))
+                if "minecraft" in cases:
+                    version_dir = make_version_dir(os.path.join(work_dir, f"version_{size}"), size, args.filler_mb, rng)
+                    version_jar = os.path.join(version_dir, f"{os.path.basename(version_dir)}.jar")
+                    results.append(run_case(
+                        f"translate_minecraft[{size}]",
+                        lambda callback: translator.translate_minecraft(version_dir, progress_callback=callback),
+                        translator, server, size,
+                        lambda output_path: check_output(output_path, version_jar, MINECRAFT_LANG_ENTRY,
+                                                         MINECRAFT_OUTPUT_ENTRY)
+                    ))
+            finally:
+                translator.close()
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=4)
+
+    return 0 if not any(r["error"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import os
+import json
+import hashlib
+import threading
+
+def make_job_id(job_type, source, model, prompt_version):
+    """
+    根据任务输入生成任务ID：同一输入文件（路径、大小和修改时间不变）、
+    同一模型和提示词版本的任务共用一个检查点
+
+    输入为目录时只使用路径（目录的修改时间会因为写出汉化文件而变化）
+    """
+    source = os.path.abspath(source)
+    identity = ""
+    if os.path.isfile(source):
+        stat = os.stat(source)
+        identity = f"{stat.st_size}\0{int(stat.st_mtime)}"
+    raw = "\0".join([job_type or "", source, identity, model or "", prompt_version])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+class CheckpointJournal:
+    """
+    翻译任务的检查点日志（只追加的JSON行文件）
+
+    每完成一个批次追加一行 {"translations": {原文: 译文}} 并立即写入磁盘，
+    程序崩溃或后端中断后重新运行同一任务时，读取日志即可跳过已完成的批次。
+    最后一行可能因崩溃只写了一半，读取时忽略无法解析的行。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.translations = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """
+        读取已有的检查点
+
+        Returns:
+            {原文: 译文}
+        """
+        if not os.path.exists(self.path):
+            return self.translations
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get("translations"), dict):
+                    self.translations.update(record["translations"])
+        return self.translations
+
+    def append(self, translations):
+        """
+        记录一个批次的翻译结果
+        """
+        if not translations:
+            return
+        line = json.dumps({"translations": translations}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.translations.update(translations)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        """
+        任务成功完成后删除检查点
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
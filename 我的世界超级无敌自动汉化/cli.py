@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import contextlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from minecraft_translator import MinecraftTranslator
+from translation_cache import create_cache_from_config
+from glossary import load_glossary
+from run_report import format_report
+from modpack_scheduler import ModpackScheduler, format_untranslated_error
+from endpoint_pool import EndpointPool
+from key_filter import build_key_filter
+from config import Config
+
+# 退出状态码
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+# 汉化输出文件名中的后缀
+OUTPUT_SUFFIX = "_汉化版"
+
+class BatchRunner:
+    """
+    命令行批量汉化
+
+    默认使用全局批次调度（ModpackScheduler），所有MOD的文本跨文件打包成完整的批次；
+    per_mod为True时对每个MOD并行调用MinecraftTranslator.translate_mod。
+    """
+    def __init__(self, config, mod_type="auto", options=None, workers=2, json_output=False, glossary_path=None,
+                 per_mod=False, resourcepack_path=None):
+        self.config = config
+        self.mod_type = mod_type
+        self.options = options
+        self.workers = max(1, workers)
+        self.json_output = json_output
+        self.per_mod = per_mod
+        # 指定时所有MOD的中文语言文件写入这个资源包，不生成汉化JAR
+        self.resourcepack_path = resourcepack_path
+        self.cache = create_cache_from_config(config)
+        # 原版术语表只生成一次，所有工作线程共享
+        self.glossary = load_glossary(glossary_path or config.get("glossary_version_path", ""))
+        # 配置了多个翻译节点时，所有工作线程共享同一个节点池
+        self.endpoint_pool = EndpointPool.from_config(config)
+        self._print_lock = threading.Lock()
+        # 进度输出流（JSON模式下其他输出会被重定向到stderr）
+        self._out = sys.stdout
+        # 每个工作线程使用自己的翻译器，复用其中的连接池
+        self._local = threading.local()
+        self._translators = []
+
+    def _get_translator(self):
+        """
+        获取当前线程的翻译器（翻译器保存了任务状态，不能在线程间共享）
+        """
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            translator = MinecraftTranslator.from_config(self.config, cache=self.cache, glossary=self.glossary,
+                                                         endpoint_pool=self.endpoint_pool)
+            self._local.translator = translator
+            with self._print_lock:
+                self._translators.append(translator)
+        return translator
+
+    def emit(self, event, **fields):
+        """
+        输出一条进度事件（JSON模式下每行一个JSON对象）
+        """
+        with self._print_lock:
+            if self.json_output:
+                record = {"event": event, "time": round(time.time(), 3)}
+                record.update(fields)
+                print(json.dumps(record, ensure_ascii=False), file=self._out, flush=True)
+            else:
+                mod = fields.get("mod")
+                prefix = f"[{mod}] " if mod else ""
+                if event == "progress":
+                    print(f"{prefix}{fields.get('progress', 0):5.1f}% {fields.get('message') or ''}", flush=True)
+                elif event == "done":
+                    output = fields.get("output")
+                    print(f"{prefix}汉化完成: {output}" if output else f"{prefix}汉化完成", flush=True)
+                    if fields.get("report"):
+                        for line in format_report(fields["report"]):
+                            print(f"{prefix}{line}", flush=True)
+                elif event == "error":
+                    print(f"{prefix}汉化失败: {fields.get('error')}", flush=True)
+                elif event == "resourcepack":
+                    print(f"汉化资源包已生成（{fields['mods']} 个MOD）: {fields['output']}", flush=True)
+                elif event == "summary":
+                    print(f"完成 {fields['succeeded']}/{fields['total']} 个MOD，失败 {fields['failed']} 个，"
+                          f"耗时 {fields['elapsed']:.1f} 秒", flush=True)
+                elif event == "start":
+                    print(f"{prefix}开始汉化", flush=True)
+                elif event == "report":
+                    for line in format_report(fields["report"]):
+                        print(line, flush=True)
+
+    def translate_one(self, mod_path):
+        """
+        汉化单个MOD，返回结果字典
+        """
+        mod_name = os.path.basename(mod_path)
+        translator = self._get_translator()
+        self.emit("start", mod=mod_name, path=mod_path)
+
+        def progress_callback(progress, message=None):
+            if message:
+                self.emit("progress", mod=mod_name, progress=round(progress, 1), message=message)
+
+        try:
+            output_path = translator.translate_mod(
+                mod_path=mod_path,
+                mod_type=self.mod_type,
+                options=self.options,
+                progress_callback=progress_callback
+            )
+            stats = dict(translator.job_stats)
+            report = translator.report.to_dict()
+            # 逐个请求的记录只保存在报告文件中
+            report.pop("requests", None)
+            # 有键未能翻译（保留了原文）时记为失败，与全局批次调度的结果一致
+            untranslated = stats.get("untranslated_keys") or []
+            if untranslated:
+                error = format_untranslated_error(len(untranslated))
+                self.emit("error", mod=mod_name, error=error, output=output_path, stats=stats,
+                          report=report, report_path=translator.last_report_path)
+                return {"mod": mod_path, "ok": False, "output": output_path, "error": error}
+            self.emit("done", mod=mod_name, output=output_path, stats=stats,
+                      report=report, report_path=translator.last_report_path)
+            return {"mod": mod_path, "ok": True, "output": output_path}
+        except Exception as e:
+            self.emit("error", mod=mod_name, error=str(e), report_path=translator.last_report_path)
+            return {"mod": mod_path, "ok": False, "error": str(e)}
+
+    def translate_all(self, mod_paths):
+        """
+        使用全局批次调度汉化所有MOD，每个MOD的文本翻译完成后立即写出
+
+        Returns:
+            结果列表
+        """
+        translator = self._get_translator()
+        for mod_path in mod_paths:
+            self.emit("start", mod=os.path.basename(mod_path), path=mod_path)
+
+        def progress_callback(progress, message=None):
+            if message:
+                self.emit("progress", progress=round(progress, 1), message=message)
+
+        scheduler = ModpackScheduler(translator, options=self.options, on_event=self.emit, output_suffix=OUTPUT_SUFFIX,
+                                     resourcepack_path=self.resourcepack_path)
+        results = scheduler.run(mod_paths, progress_callback=progress_callback)
+
+        report = translator.report.to_dict()
+        report.pop("requests", None)
+        self.emit("report", report=report, report_path=translator.last_report_path, stats=dict(translator.job_stats))
+        return results
+
+    def run(self, mod_paths):
+        """
+        并行汉化所有MOD
+
+        Returns:
+            结果列表
+        """
+        start_time = time.time()
+        results = []
+
+        try:
+            if not self.resourcepack_path and (self.per_mod or len(mod_paths) < 2):
+                with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                    futures = [executor.submit(self.translate_one, mod_path) for mod_path in mod_paths]
+                    for future in as_completed(futures):
+                        results.append(future.result())
+            else:
+                results = self.translate_all(mod_paths)
+        finally:
+            for translator in self._translators:
+                translator.close()
+            if self.endpoint_pool is not None:
+                self.endpoint_pool.close()
+
+        failed = [result for result in results if not result["ok"]]
+        self.emit(
+            "summary",
+            total=len(results),
+            succeeded=len(results) - len(failed),
+            failed=len(failed),
+            failed_mods=[result["mod"] for result in failed],
+            elapsed=round(time.time() - start_time, 3)
+        )
+        return results
+
+def collect_mod_files(paths):
+    """
+    展开命令行参数中的目录和JAR文件，返回JAR文件列表（跳过之前生成的汉化版文件）
+    """
+    mod_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for file in sorted(os.listdir(path)):
+                if file.endswith(".jar") and OUTPUT_SUFFIX not in file:
+                    mod_files.append(os.path.join(path, file))
+        elif os.path.isfile(path) and path.endswith(".jar"):
+            mod_files.append(path)
+        else:
+            raise ValueError(f"无效的MOD路径: {path}")
+    return mod_files
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Minecraft 自动汉化工具（命令行批量模式）")
+    parser.add_argument("paths", nargs="+", help="MOD文件（.jar）或包含MOD文件的目录")
+    parser.add_argument("--mod-type", default="auto", choices=["auto", "fabric", "forge", "neoforge"],
+                        help="MOD类型，默认自动检测")
+    parser.add_argument("--workers", type=int, default=2, help="同时汉化的MOD数量（仅--per-mod模式）")
+    parser.add_argument("--per-mod", action="store_true",
+                        help="逐个MOD分别翻译，不跨MOD合并批次（默认将所有MOD的文本合并打包成批次）")
+    parser.add_argument("--resourcepack", nargs="?", const="", metavar="ZIP_PATH",
+                        help="不生成汉化JAR，把所有MOD的中文语言文件合并写入一个资源包（原JAR保持不变），"
+                             "未指定路径时写入第一个MOD所在的目录")
+    parser.add_argument("--no-desc", action="store_true", help="不翻译描述文本")
+    parser.add_argument("--no-tooltip", action="store_true", help="不翻译提示文本")
+    parser.add_argument("--no-gui", action="store_true", help="不翻译界面文本")
+    parser.add_argument("--no-incremental", action="store_true", help="忽略MOD自带的中文翻译，全部重新翻译")
+    parser.add_argument("--exclude-key", action="append", default=[], metavar="RULE",
+                        help="跳过匹配的键，可重复使用（如 '*.lore'、'death.attack.'、're:^tooltip\\.\\d+$'），与配置中的exclude_keys合并")
+    parser.add_argument("--include-key", action="append", default=[], metavar="RULE",
+                        help="只翻译匹配的键，可重复使用，与配置中的include_keys合并")
+    parser.add_argument("--json", action="store_true", help="以JSON行格式输出进度，便于程序解析")
+    parser.add_argument("--glossary", metavar="VERSION_DIR", help="用于生成原版术语表的Minecraft版本文件夹，默认使用配置中的设置")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        mod_files = collect_mod_files(args.paths)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_USAGE
+
+    if not mod_files:
+        print("未找到需要汉化的MOD文件", file=sys.stderr)
+        return EXIT_USAGE
+
+    config = Config()
+    options = {
+        "translate_desc": not args.no_desc,
+        "translate_tooltip": not args.no_tooltip,
+        "translate_gui": not args.no_gui,
+        "incremental": not args.no_incremental,
+        "exclude_keys": config.get("exclude_keys", []) + args.exclude_key,
+        "include_keys": config.get("include_keys", []) + args.include_key
+    }
+    try:
+        build_key_filter(options)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return EXIT_USAGE
+
+    resourcepack_path = args.resourcepack
+    if resourcepack_path == "":
+        output_dir = os.path.dirname(os.path.abspath(mod_files[0]))
+        resourcepack_path = os.path.join(output_dir, f"汉化资源包_整合包_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+    if args.per_mod and resourcepack_path:
+        print("--per-mod 不能与 --resourcepack 同时使用", file=sys.stderr)
+        return EXIT_USAGE
+
+    runner = BatchRunner(
+        config,
+        mod_type=args.mod_type,
+        options=options,
+        workers=args.workers,
+        json_output=args.json,
+        glossary_path=args.glossary,
+        per_mod=args.per_mod,
+        resourcepack_path=resourcepack_path
+    )
+    if args.json:
+        # 翻译器的调试输出转到stderr，保证stdout只有JSON行
+        with contextlib.redirect_stdout(sys.stderr):
+            results = runner.run(mod_files)
+    else:
+        results = runner.run(mod_files)
+
+    return EXIT_OK if all(result["ok"] for result in results) else EXIT_FAILED
+
+if __name__ == "__main__":
+    sys.exit(main())
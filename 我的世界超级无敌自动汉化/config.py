@@ -14,7 +14,37 @@ class Config:
             "api_port": "11434",
             "model": "qwen2.5:1.5b",
             "api_key": "",
-            "use_api_key": False
+            "use_api_key": False,
+            "max_concurrent_requests": 2,
+            "pool_size": 4,
+            "connect_timeout": 10,
+            "read_timeout": 60,
+            "verbose_log": False,
+            "retry_attempts": 3,
+            "retry_base_delay": 1.0,
+            "retry_max_delay": 30.0,
+            "stream_response": False,
+            "stream_idle_timeout": 30,
+            "streaming_jar": True,
+            "max_batch_size": 50,
+            "batch_token_budget": 0,
+            "model_context_limits": {},
+            "use_cache": True,
+            "cache_max_entries": 200000,
+            "glossary_version_path": "",
+            "save_run_report": True,
+            "use_checkpoint": True,
+            "endpoints": [],
+            "health_check_interval": 30,
+            "endpoint_eject_after": 3,
+            "endpoint_eject_seconds": 30,
+            "exclude_keys": [],
+            "include_keys": [],
+            "output_compression": "preserve",
+            "compression_level": 6,
+            "compression_workers": 4,
+            "use_output_cache": True,
+            "output_cache_max_entries": 2000
         }
         
         # 当前配置
@@ -69,6 +99,22 @@ class Config:
         self.current_config[key] = value
         return self.save_config(self.current_config)
     
+    def get_cache_path(self):
+        """获取翻译缓存数据库路径"""
+        return os.path.join(self.config_dir, "translation_cache.db")
+    
+    def get_report_dir(self):
+        """获取运行报告保存目录"""
+        return os.path.join(self.config_dir, "reports")
+    
+    def get_output_cache_dir(self):
+        """获取汉化输出缓存目录"""
+        return os.path.join(self.config_dir, "output_cache")
+    
+    def get_checkpoint_dir(self):
+        """获取检查点保存目录"""
+        return os.path.join(self.config_dir, "checkpoints")
+    
     def get_api_url(self):
         """获取完整的API URL"""
         base_url = self.current_config.get("api_url", "http://localhost:11434/api/generate")
@@ -0,0 +1,240 @@
+import time
+import threading
+import requests
+
+from retry_policy import ERROR_TIMEOUT, ERROR_CONNECTION, ERROR_SERVER, ERROR_CLIENT
+
+# 计入节点故障次数的错误类型（限流和模型输出格式错误不是节点本身的问题）
+ENDPOINT_FAILURE_ERRORS = (ERROR_TIMEOUT, ERROR_CONNECTION, ERROR_SERVER, ERROR_CLIENT)
+
+# 所有节点的并发数都已占满时，等待请求结束的最长间隔（秒），到期后重新检查节点状态
+ACQUIRE_WAIT_INTERVAL = 1.0
+
+def check_endpoint(api_url, model, api_key=None, timeout=10):
+    """
+    测试翻译API是否可用：向模型发送一个简短的提示
+
+    Returns:
+        (是否可用, 错误信息)
+    """
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    data = {
+        "model": model,
+        "prompt": "你好",
+        "stream": False
+    }
+    try:
+        response = requests.post(api_url, headers=headers, json=data, timeout=timeout)
+    except Exception as e:
+        return False, str(e)
+    if response.status_code == 200:
+        return True, ""
+    return False, f"API返回错误: {response.status_code} - {response.text[:200]}"
+
+class Endpoint:
+    """
+    翻译后端节点
+    """
+    def __init__(self, url, model, weight=1, api_key=None, max_concurrent=1):
+        self.url = url
+        self.model = model
+        self.weight = max(0.1, float(weight))
+        self.api_key = api_key
+        self.max_concurrent = max(1, int(max_concurrent))
+        # 正在进行的请求数
+        self.outstanding = 0
+        # 连续失败次数
+        self.failures = 0
+        # 被剔除时，重新接入的最早时间（EndpointPool的时钟，默认为time.monotonic）
+        self.ejected_until = None
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def ejected(self):
+        return self.ejected_until is not None
+
+class EndpointPool:
+    """
+    多个翻译后端节点的负载均衡
+
+    每个请求发往按权重折算后正在进行的请求最少的节点，每个节点同时进行的请求不超过其max_concurrent，
+    所有节点都已满载时等待其他请求结束；连续失败eject_after次的节点被剔除，
+    剔除期满后由后台健康检查（与设置页的测试连接相同的请求）确认恢复后重新接入。
+    """
+    def __init__(self, endpoints, eject_after=3, eject_seconds=30, health_check_interval=30, checker=check_endpoint,
+                 clock=time.monotonic):
+        if not endpoints:
+            raise ValueError("节点列表不能为空")
+        self.endpoints = list(endpoints)
+        self.eject_after = max(1, int(eject_after))
+        self.eject_seconds = eject_seconds
+        # 健康检查间隔（秒），为0时不做健康检查，剔除期满后直接重新接入
+        self.health_check_interval = health_check_interval
+        self._checker = checker
+        self._clock = clock
+        self._lock = threading.Lock()
+        # 有请求结束或节点恢复时通知等待的请求
+        self._available = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._health_thread = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        根据配置中的endpoints列表创建节点池，没有配置多个节点时返回None
+
+        每个节点的配置: {"url": ..., "model": ..., "weight": 1, "max_concurrent": 2, "api_key": ""}，
+        未填写的模型和并发数使用全局设置。
+        """
+        endpoint_configs = config.get("endpoints", [])
+        if not endpoint_configs:
+            return None
+        default_model = config.get("model", "qwen2.5:1.5b")
+        default_key = config.get("api_key", "") if config.get("use_api_key", False) else None
+        default_concurrent = config.get("max_concurrent_requests", 2)
+        endpoints = [
+            Endpoint(
+                url=item["url"],
+                model=item.get("model") or default_model,
+                weight=item.get("weight", 1),
+                api_key=item.get("api_key") or default_key,
+                max_concurrent=item.get("max_concurrent", default_concurrent)
+            )
+            for item in endpoint_configs
+        ]
+        return cls(
+            endpoints,
+            eject_after=config.get("endpoint_eject_after", 3),
+            eject_seconds=config.get("endpoint_eject_seconds", 30),
+            health_check_interval=config.get("health_check_interval", 30)
+        )
+
+    @property
+    def max_concurrent(self):
+        """
+        所有节点的并发请求数之和
+        """
+        return sum(endpoint.max_concurrent for endpoint in self.endpoints)
+
+    @property
+    def models(self):
+        """
+        各节点使用的模型（去重，保持配置中的顺序）
+        """
+        return list(dict.fromkeys(endpoint.model for endpoint in self.endpoints))
+
+    def acquire(self):
+        """
+        选择一个节点发送请求，请求结束后必须调用release
+
+        所有节点都被剔除时选择最早到期的节点，避免任务直接失败；
+        可用节点的并发数都已占满时阻塞，直到有请求结束。
+        """
+        self._start_health_check()
+        with self._lock:
+            while True:
+                now = self._clock()
+                if not self.health_check_interval:
+                    for endpoint in self.endpoints:
+                        if endpoint.ejected and now >= endpoint.ejected_until:
+                            endpoint.ejected_until = None
+                            endpoint.failures = 0
+
+                candidates = [endpoint for endpoint in self.endpoints if not endpoint.ejected]
+                if not candidates:
+                    candidates = [min(self.endpoints, key=lambda e: e.ejected_until)]
+                candidates = [endpoint for endpoint in candidates if endpoint.outstanding < endpoint.max_concurrent]
+                if candidates:
+                    break
+                self._available.wait(ACQUIRE_WAIT_INTERVAL)
+
+            endpoint = min(candidates, key=lambda e: ((e.outstanding + 1) / e.weight, e.failures))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def release(self, endpoint, error_kind=None):
+        """
+        请求结束，更新节点状态
+
+        Args:
+            endpoint: acquire返回的节点
+            error_kind: 请求失败时的错误类型，成功时为None
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            self._available.notify_all()
+            if error_kind is None:
+                endpoint.failures = 0
+                return
+            endpoint.errors += 1
+            if error_kind not in ENDPOINT_FAILURE_ERRORS:
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.eject_after and not endpoint.ejected:
+                endpoint.ejected_until = self._clock() + self.eject_seconds
+                print(f"翻译节点 {endpoint.url} 连续失败 {endpoint.failures} 次，暂时停用 {self.eject_seconds} 秒")
+
+    def get_status(self):
+        """
+        获取各节点的状态
+        """
+        with self._lock:
+            return [
+                {
+                    "url": endpoint.url,
+                    "model": endpoint.model,
+                    "weight": endpoint.weight,
+                    "outstanding": endpoint.outstanding,
+                    "requests": endpoint.requests,
+                    "errors": endpoint.errors,
+                    "ejected": endpoint.ejected
+                }
+                for endpoint in self.endpoints
+            ]
+
+    def check_ejected(self):
+        """
+        对剔除期满的节点做健康检查，恢复正常的重新接入，仍然失败的继续剔除
+        """
+        now = self._clock()
+        with self._lock:
+            due = [e for e in self.endpoints if e.ejected and now >= e.ejected_until]
+        for endpoint in due:
+            ok, message = self._checker(endpoint.url, endpoint.model, endpoint.api_key)
+            with self._lock:
+                if ok:
+                    endpoint.ejected_until = None
+                    endpoint.failures = 0
+                    self._available.notify_all()
+                else:
+                    endpoint.ejected_until = self._clock() + self.eject_seconds
+            if ok:
+                print(f"翻译节点 {endpoint.url} 已恢复")
+            else:
+                print(f"翻译节点 {endpoint.url} 健康检查失败: {message}")
+
+    def _start_health_check(self):
+        if not self.health_check_interval or self._health_thread is not None:
+            return
+        with self._lock:
+            if self._health_thread is not None:
+                return
+            self._health_thread = threading.Thread(target=self._health_check_loop, daemon=True)
+            self._health_thread.start()
+
+    def _health_check_loop(self):
+        while not self._stop.wait(self.health_check_interval):
+            try:
+                self.check_ejected()
+            except Exception as e:
+                print(f"节点健康检查出错: {str(e)}")
+
+    def close(self):
+        """
+        停止后台健康检查
+        """
+        self._stop.set()
@@ -0,0 +1,252 @@
+import os
+import re
+import json
+import hashlib
+import zipfile
+from collections import Counter, deque
+
+# 作为术语收录的语言键前缀（只收录 "block.minecraft.stone" 这样的三段式键）
+TERM_KEY_PREFIXES = ("block.", "item.", "entity.", "effect.", "enchantment.", "biome.")
+
+# 术语只包含英文单词、空格、连字符和撇号，最多4个单词
+TERM_PATTERN = re.compile(r"^[A-Za-z][A-Za-z' -]*[A-Za-z]$")
+MAX_TERM_WORDS = 4
+MIN_TERM_LENGTH = 3
+
+# 每批提示中最多加入的术语数量
+MAX_TERMS_PER_BATCH = 20
+
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+class TermMatcher:
+    """
+    Aho-Corasick多模式匹配，一次扫描找出文本中出现的所有术语（不区分大小写）
+    """
+    def __init__(self, terms):
+        self.terms = list(terms)
+        # 状态转移表、失败指针和每个状态匹配到的术语序号
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, term in enumerate(self.terms):
+            node = 0
+            for char in term.lower():
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(index)
+
+        # 按层次遍历构建失败指针
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text):
+        """
+        查找文本中出现的术语
+
+        Returns:
+            生成 (起始位置, 结束位置, 术语序号)
+        """
+        lowered = text.lower()
+        # 个别字符转小写后长度会变化，此时退回区分大小写的匹配以保证位置正确
+        if len(lowered) != len(text):
+            lowered = text
+
+        node = 0
+        for pos, char in enumerate(lowered):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._output[node]:
+                yield pos + 1 - len(self.terms[index]), pos + 1, index
+
+class Glossary:
+    """
+    原版术语表，由Minecraft原版的en_us.json和zh_cn.json按键配对生成
+    """
+    def __init__(self, translations, terms=None):
+        # 原版文本的官方译文 {英文: 中文}，与原版文本完全相同的原文直接使用
+        self.translations = translations
+        # 物品、方块、生物等名称 {英文: 中文}，出现在原文中时加入提示
+        self.terms = terms or {}
+        self._matcher = TermMatcher(self.terms) if self.terms else None
+        self._fingerprint = None
+
+    def __len__(self):
+        return len(self.translations)
+
+    def fingerprint(self):
+        """
+        术语表内容的摘要（用于输出缓存的键）
+        """
+        if self._fingerprint is None:
+            raw = json.dumps([self.translations, self.terms], sort_keys=True, ensure_ascii=False)
+            self._fingerprint = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    def lookup(self, text):
+        """
+        查找与原版文本完全相同的原文的官方译文，没有时返回None
+        """
+        return self.translations.get(text)
+
+    def find_terms(self, texts, limit=MAX_TERMS_PER_BATCH):
+        """
+        查找一批原文中出现的术语
+
+        单个单词的术语只匹配首字母大写的写法（避免把普通单词当作物品名），
+        被更长术语覆盖的匹配会被忽略。
+
+        Returns:
+            {英文术语: 官方译名}，最多limit个，优先保留较长的术语
+        """
+        if self._matcher is None:
+            return {}
+
+        found = set()
+        for text in texts:
+            spans = []
+            for start, end, index in self._matcher.find(text):
+                term = self._matcher.terms[index]
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if end < len(text) and text[end].isalnum():
+                    continue
+                if " " not in term and not text[start].isupper():
+                    continue
+                spans.append((start, end, term))
+
+            kept = []
+            for start, end, term in sorted(spans, key=lambda span: span[0] - span[1]):
+                if any(kept_start <= start and end <= kept_end for kept_start, kept_end in kept):
+                    continue
+                kept.append((start, end))
+                found.add(term)
+
+        selected = sorted(found, key=lambda term: (-len(term), term))[:limit]
+        return {term: self.terms[term] for term in sorted(selected)}
+
+def build_glossary(en_data, zh_data):
+    """
+    根据原版英文和中文语言数据生成术语表
+
+    Args:
+        en_data: en_us.json的内容 {键: 英文}
+        zh_data: zh_cn.json的内容 {键: 中文}
+    """
+    # 同一英文可能对应多个键，取出现次数最多的译文
+    pairs = {}
+    for key, en_text in en_data.items():
+        zh_text = zh_data.get(key)
+        if not isinstance(en_text, str) or not isinstance(zh_text, str):
+            continue
+        if not en_text.strip() or not CJK_PATTERN.search(zh_text):
+            continue
+        pairs.setdefault(en_text, Counter())[zh_text] += 1
+    translations = {en_text: counter.most_common(1)[0][0] for en_text, counter in pairs.items()}
+
+    terms = {}
+    for key, en_text in en_data.items():
+        if not key.startswith(TERM_KEY_PREFIXES) or key.count(".") != 2:
+            continue
+        if en_text not in translations or len(en_text) < MIN_TERM_LENGTH:
+            continue
+        if len(en_text.split()) > MAX_TERM_WORDS or not TERM_PATTERN.match(en_text):
+            continue
+        terms[en_text] = translations[en_text]
+
+    return Glossary(translations, terms)
+
+def _read_json_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _find_asset_object(mc_path, name):
+    """
+    通过资源索引查找.minecraft/assets/objects中的资源文件（zh_cn.json不在客户端jar中）
+
+    Args:
+        mc_path: 版本文件夹（.minecraft/versions/<版本>）
+        name: 资源名称，如 minecraft/lang/zh_cn.json
+    """
+    mc_path = os.path.abspath(mc_path)
+    assets_root = os.path.join(os.path.dirname(os.path.dirname(mc_path)), "assets")
+
+    version_json = os.path.join(mc_path, f"{os.path.basename(mc_path)}.json")
+    if not os.path.exists(version_json):
+        return None
+    index_id = _read_json_file(version_json).get("assetIndex", {}).get("id")
+    if not index_id:
+        return None
+
+    index_file = os.path.join(assets_root, "indexes", f"{index_id}.json")
+    if not os.path.exists(index_file):
+        return None
+    entry = _read_json_file(index_file).get("objects", {}).get(name)
+    if not entry:
+        return None
+
+    object_file = os.path.join(assets_root, "objects", entry["hash"][:2], entry["hash"])
+    return object_file if os.path.exists(object_file) else None
+
+def find_vanilla_lang_pair(mc_path):
+    """
+    查找Minecraft版本的原版英文和中文语言文件
+
+    英文从版本文件夹的assets目录或客户端jar中读取，
+    中文从assets目录或.minecraft的资源索引中查找。
+
+    Returns:
+        (en_us数据, zh_cn数据)，找不到时返回None
+    """
+    lang_dir = os.path.join(mc_path, "assets", "minecraft", "lang")
+    en_file = os.path.join(lang_dir, "en_us.json")
+    zh_file = os.path.join(lang_dir, "zh_cn.json")
+
+    en_data = None
+    if os.path.exists(en_file):
+        en_data = _read_json_file(en_file)
+    else:
+        jar_files = [f for f in os.listdir(mc_path) if f.endswith(".jar")]
+        if jar_files:
+            with zipfile.ZipFile(os.path.join(mc_path, jar_files[0]), 'r') as jar_ref:
+                if "assets/minecraft/lang/en_us.json" in jar_ref.NameToInfo:
+                    en_data = json.loads(jar_ref.read("assets/minecraft/lang/en_us.json").decode('utf-8'))
+    if en_data is None:
+        return None
+
+    if not os.path.exists(zh_file):
+        zh_file = _find_asset_object(mc_path, "minecraft/lang/zh_cn.json")
+    if zh_file is None:
+        return None
+
+    return en_data, _read_json_file(zh_file)
+
+def load_glossary(mc_path):
+    """
+    从Minecraft版本文件夹生成术语表，找不到原版中文语言文件时返回None
+    """
+    if not mc_path or not os.path.isdir(mc_path):
+        return None
+    try:
+        pair = find_vanilla_lang_pair(mc_path)
+    except Exception as e:
+        print(f"读取原版语言文件时出错: {str(e)}")
+        return None
+    if pair is None:
+        return None
+    return build_glossary(*pair)
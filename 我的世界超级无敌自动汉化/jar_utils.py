@@ -0,0 +1,352 @@
+import io
+import os
+import copy
+import zlib
+import struct
+import zipfile
+import posixpath
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 本地文件头的固定长度及签名
+LOCAL_HEADER_SIZE = 30
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+# ZipInfo.flag_bits中的标志位
+FLAG_ENCRYPTED = 0x01
+FLAG_DATA_DESCRIPTOR = 0x08
+# 压缩选项标志位（DEFLATE的压缩级别提示）
+FLAG_COMPRESSION_OPTIONS = 0x06
+
+# 输出压缩方式：保留每个条目原来的压缩方式，或全部以指定级别DEFLATE压缩
+COMPRESSION_PRESERVE = "preserve"
+COMPRESSION_DEFLATE = "deflate"
+COMPRESSION_MODES = (COMPRESSION_PRESERVE, COMPRESSION_DEFLATE)
+
+# 新写入条目的修改时间固定，相同输入生成的输出文件完全相同
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# 新写入文件条目的权限（-rw-r--r--）
+FILE_EXTERNAL_ATTR = 0o100644 << 16
+
+# 原样写入压缩数据时需要直接修改的ZipFile内部状态（不同Python版本的zipfile实现可能不同）
+RAW_WRITE_ATTRIBUTES = ("fp", "filelist", "NameToInfo", "start_dir", "_didModify")
+
+def _check_raw_write_support():
+    """
+    检查当前Python的zipfile是否有原样写入压缩数据所需的内部状态，没有时改用ZipFile的公开接口写入
+    """
+    with zipfile.ZipFile(io.BytesIO(), "w") as zf:
+        return all(hasattr(zf, name) for name in RAW_WRITE_ATTRIBUTES) and hasattr(zipfile.ZipInfo, "FileHeader")
+
+RAW_WRITE_SUPPORTED = _check_raw_write_support()
+
+class OutputCodec:
+    """
+    输出JAR和资源包的压缩设置
+    """
+    def __init__(self, compression=COMPRESSION_PRESERVE, level=6, workers=1):
+        if compression not in COMPRESSION_MODES:
+            raise ValueError(f"不支持的压缩方式: {compression}")
+        self.compression = compression
+        # DEFLATE压缩级别（1~9）
+        self.level = min(9, max(1, int(level)))
+        # 重新压缩时使用的线程数（zlib压缩时释放GIL，可以并行）
+        self.workers = max(1, int(workers))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            compression=config.get("output_compression", COMPRESSION_PRESERVE),
+            level=config.get("compression_level", 6),
+            workers=config.get("compression_workers", 4)
+        )
+
+def is_lang_entry(name):
+    """
+    判断压缩包条目是否为 assets/<命名空间>/lang/*.json 语言文件（不含中文语言文件）
+    """
+    parts = name.split("/")
+    if len(parts) != 4 or parts[0] != "assets" or parts[2] != "lang":
+        return False
+    file_name = parts[3]
+    return file_name.endswith(".json") and not file_name.startswith("zh_")
+
+def find_lang_entries(names):
+    """
+    从压缩包条目列表中查找语言文件
+    """
+    return [name for name in names if is_lang_entry(name)]
+
+def find_minecraft_lang_entries(names):
+    """
+    从Minecraft版本jar的条目列表中查找语言文件（assets下任意lang目录中的json文件）
+    """
+    lang_entries = []
+    for name in names:
+        if not name.startswith("assets/") or not name.endswith(".json"):
+            continue
+        if posixpath.basename(posixpath.dirname(name)) != "lang":
+            continue
+        if posixpath.basename(name).startswith("zh_"):
+            continue
+        lang_entries.append(name)
+    return lang_entries
+
+def get_zh_entry_name(name):
+    """
+    获取语言文件对应的中文语言文件条目名称
+    """
+    dir_name = posixpath.dirname(name)
+    file_name = posixpath.basename(name)
+
+    # 与文件模式的命名规则保持一致
+    if "_" in file_name:
+        zh_file_name = "zh_cn.json"
+    else:
+        zh_file_name = "zh_cn_" + file_name
+
+    return posixpath.join(dir_name, zh_file_name)
+
+def detect_mod_type(zip_ref):
+    """
+    根据压缩包内容检测MOD类型，无需解压
+    """
+    names = set(zip_ref.namelist())
+
+    # 检查是否为Fabric MOD
+    if "fabric.mod.json" in names:
+        return "fabric"
+
+    # NeoForge新版本使用neoforge.mods.toml
+    if "META-INF/neoforge.mods.toml" in names:
+        return "neoforge"
+
+    # 检查mods.toml内容以区分NeoForge和Forge
+    if "META-INF/mods.toml" in names:
+        content = zip_ref.read("META-INF/mods.toml").decode("utf-8", errors="ignore")
+        if "neoforge" in content.lower():
+            return "neoforge"
+        return "forge"
+
+    # 默认为Forge
+    return "forge"
+
+def _read_raw_entry(src_fp, info):
+    """
+    读取条目的原始压缩数据（不解压）
+    """
+    src_fp.seek(info.header_offset)
+    header = src_fp.read(LOCAL_HEADER_SIZE)
+    if len(header) != LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"无效的本地文件头: {info.filename}")
+
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    src_fp.seek(info.header_offset + LOCAL_HEADER_SIZE + name_length + extra_length)
+    data = src_fp.read(info.compress_size)
+    if len(data) != info.compress_size:
+        raise zipfile.BadZipFile(f"条目数据不完整: {info.filename}")
+    return data
+
+def _can_copy_raw(info):
+    """
+    判断条目是否可以直接复制原始数据
+    """
+    if not RAW_WRITE_SUPPORTED:
+        return False
+    if info.flag_bits & FLAG_ENCRYPTED:
+        return False
+    if max(info.file_size, info.compress_size, info.header_offset) >= zipfile.ZIP64_LIMIT:
+        return False
+    return True
+
+def copy_entry_raw(src_fp, zout, info):
+    """
+    将条目的压缩数据原样写入输出压缩包，跳过解压和重新压缩
+
+    Args:
+        src_fp: 以二进制模式打开的源压缩包文件对象
+        zout: 以写入模式打开的输出ZipFile
+        info: 源压缩包中的ZipInfo
+    """
+    _write_raw_entry(zout, copy.copy(info), _read_raw_entry(src_fp, info))
+
+def _write_raw_entry(zout, new_info, data):
+    """
+    将已压缩的数据作为一个条目写入输出压缩包（new_info中的CRC和大小必须与数据一致）
+
+    zipfile的内部状态不可用时（RAW_WRITE_SUPPORTED为False），解压后通过writestr写入。
+    这种情况下只会写入_write_compressed生成的STORED或DEFLATE数据，其他条目由_can_copy_raw排除。
+    """
+    if not RAW_WRITE_SUPPORTED:
+        if new_info.compress_type == zipfile.ZIP_DEFLATED:
+            data = zlib.decompress(data, -zlib.MAX_WBITS)
+        new_info.flag_bits &= ~FLAG_DATA_DESCRIPTOR
+        zout.writestr(new_info, data, compress_type=new_info.compress_type)
+        return
+
+    # CRC和大小已知，写入本地文件头中，不再需要数据描述符
+    new_info.flag_bits &= ~FLAG_DATA_DESCRIPTOR
+    new_info.header_offset = zout.fp.tell()
+    if hasattr(new_info, "_end_offset"):
+        new_info._end_offset = None
+
+    zout.fp.write(new_info.FileHeader())
+    zout.fp.write(data)
+
+    # 登记条目，关闭时写入中央目录
+    zout.filelist.append(new_info)
+    zout.NameToInfo[new_info.filename] = new_info
+    zout.start_dir = zout.fp.tell()
+    zout._didModify = True
+
+def _deflate(data, level):
+    """
+    以指定级别压缩数据，返回ZIP条目使用的原始DEFLATE数据
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+def _recompress_raw(info, raw, level):
+    """
+    解压条目的原始数据并重新压缩（在压缩线程中运行）
+
+    Returns:
+        (压缩后的数据, CRC, 原始大小)
+    """
+    data = raw if info.compress_type == zipfile.ZIP_STORED else zlib.decompress(raw, -zlib.MAX_WBITS)
+    crc = zlib.crc32(data)
+    if crc != info.CRC:
+        raise zipfile.BadZipFile(f"条目CRC校验失败: {info.filename}")
+    return _deflate(data, level), crc, len(data)
+
+def _compress_data(data, level):
+    return _deflate(data, level), zlib.crc32(data), len(data)
+
+def _write_compressed(zout, info, result):
+    """
+    写入_recompress_raw或_compress_data的结果
+    """
+    compressed, crc, size = result
+    if max(size, len(compressed), zout.fp.tell()) >= zipfile.ZIP64_LIMIT:
+        raise zipfile.LargeZipFile(f"条目过大: {info.filename}")
+    new_info = copy.copy(info)
+    new_info.compress_type = zipfile.ZIP_DEFLATED
+    new_info.flag_bits &= ~FLAG_COMPRESSION_OPTIONS
+    new_info.CRC = crc
+    new_info.file_size = size
+    new_info.compress_size = len(compressed)
+    _write_raw_entry(zout, new_info, compressed)
+
+def _run_ordered(tasks, workers):
+    """
+    在线程池中执行任务，按提交顺序返回结果；同时进行的任务数有上限，避免大JAR的数据全部读入内存
+
+    Args:
+        tasks: 生成 (附带数据, 函数, 参数...) 的迭代器，没有函数时结果为None
+        workers: 线程数，为1时在当前线程中依次执行
+    """
+    if workers <= 1:
+        for item, func, *args in tasks:
+            yield item, func(*args) if func else None
+        return
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item, func, *args in tasks:
+            pending.append((item, executor.submit(func, *args) if func else None))
+            if len(pending) >= workers * 4:
+                item, future = pending.popleft()
+                yield item, future.result() if future else None
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result() if future else None
+
+def _new_entry_info(name):
+    info = zipfile.ZipInfo(name, date_time=FIXED_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = FILE_EXTERNAL_ATTR
+    return info
+
+def rewrite_jar(src_path, dst_path, replacements, codec=None):
+    """
+    流式重写JAR文件：未修改的条目原样复制（或按codec重新压缩），只写入新的或替换的条目
+
+    Args:
+        src_path: 源JAR文件路径
+        dst_path: 输出JAR文件路径
+        replacements: 要写入的条目 {条目名称: 字节内容}，同名条目将被替换
+        codec: 输出压缩设置（OutputCodec），默认保留原压缩方式
+    """
+    codec = codec or OutputCodec()
+    recompress = codec.compression == COMPRESSION_DEFLATE
+    try:
+        with zipfile.ZipFile(src_path, "r") as zin, open(src_path, "rb") as src_fp, \
+                zipfile.ZipFile(dst_path, "w", zipfile.ZIP_DEFLATED) as zout:
+
+            def tasks():
+                written = set()
+                for info in zin.infolist():
+                    # 跳过将被替换的条目和重复条目
+                    if info.filename in replacements or info.filename in written:
+                        continue
+                    written.add(info.filename)
+
+                    if not _can_copy_raw(info):
+                        yield info, None
+                    elif recompress and not info.is_dir() and info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                        # 在主线程中读取原始数据，解压和重新压缩在压缩线程中进行
+                        yield info, _recompress_raw, info, _read_raw_entry(src_fp, info), codec.level
+                    else:
+                        yield info, None
+
+            for info, result in _run_ordered(tasks(), codec.workers if recompress else 1):
+                if result is not None:
+                    _write_compressed(zout, info, result)
+                elif _can_copy_raw(info):
+                    copy_entry_raw(src_fp, zout, info)
+                elif recompress and not info.is_dir() and info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                    # 无法直接复制时（zipfile内部状态不可用），按codec的级别重新压缩
+                    zout.writestr(copy.copy(info), zin.read(info), compress_type=zipfile.ZIP_DEFLATED,
+                                  compresslevel=codec.level)
+                else:
+                    # 无法直接复制时，按原压缩方式重新写入
+                    zout.writestr(copy.copy(info), zin.read(info), compress_type=info.compress_type)
+
+            for name, data in sorted(replacements.items()):
+                zout.writestr(_new_entry_info(name), data, compresslevel=codec.level)
+    except Exception:
+        # 删除写了一半的输出文件
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        raise
+
+def write_directory_zip(src_dir, dst_path, codec=None):
+    """
+    将目录打包为ZIP（资源包）：条目按路径排序，修改时间固定，多线程压缩
+
+    Args:
+        src_dir: 要打包的目录
+        dst_path: 输出文件路径
+        codec: 输出压缩设置（OutputCodec）
+    """
+    codec = codec or OutputCodec()
+    paths = []
+    for root, _, files in os.walk(src_dir):
+        for file in files:
+            file_path = os.path.join(root, file)
+            paths.append((os.path.relpath(file_path, src_dir).replace(os.sep, "/"), file_path))
+    paths.sort()
+
+    def tasks():
+        for name, file_path in paths:
+            with open(file_path, "rb") as f:
+                data = f.read()
+            yield _new_entry_info(name), _compress_data, data, codec.level
+
+    try:
+        with zipfile.ZipFile(dst_path, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info, result in _run_ordered(tasks(), codec.workers):
+                _write_compressed(zout, info, result)
+    except Exception:
+        if os.path.exists(dst_path):
+            os.remove(dst_path)
+        raise
@@ -0,0 +1,136 @@
+import re
+import fnmatch
+from functools import lru_cache
+
+# 规则类型：前缀、子串、通配符（匹配整个键）、正则表达式（在键中搜索）
+RULE_PREFIX = "prefix"
+RULE_CONTAINS = "contains"
+RULE_GLOB = "glob"
+RULE_REGEX = "re"
+RULE_TYPES = (RULE_PREFIX, RULE_CONTAINS, RULE_GLOB, RULE_REGEX)
+
+# 所有语言文件都跳过命令相关的文本
+BASE_EXCLUDE_RULES = ("contains-i:command",)
+
+# MOD语言文件的翻译选项 -> 关闭该选项时跳过的键
+MOD_OPTION_RULES = {
+    "translate_desc": "contains:.desc",
+    "translate_tooltip": "contains:.tooltip",
+    "translate_gui": "contains:.gui"
+}
+
+# Minecraft原版语言文件的翻译选项 -> 关闭该选项时跳过的键
+MINECRAFT_OPTION_RULES = {
+    "translate_items": "contains:item.",
+    "translate_entities": "contains:entity.",
+    "translate_advancements": "contains:advancements."
+}
+
+def parse_rule(rule):
+    """
+    解析一条过滤规则，返回可直接放入组合正则的片段
+
+    规则写法：
+        prefix:death.attack.   以该前缀开头的键
+        contains:.desc         包含该子串的键
+        glob:*.lore            通配符匹配整个键（* 和 ? ）
+        re:^tooltip\\.\\d+$    正则表达式，在键中搜索
+    类型后加 -i 表示不区分大小写（如 contains-i:command）。
+    未写类型时，含有 * ? [ 的规则按通配符处理，其余按前缀处理。
+    """
+    rule = rule.strip()
+    kind, sep, pattern = rule.partition(":")
+    ignore_case = kind.endswith("-i")
+    if ignore_case:
+        kind = kind[:-2]
+    if not sep or kind not in RULE_TYPES:
+        ignore_case = False
+        pattern = rule
+        kind = RULE_GLOB if any(c in rule for c in "*?[") else RULE_PREFIX
+    if not pattern:
+        raise ValueError(f"过滤规则不能为空: {rule}")
+
+    if kind == RULE_PREFIX:
+        fragment = re.escape(pattern)
+    elif kind == RULE_CONTAINS:
+        fragment = ".*?" + re.escape(pattern)
+    elif kind == RULE_GLOB:
+        fragment = fnmatch.translate(pattern)
+    else:
+        fragment = f".*?(?:{pattern})"
+    fragment = f"(?{'i' if ignore_case else ''}s:{fragment})"
+    try:
+        re.compile(fragment)
+    except re.error as e:
+        raise ValueError(f"无效的过滤规则 {rule}: {str(e)}")
+    return fragment
+
+def split_rules(text):
+    """
+    把逗号或换行分隔的规则文本（设置界面的输入）拆分为规则列表
+    """
+    return [rule.strip() for rule in re.split(r"[,\n]", text or "") if rule.strip()]
+
+def _compile(rules):
+    if not rules:
+        return None
+    return re.compile("|".join(parse_rule(rule) for rule in rules))
+
+class KeyFilter:
+    """
+    语言键过滤器：每组规则编译为一个组合正则，每个键对每组只匹配一次
+
+    先检查排除规则；有包含规则时，键还必须匹配其中之一；
+    有必需规则（翻译选项限定的范围）时，键还必须匹配必需规则之一。
+    """
+    def __init__(self, exclude=(), include=(), require=()):
+        self.exclude = tuple(exclude)
+        self.include = tuple(include)
+        self.require = tuple(require)
+        self._exclude = _compile(self.exclude)
+        self._include = _compile(self.include)
+        self._require = _compile(self.require)
+
+    def allows(self, key):
+        """
+        判断键是否需要翻译
+        """
+        if self._exclude is not None and self._exclude.match(key):
+            return False
+        if self._include is not None and not self._include.match(key):
+            return False
+        if self._require is not None and not self._require.match(key):
+            return False
+        return True
+
+    def __call__(self, key):
+        return self.allows(key)
+
+@lru_cache(maxsize=64)
+def _get_filter(exclude, include, require):
+    return KeyFilter(exclude, include, require)
+
+def build_key_filter(options, minecraft=False):
+    """
+    根据翻译选项生成键过滤器（相同的规则只编译一次）
+
+    Args:
+        options: 翻译选项，除各项开关外可包含自定义规则 exclude_keys、include_keys（规则列表）
+        minecraft: 是否按Minecraft原版语言文件的选项生成规则
+
+    自定义的包含规则只会缩小翻译选项限定的范围，不会加入选项关闭的键。
+    """
+    options = options or {}
+    exclude = list(BASE_EXCLUDE_RULES)
+    require = []
+    option_rules = MINECRAFT_OPTION_RULES if minecraft else MOD_OPTION_RULES
+    for option, rule in option_rules.items():
+        if not options.get(option, True):
+            exclude.append(rule)
+    # 不翻译其他文本时，只翻译物品、实体和进度
+    if minecraft and not options.get("translate_misc", True):
+        require.extend(MINECRAFT_OPTION_RULES.values())
+
+    exclude.extend(options.get("exclude_keys") or ())
+    include = tuple(options.get("include_keys") or ())
+    return _get_filter(tuple(exclude), include, tuple(require))
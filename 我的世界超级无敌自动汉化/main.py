@@ -3,15 +3,31 @@ import sys
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
+import queue
 import json
 import zipfile
 import shutil
 import re
 from pathlib import Path
+from collections import deque
 
 from minecraft_translator import MinecraftTranslator
+from translation_cache import create_cache_from_config
+from glossary import load_glossary
+from run_report import format_report
+from endpoint_pool import check_endpoint
+from key_filter import parse_rule, split_rules
 from config import Config
 
+# 日志窗口最多显示的行数，超出后删除最早的行
+LOG_VIEW_MAX_LINES = 1000
+# 内存中保留的日志行数（用于导出日志）
+LOG_HISTORY_MAX_LINES = 20000
+# 界面刷新间隔（毫秒），后台线程的日志和进度在刷新时批量显示
+UI_REFRESH_INTERVAL = 100
+# 每次刷新最多处理的界面消息数量
+UI_MAX_EVENTS_PER_REFRESH = 2000
+
 class MinecraftTranslatorApp:
     def __init__(self, root):
         self.root = root
@@ -22,18 +38,19 @@ class MinecraftTranslatorApp:
         # 加载配置
         self.config = Config()
         
+        # 初始化翻译缓存
+        self.cache = create_cache_from_config(self.config)
+        
         # 初始化翻译器
-        api_url = self.config.get_api_url()
-        api_key = self.config.get("api_key", "") if self.config.get("use_api_key", False) else None
-        model = self.config.get("model", "qwen2.5:1.5b")
-        
-        self.translator = MinecraftTranslator(
-            api_url=api_url,
-            api_key=api_key,
-            model=model
-        )
+        self.translator = MinecraftTranslator.from_config(self.config, cache=self.cache)
+        
+        # 后台线程发往界面的消息队列 (类型, 值)，由主线程定时批量处理
+        self.ui_queue = queue.Queue()
+        # 最近的日志（环形缓冲区），用于导出日志
+        self.log_history = deque(maxlen=LOG_HISTORY_MAX_LINES)
         
         self.setup_ui()
+        self.root.after(UI_REFRESH_INTERVAL, self.process_ui_queue)
     
     def setup_ui(self):
         # 创建主框架
@@ -70,6 +87,10 @@ class MinecraftTranslatorApp:
         log_frame = ttk.LabelFrame(main_frame, text="日志")
         log_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
+        log_toolbar = ttk.Frame(log_frame)
+        log_toolbar.pack(fill=tk.X, padx=5)
+        ttk.Button(log_toolbar, text="导出日志", command=self.export_log).pack(side=tk.RIGHT)
+        
         self.log_text = tk.Text(log_frame, height=10, wrap=tk.WORD)
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
@@ -126,6 +147,9 @@ class MinecraftTranslatorApp:
         self.translate_gui_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(options_frame, text="翻译界面文本", variable=self.translate_gui_var).pack(anchor=tk.W, padx=5, pady=2)
         
+        self.incremental_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(options_frame, text="保留MOD自带的中文翻译（只翻译缺失的文本）", variable=self.incremental_var).pack(anchor=tk.W, padx=5, pady=2)
+        
         # 开始翻译按钮
         start_button = ttk.Button(parent, text="开始汉化", command=self.start_mod_translation)
         start_button.pack(pady=10)
@@ -199,6 +223,23 @@ class MinecraftTranslatorApp:
         model_entry = ttk.Entry(model_frame, textvariable=self.model_var, width=30)
         model_entry.grid(row=0, column=1, padx=5, pady=5)
         
+        # 并发请求数
+        workers_frame = ttk.Frame(settings_frame)
+        workers_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(workers_frame, text="并发请求数:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        
+        self.max_workers_var = tk.StringVar(value=str(self.config.get("max_concurrent_requests", 2)))
+        max_workers_entry = ttk.Entry(workers_frame, textvariable=self.max_workers_var, width=10)
+        max_workers_entry.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+        
+        # 流式接收
+        stream_frame = ttk.Frame(settings_frame)
+        stream_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.stream_response_var = tk.BooleanVar(value=self.config.get("stream_response", False))
+        ttk.Checkbutton(stream_frame, text="流式接收模型输出（长批次不易超时）", variable=self.stream_response_var).grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        
         # API密钥（带复选框）
         api_key_frame = ttk.Frame(settings_frame)
         api_key_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -211,6 +252,37 @@ class MinecraftTranslatorApp:
         self.api_key_entry = ttk.Entry(api_key_frame, textvariable=self.api_key_var, width=40, state="disabled" if not self.use_api_key_var.get() else "normal")
         self.api_key_entry.grid(row=0, column=1, padx=5, pady=5)
         
+        # 缓存设置框架
+        cache_frame = ttk.LabelFrame(parent, text="翻译缓存设置")
+        cache_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        self.use_cache_var = tk.BooleanVar(value=self.config.get("use_cache", True))
+        ttk.Checkbutton(cache_frame, text="使用翻译缓存（跳过已翻译过的文本）", variable=self.use_cache_var).grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        
+        clear_cache_button = ttk.Button(cache_frame, text="清空缓存", command=self.clear_cache)
+        clear_cache_button.grid(row=0, column=1, padx=5, pady=5)
+        
+        # 原版术语表设置框架
+        glossary_frame = ttk.LabelFrame(parent, text="原版术语表")
+        glossary_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(glossary_frame, text="MC版本文件夹:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.glossary_path_var = tk.StringVar(value=self.config.get("glossary_version_path", ""))
+        ttk.Entry(glossary_frame, textvariable=self.glossary_path_var, width=40).grid(row=0, column=1, padx=5, pady=5)
+        ttk.Button(glossary_frame, text="浏览...", command=self.browse_glossary_folder).grid(row=0, column=2, padx=5, pady=5)
+        
+        # 键过滤规则设置框架（MOD和原版汉化共用）
+        key_filter_frame = ttk.LabelFrame(parent, text="键过滤规则（逗号分隔，如 *.lore, death.attack.*, re:^tooltip\\.\\d+$）")
+        key_filter_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(key_filter_frame, text="跳过的键:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+        self.exclude_keys_var = tk.StringVar(value=", ".join(self.config.get("exclude_keys", [])))
+        ttk.Entry(key_filter_frame, textvariable=self.exclude_keys_var, width=50).grid(row=0, column=1, padx=5, pady=5)
+        
+        ttk.Label(key_filter_frame, text="只翻译的键:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
+        self.include_keys_var = tk.StringVar(value=", ".join(self.config.get("include_keys", [])))
+        ttk.Entry(key_filter_frame, textvariable=self.include_keys_var, width=50).grid(row=1, column=1, padx=5, pady=5)
+        
         # 保存设置按钮
         save_button = ttk.Button(parent, text="保存设置", command=self.save_settings)
         save_button.pack(pady=10)
@@ -228,6 +300,11 @@ class MinecraftTranslatorApp:
             self.mod_path_var.set(file_path)
             self.log(f"已选择MOD文件: {file_path}")
     
+    def browse_glossary_folder(self):
+        folder_path = filedialog.askdirectory(title="选择包含中文语言文件的MC版本文件夹")
+        if folder_path:
+            self.glossary_path_var.set(folder_path)
+    
     def browse_mc_folder(self):
         folder_path = filedialog.askdirectory(title="选择MC版本文件夹")
         if folder_path:
@@ -247,12 +324,15 @@ class MinecraftTranslatorApp:
         options = {
             "translate_desc": self.translate_desc_var.get(),
             "translate_tooltip": self.translate_tooltip_var.get(),
-            "translate_gui": self.translate_gui_var.get()
+            "translate_gui": self.translate_gui_var.get(),
+            "incremental": self.incremental_var.get(),
+            "exclude_keys": self.config.get("exclude_keys", []),
+            "include_keys": self.config.get("include_keys", [])
         }
         
         # 在新线程中启动翻译，避免UI卡顿
-        self.status_var.set("正在汉化MOD...")
-        self.progress_var.set(0)
+        self.set_status("正在汉化MOD...")
+        self.set_progress(0)
         
         threading.Thread(
             target=self.run_mod_translation,
@@ -274,17 +354,19 @@ class MinecraftTranslatorApp:
             )
             
             self.log(f"汉化完成! 输出文件: {output_path}")
-            self.status_var.set("汉化完成")
-            self.progress_var.set(100)
+            self.log_cache_stats()
+            self.log_run_report()
+            self.set_status("汉化完成")
+            self.set_progress(100)
             
             # 显示成功消息
-            self.root.after(0, lambda: messagebox.showinfo("完成", f"MOD汉化完成!\n输出文件: {output_path}"))
+            self.call_in_ui(lambda: messagebox.showinfo("完成", f"MOD汉化完成!\n输出文件: {output_path}"))
         
         except Exception as e:
             error_msg = str(e)
             self.log(f"汉化过程中出错: {error_msg}")
-            self.status_var.set("汉化失败")
-            self.root.after(0, lambda error=error_msg: messagebox.showerror("错误", f"汉化过程中出错: {error}"))
+            self.set_status("汉化失败")
+            self.call_in_ui(lambda error=error_msg: messagebox.showerror("错误", f"汉化过程中出错: {error}"))
     
     def start_mc_translation(self):
         mc_path = self.mc_path_var.get()
@@ -297,12 +379,14 @@ class MinecraftTranslatorApp:
             "translate_items": self.translate_items_var.get(),
             "translate_entities": self.translate_entities_var.get(),
             "translate_advancements": self.translate_advancements_var.get(),
-            "translate_misc": self.translate_misc_var.get()
+            "translate_misc": self.translate_misc_var.get(),
+            "exclude_keys": self.config.get("exclude_keys", []),
+            "include_keys": self.config.get("include_keys", [])
         }
         
         # 在新线程中启动翻译，避免UI卡顿
-        self.status_var.set("正在汉化MC版本...")
-        self.progress_var.set(0)
+        self.set_status("正在汉化MC版本...")
+        self.set_progress(0)
         
         threading.Thread(
             target=self.run_mc_translation,
@@ -322,28 +406,122 @@ class MinecraftTranslatorApp:
             )
             
             self.log(f"汉化完成! 输出资源包: {output_path}")
-            self.status_var.set("汉化完成")
-            self.progress_var.set(100)
+            self.log_cache_stats()
+            self.log_run_report()
+            self.set_status("汉化完成")
+            self.set_progress(100)
             
             # 显示成功消息
-            self.root.after(0, lambda: messagebox.showinfo("完成", f"MC版本汉化完成!\n输出资源包: {output_path}"))
+            self.call_in_ui(lambda: messagebox.showinfo("完成", f"MC版本汉化完成!\n输出资源包: {output_path}"))
         
         except Exception as e:
             error_msg = str(e)
             self.log(f"汉化过程中出错: {error_msg}")
-            self.status_var.set("汉化失败")
-            self.root.after(0, lambda error=error_msg: messagebox.showerror("错误", f"汉化过程中出错: {error}"))
+            self.set_status("汉化失败")
+            self.call_in_ui(lambda error=error_msg: messagebox.showerror("错误", f"汉化过程中出错: {error}"))
     
     def update_progress(self, progress, message=None):
-        self.progress_var.set(progress)
+        """进度回调（在翻译线程中调用）"""
+        self.set_progress(progress)
         if message:
             self.log(message)
     
     def log(self, message):
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
+        """输出日志（可以在任意线程中调用）"""
+        self.log_history.append(message)
+        self.ui_queue.put(("log", message))
         print(message)
     
+    def set_progress(self, progress):
+        """设置进度条（可以在任意线程中调用）"""
+        self.ui_queue.put(("progress", progress))
+    
+    def set_status(self, status):
+        """设置状态栏文本（可以在任意线程中调用）"""
+        self.ui_queue.put(("status", status))
+    
+    def call_in_ui(self, callback):
+        """在主线程中执行callback，用于从后台线程弹出对话框"""
+        self.ui_queue.put(("call", callback))
+    
+    def process_ui_queue(self):
+        """
+        在主线程中批量处理后台线程发来的界面消息
+        
+        一次刷新中的多条日志合并为一次插入，进度和状态只取最后一个值，
+        日志窗口超过LOG_VIEW_MAX_LINES行时删除最早的行。
+        """
+        lines = []
+        progress = None
+        status = None
+        callbacks = []
+        try:
+            for _ in range(UI_MAX_EVENTS_PER_REFRESH):
+                kind, value = self.ui_queue.get_nowait()
+                if kind == "log":
+                    lines.append(value)
+                elif kind == "progress":
+                    progress = value
+                elif kind == "status":
+                    status = value
+                elif kind == "call":
+                    callbacks.append(value)
+        except queue.Empty:
+            pass
+        
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+            line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+            if line_count > LOG_VIEW_MAX_LINES:
+                self.log_text.delete("1.0", f"{line_count - LOG_VIEW_MAX_LINES + 1}.0")
+            self.log_text.see(tk.END)
+        if progress is not None:
+            self.progress_var.set(progress)
+        if status is not None:
+            self.status_var.set(status)
+        
+        # 先安排下一次刷新，对话框显示期间仍然可以更新日志
+        self.root.after(UI_REFRESH_INTERVAL, self.process_ui_queue)
+        for callback in callbacks:
+            callback()
+    
+    def export_log(self):
+        """将日志导出到文本文件"""
+        file_path = filedialog.asksaveasfilename(
+            title="导出日志",
+            defaultextension=".txt",
+            filetypes=[("文本文件", "*.txt"), ("所有文件", "*.*")]
+        )
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(self.log_history) + "\n")
+            self.log(f"日志已导出: {file_path}")
+        except OSError as e:
+            messagebox.showerror("错误", f"导出日志时出错: {str(e)}")
+    
+    def log_cache_stats(self):
+        """输出翻译缓存统计信息"""
+        if self.cache is None:
+            return
+        stats = self.cache.get_stats()
+        self.log(f"翻译缓存: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, 命中率 {stats['hit_rate']:.1%}, 共 {stats['entries']} 条")
+    
+    def log_run_report(self):
+        """输出本次任务的运行报告摘要"""
+        for line in format_report(self.translator.report.to_dict()):
+            self.log(line)
+    
+    def clear_cache(self):
+        """清空翻译缓存"""
+        if self.cache is None:
+            messagebox.showinfo("提示", "翻译缓存未启用")
+            return
+        if messagebox.askyesno("确认", "确定要清空翻译缓存吗？"):
+            self.cache.clear()
+            self.log("翻译缓存已清空")
+    
     def toggle_api_key(self):
         """切换API密钥输入框的状态"""
         if self.use_api_key_var.get():
@@ -358,6 +536,7 @@ class MinecraftTranslatorApp:
             api_url = self.api_host_var.get().strip()
             api_port = self.api_port_var.get().strip()
             model = self.model_var.get().strip()
+            max_workers = self.max_workers_var.get().strip()
             use_api_key = self.use_api_key_var.get()
             api_key = self.api_key_var.get().strip() if use_api_key else ""
             
@@ -374,21 +553,58 @@ class MinecraftTranslatorApp:
                 messagebox.showerror("错误", "模型名称不能为空")
                 return
             
+            if not max_workers.isdigit() or int(max_workers) < 1:
+                messagebox.showerror("错误", "并发请求数必须是大于0的整数")
+                return
+            
             if use_api_key and not api_key:
                 messagebox.showerror("错误", "启用API密钥后，密钥不能为空")
                 return
             
+            exclude_keys = split_rules(self.exclude_keys_var.get())
+            include_keys = split_rules(self.include_keys_var.get())
+            try:
+                for rule in exclude_keys + include_keys:
+                    parse_rule(rule)
+            except ValueError as e:
+                messagebox.showerror("错误", str(e))
+                return
+            
             # 保存到配置
             self.config.set("api_url", api_url)
             self.config.set("api_port", api_port)
             self.config.set("model", model)
+            self.config.set("max_concurrent_requests", int(max_workers))
+            self.config.set("stream_response", self.stream_response_var.get())
             self.config.set("use_api_key", use_api_key)
             self.config.set("api_key", api_key)
+            self.config.set("use_cache", self.use_cache_var.get())
+            glossary_path = self.glossary_path_var.get().strip()
+            glossary_changed = glossary_path != self.config.get("glossary_version_path", "")
+            self.config.set("glossary_version_path", glossary_path)
+            self.config.set("exclude_keys", exclude_keys)
+            self.config.set("include_keys", include_keys)
             
             # 更新翻译器
             self.translator.api_url = self.config.get_api_url()
             self.translator.api_key = api_key if use_api_key else None
             self.translator.model = model
+            # 配置了多个翻译节点时，并发请求数由各节点的设置决定
+            if self.translator.endpoint_pool is None:
+                self.translator.max_workers = int(max_workers)
+            self.translator.stream_response = self.stream_response_var.get()
+            if self.use_cache_var.get() and self.cache is None:
+                self.cache = create_cache_from_config(self.config)
+            elif not self.use_cache_var.get() and self.cache is not None:
+                self.cache.close()
+                self.cache = None
+            self.translator.cache = self.cache
+            if glossary_changed:
+                self.translator.glossary = load_glossary(glossary_path)
+                if self.translator.glossary is not None:
+                    self.log(f"已加载原版术语表: {len(self.translator.glossary)} 条")
+                elif glossary_path:
+                    self.log("未在该文件夹中找到原版中文语言文件，术语表未启用")
             
             self.log("设置已保存")
             messagebox.showinfo("成功", "设置已保存")
@@ -407,7 +623,7 @@ class MinecraftTranslatorApp:
             model = self.model_var.get().strip()
             
             self.log(f"正在测试连接: {api_url}")
-            self.status_var.set("正在测试连接...")
+            self.set_status("正在测试连接...")
             
             # 在新线程中测试连接，避免UI卡顿
             threading.Thread(
@@ -419,49 +635,36 @@ class MinecraftTranslatorApp:
         except Exception as e:
             error_msg = str(e)
             self.log(f"测试连接时出错: {error_msg}")
-            self.status_var.set("连接测试失败")
+            self.set_status("连接测试失败")
             messagebox.showerror("错误", f"测试连接时出错: {error_msg}")
     
     def _run_connection_test(self, api_url, api_key, model):
         """在后台线程中运行连接测试"""
         try:
-            # 准备请求头
-            headers = {"Content-Type": "application/json"}
-            if api_key:
-                headers["Authorization"] = f"Bearer {api_key}"
-            
-            # 准备请求数据 - 简单的测试提示
-            data = {
-                "model": model,
-                "prompt": "你好",
-                "stream": False
-            }
-            
-            # 发送请求
-            import requests
-            response = requests.post(api_url, headers=headers, json=data, timeout=10)
+            # 发送简单的测试提示（与翻译节点的健康检查相同）
+            ok, error_msg = check_endpoint(api_url, model, api_key)
             
             # 检查响应
-            if response.status_code == 200:
+            if ok:
                 self.log("连接测试成功！")
-                self.status_var.set("连接测试成功")
-                self.root.after(0, lambda: messagebox.showinfo("成功", "连接测试成功！Ollama API可以正常访问。"))
+                self.set_status("连接测试成功")
+                self.call_in_ui(lambda: messagebox.showinfo("成功", "连接测试成功！Ollama API可以正常访问。"))
             else:
-                error_msg = f"API返回错误: {response.status_code} - {response.text[:200]}"
                 self.log(error_msg)
-                self.status_var.set("连接测试失败")
-                self.root.after(0, lambda: messagebox.showerror("错误", f"连接测试失败: {error_msg}"))
+                self.set_status("连接测试失败")
+                self.call_in_ui(lambda: messagebox.showerror("错误", f"连接测试失败: {error_msg}"))
                 
         except Exception as e:
             error_msg = str(e)
             self.log(f"连接测试失败: {error_msg}")
-            self.status_var.set("连接测试失败")
-            self.root.after(0, lambda: messagebox.showerror("错误", f"连接测试失败: {error_msg}"))
+            self.set_status("连接测试失败")
+            self.call_in_ui(lambda: messagebox.showerror("错误", f"连接测试失败: {error_msg}"))
 
 def main():
     root = tk.Tk()
     app = MinecraftTranslatorApp(root)
     root.mainloop()
+    app.translator.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,18 +4,201 @@ import zipfile
 import shutil
 import tempfile
 import re
+import time
+import posixpath
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
+import jar_utils
+from placeholders import mask_placeholders, restore_placeholders
+from glossary import load_glossary, MAX_TERMS_PER_BATCH
+from run_report import RunReport, extract_usage
+from checkpoint import CheckpointJournal, make_job_id
+from endpoint_pool import EndpointPool
+from key_filter import build_key_filter
+from triage import classify, TRIAGE_LABELS, TRIAGE_TRANSLATABLE
+from output_cache import OutputCache, make_output_key
+from retry_policy import (
+    RetryPolicy, TranslationAPIError, SPLITTABLE_ERRORS, get_error_kind,
+    ERROR_TIMEOUT, ERROR_CONNECTION, ERROR_SERVER, ERROR_RATE_LIMITED, ERROR_MALFORMED, ERROR_CLIENT
+)
+
+# 提示词版本，修改翻译提示模板时需要递增，使旧的缓存翻译失效
+PROMPT_VERSION = "4"
+
+# 发送给模型的系统提示前缀
+SYSTEM_PROMPT = "你是一个专业的Minecraft游戏翻译专家，擅长将游戏文本翻译成简体中文。"
+
+# 常见模型的上下文长度（token数），未列出的模型使用默认值
+MODEL_CONTEXT_LIMITS = {
+    "qwen2.5:0.5b": 2048,
+    "qwen2.5:1.5b": 2048,
+    "qwen2.5:3b": 4096,
+    "qwen2.5:7b": 4096,
+    "qwen2.5": 4096,
+    "llama3": 8192,
+    "gpt-4o-mini": 16384,
+    "gpt-4o": 16384
+}
+DEFAULT_CONTEXT_TOKENS = 2048
+
+# 译文token数相对原文的估计倍数，打包批次时为模型输出预留空间
+OUTPUT_TOKEN_RATIO = 1.5
+
+# 提示中每条术语大致占用的token数，打包批次时为术语表预留空间
+GLOSSARY_TERM_TOKENS = 8
+
+# 模型漏掉部分编号时，针对缺失文本重新请求的最多次数
+MAX_FOLLOWUP_REQUESTS = 2
+
+# 流式接收时两次进度消息之间的最短间隔（秒）
+STREAM_PROGRESS_INTERVAL = 0.5
+
+# 任务摘要中最多列出的未翻译键数量
+UNTRANSLATED_REPORT_LIMIT = 50
+
+# 带编号的翻译结果行，如 "[1] 译文"、"【1】译文"
+RESPONSE_LINE_PATTERN = re.compile(r'^[\[【]\s*(\d+)\s*[\]】]\s*[.:：、]?\s*(.*)$')
+# 模型未使用方括号时的编号格式，如 "1. 译文"、"1：译文"
+RESPONSE_BARE_LINE_PATTERN = re.compile(r'^(\d+)\s*[.:：、)）]\s*(.*)$')
+
+# 中日韩字符大致按每字一个token估算
+CJK_PATTERN = re.compile(r'[\u2e80-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+class ModLanguageFiles:
+    """
+    从MOD中读取的语言文件（MinecraftTranslator.load_mod_lang_files的返回值）
+    """
+    def __init__(self, lang_count):
+        # MOD中的语言文件数量（无法解析的语言文件不在files中）
+        self.lang_count = lang_count
+        # 解析后的语言文件 [(中文条目名, 语言数据, 已有中文翻译, 需要翻译的文本, 沿用的翻译)]
+        self.files = []
+        # 输出缓存的键，以及命中缓存时的中文语言文件 {条目名称: 字节内容}
+        self.cache_key = None
+        self.cached = None
+    
+    def get_texts(self, prefix=""):
+        """
+        获取需要翻译的文本 {"前缀中文条目名:键": 原文}
+        """
+        return {
+            f"{prefix}{zh_entry}:{key}": text
+            for zh_entry, _, _, to_translate, _ in self.files
+            for key, text in to_translate.items()
+        }
+
 class MinecraftTranslator:
-    def __init__(self, api_url, api_key, model):
+    def __init__(self, api_url, api_key, model, cache=None, max_workers=1,
+                 pool_size=None, connect_timeout=10, read_timeout=60, verbose=False,
+                 streaming_jar=True, max_batch_size=50, batch_token_budget=None,
+                 context_limits=None, retry_policy=None, stream_response=False,
+                 stream_idle_timeout=30, glossary=None, report_dir=None, checkpoint_dir=None,
+                 endpoint_pool=None, owns_endpoint_pool=False, output_codec=None, output_cache=None):
         self.api_url = api_url
         self.api_key = api_key
         self.model = model
+        self.cache = cache
+        # 同时进行的翻译请求数量
+        self.max_workers = max(1, int(max_workers))
+        # 连接池大小，默认与并发请求数一致
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        # 是否输出每次API调用的调试信息
+        self.verbose = verbose
+        # 是否以流式方式读写MOD的JAR文件（不解压整个MOD）
+        self.streaming_jar = streaming_jar
+        # 每批最多的文本数量
+        self.max_batch_size = max(1, int(max_batch_size))
+        # 每批原文的token预算，未设置时根据模型上下文长度计算
+        self.batch_token_budget = batch_token_budget
+        # 用户自定义的模型上下文长度 {模型名称: token数}
+        self.context_limits = context_limits or {}
+        # 请求失败时的重试策略
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 是否以流式方式接收模型输出，流式模式下超时时间为两次数据之间的最长间隔
+        self.stream_response = stream_response
+        self.stream_idle_timeout = stream_idle_timeout
+        # 原版术语表（glossary.Glossary），用于统一物品、方块等名称的译法
+        self.glossary = glossary
+        # 运行报告的保存目录，为None时只在内存中生成报告
+        self.report_dir = report_dir
+        self.last_report_path = None
+        # 检查点目录，为None时不记录检查点（任务中断后需要重新翻译）
+        self.checkpoint_dir = checkpoint_dir
+        # 多个翻译节点的负载均衡（endpoint_pool.EndpointPool），为None时只使用api_url
+        self.endpoint_pool = endpoint_pool
+        self._owns_endpoint_pool = owns_endpoint_pool
+        # 输出JAR和资源包的压缩设置（jar_utils.OutputCodec）
+        self.output_codec = output_codec or jar_utils.OutputCodec()
+        # 汉化输出缓存（output_cache.OutputCache），语言文件和翻译设置不变的MOD直接使用上次生成的语言文件
+        self.output_cache = output_cache
+        self._session = None
+        self._session_pool_size = None
+        self._session_lock = threading.Lock()
+        self._progress_lock = threading.Lock()
+        self._last_progress = 0
+        self._reset_job_stats()
         self.temp_dir = None
         self.progress_callback = None
     
+    @classmethod
+    def from_config(cls, config, cache=None, glossary=None, endpoint_pool=None):
+        """
+        根据配置创建翻译器
+        
+        Args:
+            config: Config实例
+            cache: 翻译缓存（可选）
+            glossary: 原版术语表（可选），未指定时从配置的原版版本文件夹生成
+            endpoint_pool: 多个翻译器共享的节点池（可选），未指定时根据配置中的endpoints创建
+        """
+        if glossary is None:
+            glossary = load_glossary(config.get("glossary_version_path", ""))
+        owns_endpoint_pool = endpoint_pool is None
+        if endpoint_pool is None:
+            endpoint_pool = EndpointPool.from_config(config)
+        api_key = config.get("api_key", "") if config.get("use_api_key", False) else None
+        # 使用多个节点时，并发请求数为各节点并发数之和
+        max_workers = endpoint_pool.max_concurrent if endpoint_pool else config.get("max_concurrent_requests", 2)
+        return cls(
+            api_url=config.get_api_url(),
+            api_key=api_key,
+            model=config.get("model", "qwen2.5:1.5b"),
+            cache=cache,
+            max_workers=max_workers,
+            pool_size=config.get("pool_size", 4),
+            connect_timeout=config.get("connect_timeout", 10),
+            read_timeout=config.get("read_timeout", 60),
+            verbose=config.get("verbose_log", False),
+            streaming_jar=config.get("streaming_jar", True),
+            max_batch_size=config.get("max_batch_size", 50),
+            batch_token_budget=config.get("batch_token_budget", 0),
+            context_limits=config.get("model_context_limits", {}),
+            retry_policy=RetryPolicy(
+                attempts=config.get("retry_attempts", 3),
+                base_delay=config.get("retry_base_delay", 1.0),
+                max_delay=config.get("retry_max_delay", 30.0)
+            ),
+            stream_response=config.get("stream_response", False),
+            stream_idle_timeout=config.get("stream_idle_timeout", 30),
+            glossary=glossary,
+            report_dir=config.get_report_dir() if config.get("save_run_report", True) else None,
+            checkpoint_dir=config.get_checkpoint_dir() if config.get("use_checkpoint", True) else None,
+            endpoint_pool=endpoint_pool,
+            owns_endpoint_pool=owns_endpoint_pool,
+            output_codec=jar_utils.OutputCodec.from_config(config),
+            output_cache=OutputCache(
+                config.get_output_cache_dir(),
+                max_entries=int(config.get("output_cache_max_entries", 2000))
+            ) if config.get("use_output_cache", True) else None
+        )
+    
     def translate_mod(self, mod_path, mod_type="auto", options=None, progress_callback=None):
         """
         翻译Minecraft MOD
@@ -29,41 +212,53 @@ class MinecraftTranslator:
         Returns:
             输出的汉化MOD文件路径
         """
-        self.progress_callback = progress_callback
-        
+        return self.run_job("mod", mod_path, self._translate_mod, mod_path, mod_type, options,
+                            progress_callback=progress_callback)
+    
+    def _translate_mod(self, mod_path, mod_type, options):
+        """
+        翻译MOD（translate_mod的实现）
+        """
         if options is None:
             options = {
                 "translate_desc": True,
                 "translate_tooltip": True,
-                "translate_gui": True
+                "translate_gui": True,
+                "incremental": True
             }
         
+        # 流式模式：只读取JAR中的语言文件，无需解压整个MOD
+        if self.streaming_jar:
+            return self._translate_mod_streaming(mod_path, mod_type, options)
+        
         # 创建临时目录
         self.temp_dir = tempfile.mkdtemp(prefix="minecraft_translator_")
-        self._update_progress(5, "创建临时工作目录")
+        self.update_progress(5, "创建临时工作目录")
         
         try:
             # 解压MOD文件
             extract_dir = os.path.join(self.temp_dir, "extracted")
             os.makedirs(extract_dir, exist_ok=True)
             
-            self._update_progress(10, f"解压MOD文件: {os.path.basename(mod_path)}")
-            with zipfile.ZipFile(mod_path, 'r') as zip_ref:
-                zip_ref.extractall(extract_dir)
-            
-            # 检测MOD类型
-            if mod_type == "auto":
-                mod_type = self._detect_mod_type(extract_dir)
-                self._update_progress(15, f"检测到MOD类型: {mod_type}")
+            self.update_progress(10, f"解压MOD文件: {os.path.basename(mod_path)}")
+            with self.report.stage("extract"):
+                with zipfile.ZipFile(mod_path, 'r') as zip_ref:
+                    zip_ref.extractall(extract_dir)
             
-            # 查找语言文件
-            self._update_progress(20, "查找语言文件")
-            lang_files = self._find_lang_files(extract_dir, mod_type)
+            with self.report.stage("find_files"):
+                # 检测MOD类型
+                if mod_type == "auto":
+                    mod_type = self._detect_mod_type(extract_dir)
+                    self.update_progress(15, f"检测到MOD类型: {mod_type}")
+                
+                # 查找语言文件
+                self.update_progress(20, "查找语言文件")
+                lang_files = self._find_lang_files(extract_dir, mod_type)
             
             if not lang_files:
                 raise Exception("未找到可翻译的语言文件")
             
-            self._update_progress(25, f"找到 {len(lang_files)} 个语言文件")
+            self.update_progress(25, f"找到 {len(lang_files)} 个语言文件")
             
             # 翻译语言文件
             translated_files = []
@@ -71,7 +266,7 @@ class MinecraftTranslator:
             
             for i, lang_file in enumerate(lang_files):
                 progress = 25 + (i / total_files) * 50
-                self._update_progress(progress, f"翻译文件 ({i+1}/{total_files}): {os.path.basename(lang_file)}")
+                self.update_progress(progress, f"翻译文件 ({i+1}/{total_files}): {os.path.basename(lang_file)}")
                 
                 # 创建中文语言文件路径
                 zh_lang_file = self._get_zh_lang_path(lang_file)
@@ -82,22 +277,26 @@ class MinecraftTranslator:
                 translated_files.append(zh_lang_file)
             
             # 打包新的MOD文件
-            self._update_progress(80, "打包汉化MOD文件")
+            self.update_progress(80, "打包汉化MOD文件")
             output_path = self._create_output_path(mod_path, "_汉化版")
             
-            with zipfile.ZipFile(output_path, 'w') as zipf:
-                for root, _, files in os.walk(extract_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, extract_dir)
-                        zipf.write(file_path, arcname)
+            with self.report.stage("write_jar"):
+                # 只写入生成的中文语言文件，其余条目从原JAR复制，保留原来的压缩方式
+                replacements = {}
+                for zh_lang_file in translated_files:
+                    if os.path.exists(zh_lang_file):
+                        arcname = os.path.relpath(zh_lang_file, extract_dir).replace(os.sep, "/")
+                        with open(zh_lang_file, 'rb') as f:
+                            replacements[arcname] = f.read()
+                jar_utils.rewrite_jar(mod_path, output_path, replacements, self.output_codec)
             
-            self._update_progress(95, "汉化MOD文件打包完成")
+            self.update_progress(95, "汉化MOD文件打包完成")
+            self.log_job_summary()
             return output_path
             
         finally:
             # 清理临时目录
-            self._update_progress(100, "清理临时文件")
+            self.update_progress(100, "清理临时文件")
             if self.temp_dir and os.path.exists(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
     
@@ -113,7 +312,35 @@ class MinecraftTranslator:
         Returns:
             输出的汉化资源包路径
         """
+        return self.run_job("minecraft", mc_path, self._translate_minecraft, mc_path, options,
+                            progress_callback=progress_callback)
+    
+    def run_job(self, job_type, source, func, *args, progress_callback=None):
+        """
+        执行一个翻译任务：重置任务统计，打开检查点，结束后生成运行报告
+        
+        Args:
+            job_type: 任务类型（mod、minecraft或modpack）
+            source: 要翻译的MOD文件、版本文件夹或整合包的路径
+            func: 任务的实现，返回输出文件路径
+            progress_callback: 进度回调函数
+            
+        Returns:
+            func的返回值
+        """
         self.progress_callback = progress_callback
+        self._reset_job_stats(job_type, source)
+        return self._run_job(func, *args)
+    
+    def _translate_minecraft(self, mc_path, options):
+        """
+        翻译Minecraft版本（translate_minecraft的实现）
+        """
+        # 未配置术语表时，使用该版本自带的原版中文翻译
+        if self._job_glossary is None:
+            self._job_glossary = load_glossary(mc_path)
+            if self._job_glossary is not None:
+                self.update_progress(None, f"已加载原版术语表: {len(self._job_glossary)} 条")
         
         if options is None:
             options = {
@@ -125,32 +352,29 @@ class MinecraftTranslator:
         
         # 创建临时目录
         self.temp_dir = tempfile.mkdtemp(prefix="minecraft_translator_")
-        self._update_progress(5, "创建临时工作目录")
+        self.update_progress(5, "创建临时工作目录")
+        
+        # 版本jar文件（没有assets目录时从中读取语言文件）
+        jar_ref = None
         
         try:
             # 检查Minecraft版本文件夹
             # 首先检查常规的assets目录
             assets_dir = os.path.join(mc_path, "assets")
             
-            # 如果常规assets目录不存在，尝试查找jar文件并从中提取assets
+            # 如果常规assets目录不存在，尝试从版本jar文件中直接读取语言文件
             if not os.path.exists(assets_dir):
                 # 查找版本jar文件
                 jar_files = [f for f in os.listdir(mc_path) if f.endswith(".jar")]
                 if jar_files:
                     jar_path = os.path.join(mc_path, jar_files[0])
-                    # 解压jar文件到临时目录
-                    jar_extract_dir = os.path.join(self.temp_dir, "jar_extracted")
-                    os.makedirs(jar_extract_dir, exist_ok=True)
                     
-                    self._update_progress(10, f"从JAR文件提取资源: {os.path.basename(jar_path)}")
-                    with zipfile.ZipFile(jar_path, 'r') as zip_ref:
-                        zip_ref.extractall(jar_extract_dir)
+                    # 只读取中央目录，不解压整个jar文件
+                    self.update_progress(10, f"从JAR文件读取资源: {os.path.basename(jar_path)}")
+                    jar_ref = zipfile.ZipFile(jar_path, 'r')
                     
-                    # 检查解压后的目录中是否有assets
-                    extracted_assets_dir = os.path.join(jar_extract_dir, "assets")
-                    if os.path.exists(extracted_assets_dir):
-                        assets_dir = extracted_assets_dir
-                    else:
+                    # 检查jar文件中是否有assets
+                    if not any(name.startswith("assets/") for name in jar_ref.namelist()):
                         raise Exception(f"无效的Minecraft版本文件夹: {mc_path}，未找到assets目录")
                 else:
                     raise Exception(f"无效的Minecraft版本文件夹: {mc_path}，未找到assets目录或版本JAR文件")
@@ -163,13 +387,17 @@ class MinecraftTranslator:
             self._create_resourcepack_metadata(pack_dir)
             
             # 查找语言文件
-            self._update_progress(15, "查找语言文件")
-            lang_files = self._find_minecraft_lang_files(assets_dir)
+            self.update_progress(15, "查找语言文件")
+            with self.report.stage("find_files"):
+                if jar_ref is not None:
+                    lang_files = jar_utils.find_minecraft_lang_entries(jar_ref.namelist())
+                else:
+                    lang_files = self._find_minecraft_lang_files(assets_dir)
             
             if not lang_files:
                 raise Exception("未找到可翻译的语言文件")
             
-            self._update_progress(20, f"找到 {len(lang_files)} 个语言文件")
+            self.update_progress(20, f"找到 {len(lang_files)} 个语言文件")
             
             # 翻译语言文件
             translated_files = []
@@ -177,35 +405,211 @@ class MinecraftTranslator:
             
             for i, lang_file in enumerate(lang_files):
                 progress = 20 + (i / total_files) * 60
-                self._update_progress(progress, f"翻译文件 ({i+1}/{total_files}): {os.path.basename(lang_file)}")
+                self.update_progress(progress, f"翻译文件 ({i+1}/{total_files}): {os.path.basename(lang_file)}")
                 
                 # 创建中文语言文件路径
-                rel_path = os.path.relpath(lang_file, assets_dir)
+                if jar_ref is not None:
+                    rel_path = posixpath.relpath(lang_file, "assets")
+                else:
+                    rel_path = os.path.relpath(lang_file, assets_dir)
                 zh_lang_file = os.path.join(pack_dir, "assets", rel_path.replace(".json", "_zh_cn.json"))
                 os.makedirs(os.path.dirname(zh_lang_file), exist_ok=True)
                 
                 # 翻译文件
-                self._translate_minecraft_lang_file(lang_file, zh_lang_file, options)
+                if jar_ref is not None:
+                    # 语言文件直接在内存中读取和翻译
+                    with self.report.stage("read_jar"):
+                        lang_bytes = jar_ref.read(lang_file)
+                    data = self._translate_lang_bytes(lang_bytes, lang_file, options, minecraft=True)
+                    if data is not None:
+                        with self.report.stage("write_json"):
+                            with open(zh_lang_file, 'wb') as f:
+                                f.write(data)
+                else:
+                    self._translate_minecraft_lang_file(lang_file, zh_lang_file, options)
                 translated_files.append(zh_lang_file)
             
             # 打包资源包
-            self._update_progress(85, "打包汉化资源包")
+            self.update_progress(85, "打包汉化资源包")
             output_dir = os.path.dirname(mc_path)
             output_name = f"汉化资源包_{os.path.basename(mc_path)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            output_path = os.path.join(output_dir, output_name)
+            final_path = os.path.join(output_dir, f"{output_name}.zip")
             
-            shutil.make_archive(output_path, 'zip', pack_dir)
-            final_path = f"{output_path}.zip"
+            with self.report.stage("package"):
+                jar_utils.write_directory_zip(pack_dir, final_path, self.output_codec)
             
-            self._update_progress(95, "汉化资源包打包完成")
+            self.update_progress(95, "汉化资源包打包完成")
+            self.log_job_summary()
             return final_path
             
         finally:
+            if jar_ref is not None:
+                jar_ref.close()
+            
             # 清理临时目录
-            self._update_progress(100, "清理临时文件")
+            self.update_progress(100, "清理临时文件")
             if self.temp_dir and os.path.exists(self.temp_dir):
                 shutil.rmtree(self.temp_dir)
     
+    def _translate_mod_streaming(self, mod_path, mod_type, options):
+        """
+        流式翻译MOD：在内存中读取语言文件，其余条目原样复制到输出JAR
+        
+        Args:
+            mod_path: MOD的JAR文件路径
+            mod_type: MOD类型 (auto, fabric, forge, neoforge)
+            options: 翻译选项
+            
+        Returns:
+            输出的汉化MOD文件路径
+        """
+        self.temp_dir = None
+        self.update_progress(10, f"读取MOD文件: {os.path.basename(mod_path)}")
+        
+        with zipfile.ZipFile(mod_path, 'r') as zip_ref:
+            # 检测MOD类型
+            if mod_type == "auto":
+                with self.report.stage("find_files"):
+                    mod_type = jar_utils.detect_mod_type(zip_ref)
+                self.update_progress(15, f"检测到MOD类型: {mod_type}")
+            
+            # 查找并读取语言文件
+            self.update_progress(20, "查找语言文件")
+            mod_files = self.load_mod_lang_files(zip_ref, options)
+        
+        self.update_progress(25, f"找到 {mod_files.lang_count} 个语言文件")
+        
+        translations = {}
+        if mod_files.cached is not None:
+            self.update_progress(75, "语言文件未变化，使用缓存的汉化结果")
+        else:
+            # 所有语言文件的文本一起翻译
+            text_dict = mod_files.get_texts()
+            self.update_progress(30, f"共 {len(text_dict)} 个文本需要翻译")
+            translated = self.translate_texts(text_dict)
+            translations = {text_dict[key]: translation for key, translation in translated.items()}
+        replacements, _ = self.build_mod_payload(mod_files, translations)
+        
+        # 打包新的MOD文件：未修改的条目直接复制压缩数据
+        self.update_progress(80, "打包汉化MOD文件")
+        output_path = self.write_mod_jar(mod_path, replacements)
+        
+        self.update_progress(95, "汉化MOD文件打包完成")
+        self.log_job_summary()
+        return output_path
+    
+    def load_mod_lang_files(self, zip_ref, options):
+        """
+        读取MOD中的语言文件并筛选需要翻译的文本
+        
+        语言文件和翻译设置与之前的任务相同时直接使用输出缓存，不再解析语言文件；
+        无法解析的语言文件跳过。
+        
+        Args:
+            zip_ref: 已打开的MOD JAR文件（zipfile.ZipFile）
+            options: 翻译选项
+            
+        Returns:
+            ModLanguageFiles
+        """
+        with self.report.stage("find_files"):
+            entry_names = set(zip_ref.namelist())
+            lang_entries = jar_utils.find_lang_entries(zip_ref.namelist())
+        if not lang_entries:
+            raise Exception("未找到可翻译的语言文件")
+        
+        # 读取语言文件（增量翻译时同时读取MOD自带的中文语言文件）
+        lang_files = []
+        with self.report.stage("read_jar"):
+            for entry in lang_entries:
+                zh_entry = jar_utils.get_zh_entry_name(entry)
+                existing_data = None
+                if options.get("incremental", True) and zh_entry in entry_names:
+                    existing_data = zip_ref.read(zh_entry)
+                lang_files.append((entry, zip_ref.read(entry), existing_data))
+        
+        mod_files = ModLanguageFiles(len(lang_files))
+        
+        # 语言文件和翻译设置与之前的任务相同时，直接使用缓存的语言文件
+        mod_files.cache_key = self._get_output_cache_key(lang_files, options)
+        if mod_files.cache_key:
+            mod_files.cached = self.output_cache.get(mod_files.cache_key)
+            if mod_files.cached is not None:
+                with self._progress_lock:
+                    self.job_stats["output_cache_hits"] += 1
+                return mod_files
+        
+        for entry, data, existing_data in lang_files:
+            try:
+                with self.report.stage("parse_json"):
+                    lang_data = self._check_lang_data(json.loads(data.decode('utf-8-sig', errors='ignore')))
+                    existing = self._load_existing_translations(existing_data, entry) if existing_data else None
+            except ValueError as e:
+                print(f"翻译文件 {entry} 时出错: {str(e)}")
+                continue
+            
+            to_translate, reused = self._prepare_lang_data(lang_data, options, existing)
+            mod_files.files.append((jar_utils.get_zh_entry_name(entry), lang_data, existing, to_translate, reused))
+        return mod_files
+    
+    def translate_texts(self, text_dict, on_batch_done=None):
+        """
+        翻译一组文本（任务内去重，并依次使用检查点、术语表和翻译缓存），耗时计入translate阶段
+        
+        Args:
+            text_dict: 要翻译的文本字典 {key: text}
+            on_batch_done: 每完成一个批次时的回调 on_batch_done({原文: 译文})，可能在翻译线程中调用
+            
+        Returns:
+            翻译后的文本字典 {key: translated_text}，未能翻译的文本保留原文
+        """
+        with self.report.stage("translate"):
+            return self._batch_translate(text_dict, on_batch_done=on_batch_done)
+    
+    def build_mod_payload(self, mod_files, translations):
+        """
+        合并翻译结果，生成MOD的中文语言文件
+        
+        所有语言文件都已解析且没有未能翻译的文本时，结果写入输出缓存。
+        
+        Args:
+            mod_files: load_mod_lang_files返回的ModLanguageFiles
+            translations: 翻译结果 {原文: 译文}
+            
+        Returns:
+            (中文语言文件 {条目名称: 字节内容}, 未能翻译的键数量)
+        """
+        if mod_files.cached is not None:
+            return mod_files.cached, 0
+        
+        replacements = {}
+        untranslated = 0
+        for zh_entry, lang_data, existing, to_translate, reused in mod_files.files:
+            translated = {key: translations.get(text, text) for key, text in to_translate.items()}
+            with self._progress_lock:
+                untranslated += sum(1 for text in to_translate.values() if text in self._failed_texts)
+            translated.update(reused)
+            result = self._merge_translations(lang_data, translated, existing)
+            with self.report.stage("write_json"):
+                replacements[zh_entry] = json.dumps(result, ensure_ascii=False, indent=4).encode('utf-8')
+        
+        # 有语言文件无法解析或有文本未能翻译时不写入缓存，下次重新翻译
+        if mod_files.cache_key and not untranslated and len(mod_files.files) == mod_files.lang_count:
+            self.output_cache.put(mod_files.cache_key, replacements)
+        return replacements, untranslated
+    
+    def write_mod_jar(self, mod_path, replacements, suffix="_汉化版"):
+        """
+        写出汉化MOD：写入生成的中文语言文件，其余条目直接复制压缩数据
+        
+        Returns:
+            输出的汉化MOD文件路径
+        """
+        output_path = self._create_output_path(mod_path, suffix)
+        with self.report.stage("write_jar"):
+            jar_utils.rewrite_jar(mod_path, output_path, replacements, self.output_codec)
+        return output_path
+    
     def _detect_mod_type(self, extract_dir):
         """
         检测MOD类型
@@ -292,249 +696,887 @@ class MinecraftTranslator:
     
     def _translate_lang_file(self, src_file, dst_file, options):
         """
-        翻译语言文件
+        翻译语言文件（无法解析的语言文件跳过并返回False，翻译出错时抛出异常）
         """
         try:
-            with open(src_file, 'r', encoding='utf-8', errors='ignore') as f:
-                lang_data = json.load(f)
-            
-            # 过滤需要翻译的键值对
-            to_translate = {}
-            for key, value in lang_data.items():
-                # 跳过命令相关的文本
-                if key.startswith("commands.") or "command" in key.lower():
-                    continue
-                
-                # 根据选项过滤
-                if not options.get("translate_desc", True) and ".desc" in key:
-                    continue
-                
-                if not options.get("translate_tooltip", True) and ".tooltip" in key:
-                    continue
+            with self.report.stage("parse_json"):
+                with open(src_file, 'r', encoding='utf-8', errors='ignore') as f:
+                    lang_data = self._check_lang_data(json.load(f))
                 
-                if not options.get("translate_gui", True) and ".gui" in key:
-                    continue
-                
-                # 只翻译字符串值
-                if isinstance(value, str) and value.strip() and not value.isdigit():
-                    # 跳过已经是中文的文本
-                    if self._is_chinese(value):
-                        continue
-                    
-                    to_translate[key] = value
-            
-            # 批量翻译
-            translated = self._batch_translate(to_translate)
-            
-            # 合并翻译结果
-            result = {}
-            for key, value in lang_data.items():
-                if key in translated:
-                    result[key] = translated[key]
-                else:
-                    result[key] = value
-            
-            # 写入翻译后的文件
+                # 增量翻译：读取MOD自带的中文语言文件
+                existing = None
+                if options.get("incremental", True) and os.path.exists(dst_file):
+                    with open(dst_file, 'rb') as f:
+                        existing = self._load_existing_translations(f.read(), dst_file)
+        except (OSError, ValueError) as e:
+            print(f"翻译文件 {src_file} 时出错: {str(e)}")
+            return False
+        
+        with self.report.stage("translate"):
+            result = self._translate_lang_data(lang_data, options, existing)
+        
+        # 写入翻译后的文件
+        with self.report.stage("write_json"):
             with open(dst_file, 'w', encoding='utf-8') as f:
                 json.dump(result, f, ensure_ascii=False, indent=4)
+        
+        return True
+    
+    def _translate_lang_bytes(self, data, name, options, minecraft=False, existing_data=None):
+        """
+        翻译内存中的语言文件内容
+        
+        Args:
+            data: 语言文件的字节内容
+            name: 语言文件名称（用于日志）
+            options: 翻译选项
+            minecraft: 是否按Minecraft原版语言文件的规则过滤
+            existing_data: 已有中文语言文件的字节内容（增量翻译时使用）
             
-            return True
+        Returns:
+            翻译后的语言文件字节内容，语言文件无法解析时返回None
             
-        except Exception as e:
-            print(f"翻译文件 {src_file} 时出错: {str(e)}")
-            return False
+        Raises:
+            翻译出错（如第一批请求失败）时抛出异常，不会当作翻译成功
+        """
+        try:
+            with self.report.stage("parse_json"):
+                lang_data = self._check_lang_data(json.loads(data.decode('utf-8-sig', errors='ignore')))
+                existing = None
+                if not minecraft and existing_data:
+                    existing = self._load_existing_translations(existing_data, name)
+        except ValueError as e:
+            print(f"翻译文件 {name} 时出错: {str(e)}")
+            return None
+        
+        with self.report.stage("translate"):
+            if minecraft:
+                result = self._translate_minecraft_lang_data(lang_data, options)
+            else:
+                result = self._translate_lang_data(lang_data, options, existing)
+        
+        with self.report.stage("write_json"):
+            return json.dumps(result, ensure_ascii=False, indent=4).encode('utf-8')
     
-    def _translate_minecraft_lang_file(self, src_file, dst_file, options):
+    def _check_lang_data(self, lang_data):
         """
-        翻译Minecraft语言文件
+        检查语言文件内容是否为JSON对象
+        """
+        if not isinstance(lang_data, dict):
+            raise ValueError("语言文件的内容不是JSON对象")
+        return lang_data
+    
+    def _load_existing_translations(self, data, name):
+        """
+        解析已有的中文语言文件，解析失败时返回None
         """
         try:
-            with open(src_file, 'r', encoding='utf-8', errors='ignore') as f:
-                lang_data = json.load(f)
-            
-            # 过滤需要翻译的键值对
-            to_translate = {}
-            for key, value in lang_data.items():
-                # 跳过命令相关的文本
-                if key.startswith("commands.") or "command" in key.lower():
-                    continue
-                
-                # 根据选项过滤
-                if not options.get("translate_items", True) and "item." in key:
-                    continue
-                
-                if not options.get("translate_entities", True) and "entity." in key:
-                    continue
-                
-                if not options.get("translate_advancements", True) and "advancements." in key:
-                    continue
-                
-                if not options.get("translate_misc", True) and not any(x in key for x in ["item.", "entity.", "advancements."]):
-                    continue
-                
-                # 只翻译字符串值
-                if isinstance(value, str) and value.strip() and not value.isdigit():
-                    # 跳过已经是中文的文本
-                    if self._is_chinese(value):
-                        continue
-                    
-                    to_translate[key] = value
+            existing = json.loads(data.decode('utf-8-sig', errors='ignore'))
+            if isinstance(existing, dict):
+                return existing
+        except ValueError as e:
+            print(f"警告: 无法解析已有的中文语言文件 {name}: {str(e)}")
+        return None
+    
+    def _translate_lang_data(self, lang_data, options, existing=None):
+        """
+        翻译MOD语言数据
+        
+        Args:
+            lang_data: 语言文件内容 {key: text}
+            options: 翻译选项
+            existing: 已有的中文翻译 {key: text}，这些键不再重新翻译
             
-            # 批量翻译
-            translated = self._batch_translate(to_translate)
+        Returns:
+            翻译后的语言文件内容 {key: text}
+        """
+        to_translate, reused = self._prepare_lang_data(lang_data, options, existing)
+        
+        # 批量翻译
+        translated = self._batch_translate(to_translate)
+        translated.update(reused)
+        
+        return self._merge_translations(lang_data, translated, existing)
+    
+    def _prepare_lang_data(self, lang_data, options, existing=None):
+        """
+        按翻译选项筛选MOD语言数据中需要翻译的文本
+        
+        Args:
+            lang_data: 语言文件内容 {key: text}
+            options: 翻译选项
+            existing: 已有的中文翻译 {key: text}
             
-            # 合并翻译结果
-            result = {}
-            for key, value in lang_data.items():
-                if key in translated:
-                    result[key] = translated[key]
-                else:
-                    result[key] = value
+        Returns:
+            (需要翻译的文本 {key: text}, 沿用已有中文翻译的文本 {key: text})
+        """
+        # 过滤需要翻译的键值对（按翻译选项和自定义规则过滤键）
+        key_allowed = build_key_filter(options)
+        to_translate = {}
+        for key, value in lang_data.items():
+            if not key_allowed(key):
+                continue
             
-            # 写入翻译后的文件
+            # 只翻译字符串值，已是中日文、非语言文本和缩写保留原文
+            if isinstance(value, str) and self._triage(value) == TRIAGE_TRANSLATABLE:
+                to_translate[key] = value
+        
+        # 增量翻译：已有中文翻译的键直接沿用，只翻译缺失或仍为原文的键
+        reused = {}
+        if existing:
+            for key, value in list(to_translate.items()):
+                old_value = existing.get(key)
+                if isinstance(old_value, str) and old_value.strip() and old_value != value:
+                    reused[key] = old_value
+                    del to_translate[key]
+            self.job_stats["reused_strings"] += len(reused)
+        
+        return to_translate, reused
+    
+    def _translate_minecraft_lang_file(self, src_file, dst_file, options):
+        """
+        翻译Minecraft语言文件（无法解析的语言文件跳过并返回False，翻译出错时抛出异常）
+        """
+        try:
+            with self.report.stage("parse_json"):
+                with open(src_file, 'r', encoding='utf-8', errors='ignore') as f:
+                    lang_data = self._check_lang_data(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"翻译文件 {src_file} 时出错: {str(e)}")
+            return False
+        
+        with self.report.stage("translate"):
+            result = self._translate_minecraft_lang_data(lang_data, options)
+        
+        # 写入翻译后的文件
+        with self.report.stage("write_json"):
             with open(dst_file, 'w', encoding='utf-8') as f:
                 json.dump(result, f, ensure_ascii=False, indent=4)
+        
+        return True
+    
+    def _translate_minecraft_lang_data(self, lang_data, options):
+        """
+        翻译Minecraft语言数据
+        
+        Args:
+            lang_data: 语言文件内容 {key: text}
+            options: 翻译选项
             
-            return True
+        Returns:
+            翻译后的语言文件内容 {key: text}
+        """
+        # 过滤需要翻译的键值对（按翻译选项和自定义规则过滤键）
+        key_allowed = build_key_filter(options, minecraft=True)
+        to_translate = {}
+        for key, value in lang_data.items():
+            if not key_allowed(key):
+                continue
             
-        except Exception as e:
-            print(f"翻译文件 {src_file} 时出错: {str(e)}")
-            return False
+            # 只翻译字符串值，已是中日文、非语言文本和缩写保留原文
+            if isinstance(value, str) and self._triage(value) == TRIAGE_TRANSLATABLE:
+                to_translate[key] = value
+        
+        # 批量翻译
+        translated = self._batch_translate(to_translate)
+        
+        return self._merge_translations(lang_data, translated)
+    
+    def _merge_translations(self, lang_data, translated, existing=None):
+        """
+        合并翻译结果，保持原文件的键顺序
+        
+        Args:
+            lang_data: 原语言文件内容
+            translated: 翻译结果 {key: text}
+            existing: 已有的中文翻译，未翻译的键优先使用其中的值，其独有的键追加在末尾
+        """
+        existing = existing or {}
+        result = {}
+        for key, value in lang_data.items():
+            if key in translated:
+                result[key] = translated[key]
+            elif key in existing:
+                result[key] = existing[key]
+            else:
+                result[key] = value
+        for key, value in existing.items():
+            if key not in result:
+                result[key] = value
+        return result
     
-    def _batch_translate(self, text_dict, batch_size=20):
+    def _batch_translate(self, text_dict, batch_size=None, on_batch_done=None):
         """
         批量翻译文本
         
         Args:
             text_dict: 要翻译的文本字典 {key: text}
-            batch_size: 每批翻译的文本数量
+            batch_size: 每批最多的文本数量，默认使用max_batch_size
+            on_batch_done: 每完成一个批次时的回调 on_batch_done({原文: 译文})，可能在翻译线程中调用
             
         Returns:
-            翻译后的文本字典 {key: translated_text}
+            翻译后的文本字典 {key: translated_text}，顺序与输入一致
+        """
+        if not text_dict:
+            return {}
+        
+        # 任务内去重：相同的原文在整个任务中只翻译一次，结果再分发给所有键
+        unique_texts = list(dict.fromkeys(text_dict.values()))
+        pending = [text for text in unique_texts if text not in self._job_translations]
+        self.job_stats["total_strings"] += len(text_dict)
+        self.job_stats["unique_strings"] += len(pending)
+        
+        if on_batch_done is not None and len(pending) < len(unique_texts):
+            on_batch_done({text: self._job_translations[text] for text in unique_texts if text in self._job_translations})
+        
+        translated = self._translate_texts({text: text for text in pending}, batch_size, on_batch_done)
+        for text, translation in translated.items():
+            # 未翻译成功（保留原文）的文本不记录，后续再次出现时重新翻译
+            if translation != text:
+                self._job_translations[text] = translation
+                self._failed_texts.discard(text)
+        
+        # 记录最终未能翻译的键
+        self.job_stats["untranslated_keys"].extend(
+            key for key, text in text_dict.items()
+            if text in self._failed_texts and text not in self._job_translations
+        )
+        
+        return {
+            key: self._job_translations.get(text, translated.get(text, text))
+            for key, text in text_dict.items()
+        }
+    
+    def _translate_texts(self, text_dict, batch_size, on_batch_done=None):
+        """
+        分批调用API翻译文本（先查询翻译缓存）
+        
+        Args:
+            text_dict: 要翻译的文本字典 {key: text}
+            batch_size: 每批最多的文本数量
+            on_batch_done: 每完成一个批次时的回调 on_batch_done({key: translated_text})
+            
+        Returns:
+            翻译后的文本字典 {key: translated_text}，顺序与输入一致
         """
         if not text_dict:
             return {}
         
         result = {}
         keys = list(text_dict.keys())
-        total_batches = (len(keys) + batch_size - 1) // batch_size
         
-        for i in range(0, len(keys), batch_size):
-            batch_keys = keys[i:i+batch_size]
-            batch_texts = [text_dict[key] for key in batch_keys]
-            
-            # 构建批量翻译的提示
-            prompt = self._create_translation_prompt(batch_texts)
-            
-            # 调用API进行翻译
+        # 中断后重新运行的任务：检查点中已完成的文本无需再次翻译
+        if self._journal is not None and self._journal.translations:
+            resumed = 0
+            for key in keys:
+                if text_dict[key] in self._journal.translations:
+                    result[key] = self._journal.translations[text_dict[key]]
+                    resumed += 1
+            if resumed:
+                keys = [key for key in keys if key not in result]
+                self.job_stats["resumed_strings"] += resumed
+                self.update_progress(None, f"从检查点恢复 {resumed} 个文本，剩余 {len(keys)} 个需要翻译")
+        
+        # 与原版文本完全相同的原文直接使用官方译文
+        if self._job_glossary is not None:
+            for key in keys:
+                translation = self._job_glossary.lookup(text_dict[key])
+                if translation is not None:
+                    result[key] = translation
+            hits = len([key for key in keys if key in result])
+            if hits:
+                keys = [key for key in keys if key not in result]
+                self.job_stats["glossary_hits"] += hits
+                self.update_progress(None, f"原版术语表命中 {hits} 个文本，剩余 {len(keys)} 个需要翻译")
+        
+        # 先从翻译缓存中查找，命中的文本无需调用API（使用多个节点时，任一节点模型的译文都可以使用）
+        if self.cache is not None:
+            cached = self.cache.get_many([text_dict[key] for key in keys], self._get_models(), PROMPT_VERSION)
+            if cached:
+                hits = 0
+                for key in keys:
+                    if text_dict[key] in cached:
+                        result[key] = cached[text_dict[key]]
+                        hits += 1
+                keys = [key for key in keys if key not in result]
+                self.update_progress(None, f"翻译缓存命中 {hits} 个文本，剩余 {len(keys)} 个需要翻译")
+        
+        # 从检查点、术语表和缓存中得到的结果视为一个已完成的批次
+        if on_batch_done is not None and result:
+            on_batch_done(dict(result))
+        
+        batches = self._pack_batches(keys, text_dict, batch_size or self.max_batch_size)
+        total_batches = len(batches)
+        completed = [0]
+        
+        def run_batch(batch_num, batch_keys):
+            batch_result = translate_batch(batch_num, batch_keys)
+            if on_batch_done is not None:
+                on_batch_done(batch_result)
+            return batch_result
+        
+        def translate_batch(batch_num, batch_keys):
             try:
-                # 更新进度
-                batch_num = i // batch_size + 1
-                self._update_progress(None, f"翻译批次 {batch_num}/{total_batches} ({len(batch_keys)} 个文本)")
-                
-                # 调用API
-                self._update_progress(None, f"正在调用翻译API...")
-                translated_texts = self._call_translation_api(prompt, batch_texts)
-                
-                # 将翻译结果添加到结果字典中
-                for j, key in enumerate(batch_keys):
-                    if j < len(translated_texts):
-                        result[key] = translated_texts[j]
-                    else:
-                        # 如果翻译结果不足，保留原文
-                        result[key] = text_dict[key]
-                
-                self._update_progress(None, f"批次 {batch_num} 翻译完成")
-                
+                self.update_progress(None, f"翻译批次 {batch_num}/{total_batches} ({len(batch_keys)} 个文本)")
+                batch_result = self._translate_batch_with_split(batch_keys, text_dict)
+                with self._progress_lock:
+                    completed[0] += 1
+                    done = completed[0]
+                self.update_progress(None, f"批次 {batch_num} 翻译完成 (已完成 {done}/{total_batches})")
+                return batch_result
             except Exception as e:
                 error_msg = str(e)
-                self._update_progress(None, f"批量翻译时出错: {error_msg}")
+                self.update_progress(None, f"批量翻译时出错: {error_msg}")
                 print(f"批量翻译时出错: {error_msg}")
-                
-                # 出错时保留原文
-                for key in batch_keys:
-                    result[key] = text_dict[key]
-                
-                # 如果是第一批就失败，可能是API配置问题，直接抛出异常
-                if i == 0:
+                # 如果第一批拆分后仍全部失败，可能是API配置问题或服务不可用，直接抛出异常
+                if batch_num == 1:
                     raise Exception(f"调用翻译API时出错: {error_msg}")
+                # 出错时保留原文
+                self._mark_failed([text_dict[key] for key in batch_keys])
+                return {key: text_dict[key] for key in batch_keys}
+        
+        if batches:
+            # 第一批同步执行，用于尽早发现API配置问题
+            result.update(run_batch(1, batches[0]))
+            
+            # 其余批次并发执行
+            if len(batches) > 1:
+                workers = max(1, min(self.max_workers, len(batches) - 1))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(run_batch, batch_num, batch_keys)
+                        for batch_num, batch_keys in enumerate(batches[1:], start=2)
+                    ]
+                    for future in futures:
+                        result.update(future.result())
+        
+        # 按原始键顺序重新组装结果
+        return {key: result[key] for key in text_dict if key in result}
+    
+    def _estimate_tokens(self, text):
+        """
+        粗略估算文本的token数：中日韩字符按每字一个token，其余按每4个字符一个token
+        """
+        cjk_count = len(CJK_PATTERN.findall(text))
+        return cjk_count + (len(text) - cjk_count + 3) // 4
+    
+    def _get_context_limit(self):
+        """
+        获取当前模型的上下文长度（使用多个节点时取各节点模型中最小的）
+        """
+        return min(self._get_model_context_limit(model) for model in self._get_models())
+    
+    def _get_model_context_limit(self, model):
+        """
+        获取指定模型的上下文长度
+        """
+        for limits in (self.context_limits, MODEL_CONTEXT_LIMITS):
+            if model in limits:
+                return int(limits[model])
+            # 按模型系列匹配（如 qwen2.5:14b 匹配 qwen2.5）
+            family = model.split(":")[0]
+            if family in limits:
+                return int(limits[family])
+        return DEFAULT_CONTEXT_TOKENS
+    
+    def _get_models(self):
+        """
+        获取可能用于翻译的模型（使用多个节点时为各节点的模型）
+        """
+        if self.endpoint_pool is not None:
+            return self.endpoint_pool.models
+        return [self.model]
+    
+    def _get_model_key(self):
+        """
+        任务使用的模型组合，用于区分检查点和输出缓存（模型不同时译文可能不同）
+        """
+        return "+".join(sorted(set(self._get_models())))
+    
+    def _get_batch_token_budget(self):
+        """
+        获取每批原文的token预算
+        """
+        if self.batch_token_budget:
+            return int(self.batch_token_budget)
+        
+        # 上下文长度减去提示模板占用，剩余部分按比例分给原文和译文
+        template_tokens = self._estimate_tokens(SYSTEM_PROMPT + self._create_translation_prompt([]))
+        if self._job_glossary is not None:
+            template_tokens += MAX_TERMS_PER_BATCH * GLOSSARY_TERM_TOKENS
+        available = self._get_context_limit() - template_tokens
+        return max(64, int(available / (1 + OUTPUT_TOKEN_RATIO)))
+    
+    def _pack_batches(self, keys, text_dict, max_batch_size):
+        """
+        按token预算将文本打包成批次，在不超出模型上下文的前提下尽量多放文本
+        
+        Args:
+            keys: 要翻译的键列表
+            text_dict: 要翻译的文本字典 {key: text}
+            max_batch_size: 每批最多的文本数量
+            
+        Returns:
+            批次列表，每个批次为键列表
+        """
+        budget = self._get_batch_token_budget()
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for key in keys:
+            # 每个文本额外占用行首编号和换行符
+            tokens = self._estimate_tokens(text_dict[key]) + 3
+            if current and (current_tokens + tokens > budget or len(current) >= max_batch_size):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            # 超出预算的单个长文本单独成批
+            current.append(key)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        
+        return batches
+    
+    def _translate_batch_with_split(self, batch_keys, text_dict):
+        """
+        翻译单个批次，重试后仍失败时将批次一分为二分别翻译
+        
+        Args:
+            batch_keys: 本批次的键列表
+            text_dict: 要翻译的文本字典 {key: text}
             
+        Returns:
+            本批次的翻译结果 {key: translated_text}
+        """
+        try:
+            return self._translate_batch(batch_keys, text_dict)
+        except Exception as e:
+            if get_error_kind(e) not in SPLITTABLE_ERRORS or len(batch_keys) <= 1:
+                raise
+            error = e
+        
+        return self._split_batch(batch_keys, text_dict, error)
+    
+    def _split_batch(self, batch_keys, text_dict, error):
+        """
+        将失败的批次逐层二分翻译，拆分后的小批次只请求一次，不再按重试策略重试
+        
+        第一次拆分时两半都以与原批次相同的错误失败，说明失败与批次内容无关（如服务不可用），
+        不再继续拆分，直接抛出原批次的错误；否则失败的一半继续拆分，直到单个文本，
+        只有单独请求仍失败的文本保留原文。
+        
+        Args:
+            batch_keys: 失败批次的键列表
+            text_dict: 要翻译的文本字典 {key: text}
+            error: 该批次失败时的异常
+            
+        Returns:
+            本批次的翻译结果 {key: translated_text}，未能翻译的文本保留原文
+        """
+        kind = get_error_kind(error)
+        result = {}
+        failed_keys = []
+        # 待拆分的批次 [(键列表, 失败时的异常)]
+        pending = [(batch_keys, error)]
+        first = True
+        
+        while pending:
+            keys, keys_error = pending.pop(0)
+            mid = len(keys) // 2
+            self.update_progress(None, f"批次翻译失败（{get_error_kind(keys_error)}），拆分为 {mid} 和 {len(keys) - mid} 个文本的小批次重试")
+            
+            failures = []
+            for half in (keys[:mid], keys[mid:]):
+                try:
+                    result.update(self._translate_batch(half, text_dict, retry=False))
+                except Exception as e:
+                    failures.append((half, e))
+            
+            if first and len(failures) == 2 and all(get_error_kind(e) == kind for _, e in failures):
+                raise error
+            first = False
+            
+            for half, half_error in failures:
+                if get_error_kind(half_error) in SPLITTABLE_ERRORS and len(half) > 1:
+                    pending.append((half, half_error))
+                else:
+                    self.update_progress(None, f"小批次翻译失败，保留 {len(half)} 个原文: {str(half_error)}")
+                    failed_keys.extend(half)
+        
+        if failed_keys:
+            self._mark_failed([text_dict[key] for key in failed_keys])
+            result.update({key: text_dict[key] for key in failed_keys})
         return result
     
+    def _request_translations(self, texts, retry=True, on_line=None):
+        """
+        请求翻译一组文本，遇到超时、服务器错误、限流或无法解析的输出时按重试策略重试
+        
+        Args:
+            texts: 要翻译的文本列表
+            retry: 是否按重试策略重试，为False时只请求一次
+            on_line: 流式接收时每收到完整的一行译文调用 on_line(编号(从1开始), 译文)
+            
+        Returns:
+            (翻译结果 {序号(从0开始): 译文}, 完成翻译的模型)
+        """
+        def attempt():
+            prompt = self._create_translation_prompt(texts)
+            content, model = self._call_translation_api(prompt, expected_count=len(texts), on_line=on_line)
+            parsed = self._parse_translation_response(content, len(texts))
+            if not parsed:
+                raise TranslationAPIError("模型输出中没有可识别的翻译结果", kind=ERROR_MALFORMED)
+            return parsed, model
+        
+        def on_retry(retry_number, error, delay):
+            self.update_progress(None, f"翻译请求失败（{get_error_kind(error)}），{delay:.1f} 秒后进行第 {retry_number} 次重试")
+        
+        if not retry:
+            return attempt()
+        return self.retry_policy.call(attempt, on_retry=on_retry)
+    
+    def _mark_failed(self, texts):
+        """
+        记录未能翻译的原文
+        """
+        with self._progress_lock:
+            self._failed_texts.update(texts)
+    
+    def _translate_batch(self, batch_keys, text_dict, retry=True):
+        """
+        翻译单个批次
+        
+        模型漏掉或无法对应编号的文本会单独组成更小的批次重新请求，
+        多次请求后仍缺失的文本保留原文。
+        
+        Args:
+            batch_keys: 本批次的键列表
+            text_dict: 要翻译的文本字典 {key: text}
+            retry: 请求失败时是否按重试策略重试（拆分后的小批次不重试）
+            
+        Returns:
+            本批次的翻译结果 {key: translated_text}
+        """
+        batch_texts = [text_dict[key] for key in batch_keys]
+        
+        # 发送前将占位符、颜色代码和换行替换为<0>、<1>等替身标记 [(替换后的文本, 原格式标记列表)]
+        masked = [mask_placeholders(text) for text in batch_texts]
+        
+        # 已获得的翻译 {批次内序号: 译文}，以及完成翻译的模型 {批次内序号: 模型}
+        translations = {}
+        translated_by = {}
+        pending = list(range(len(batch_texts)))
+        
+        # 流式接收时每收到完整的一行译文就写入检查点，请求中途中断时已完成的行不会丢失 {批次内序号}
+        journaled = set()
+        
+        def journal_line(number, translated_text):
+            if not 1 <= number <= len(pending):
+                return
+            index = pending[number - 1]
+            restored = restore_placeholders(translated_text.strip(), masked[index][1])
+            if index in journaled or not restored or restored == batch_texts[index]:
+                return
+            journaled.add(index)
+            self._append_journal({batch_texts[index]: restored})
+        
+        on_line = journal_line if self._journal is not None and self.stream_response else None
+        
+        for attempt in range(MAX_FOLLOWUP_REQUESTS + 1):
+            texts = [masked[i][0] for i in pending]
+            
+            # 调用API并按编号解析结果
+            try:
+                parsed, model = self._request_translations(texts, retry, on_line)
+            except Exception as e:
+                # 第一次请求失败时交给上层处理；补充请求失败时保留已获得的翻译
+                if attempt == 0:
+                    raise
+                self.update_progress(None, f"补充请求失败: {str(e)}")
+                break
+            rejected = 0
+            for local_index, translated_text in parsed.items():
+                index = pending[local_index]
+                # 替身标记丢失、重复或多出的译文视为缺失，重新请求
+                restored = restore_placeholders(translated_text, masked[index][1])
+                if restored is None:
+                    rejected += 1
+                    self._debug(f"译文中的格式标记与原文不一致，已丢弃: {batch_texts[index]!r} -> {translated_text!r}")
+                    continue
+                translations[index] = restored
+                translated_by[index] = model
+            if rejected:
+                self.update_progress(None, f"有 {rejected} 个译文的格式标记与原文不一致")
+            
+            pending = [i for i in pending if i not in translations]
+            if not pending:
+                break
+            
+            if attempt < MAX_FOLLOWUP_REQUESTS:
+                self.update_progress(None, f"有 {len(pending)} 个文本未返回翻译，重新请求这些文本")
+        
+        if pending:
+            print(f"警告: {len(pending)} 个文本多次请求后仍未返回翻译，保留原文")
+            self._mark_failed([batch_texts[i] for i in pending])
+        
+        # 将翻译结果添加到结果字典中，缺失的翻译保留原文
+        batch_result = {}
+        for j, key in enumerate(batch_keys):
+            batch_result[key] = translations.get(j, text_dict[key])
+        
+        # 写入翻译缓存和检查点（未翻译成功、保留原文的文本不记录，流式接收时已写入检查点的不再重复写入）
+        translated = {
+            text_dict[key]: batch_result[key] for j, key in enumerate(batch_keys)
+            if batch_result[key] != text_dict[key] and j not in journaled
+        }
+        if self.cache is not None:
+            # 按实际完成翻译的模型写入缓存
+            by_model = {}
+            for j, key in enumerate(batch_keys):
+                if batch_result[key] != text_dict[key]:
+                    by_model.setdefault(translated_by[j], {})[text_dict[key]] = batch_result[key]
+            for model, model_translations in by_model.items():
+                self.cache.put_many(model_translations, model, PROMPT_VERSION)
+        self._append_journal(translated)
+        
+        return batch_result
+    
+    def _append_journal(self, translations):
+        """
+        将完成的翻译写入检查点
+        """
+        if self._journal is None:
+            return
+        try:
+            self._journal.append(translations)
+        except OSError as e:
+            print(f"写入检查点时出错: {str(e)}")
+    
     def _create_translation_prompt(self, texts):
         """
-        创建翻译提示
+        创建翻译提示，每条原文以[编号]开头，要求模型按编号输出
+        
+        使用原版术语表时，只把本批原文中出现的术语加入提示
         """
         prompt = """你是一个专业的Minecraft游戏翻译专家，请将以下Minecraft游戏或MOD中的英文（或其他非中文语言）文本翻译成简体中文。
 
 翻译要求：
 1. 保持Minecraft的游戏术语风格
 2. 对于物品名称、生物名称等，使用Minecraft中已有的官方中文翻译
-3. 保留原文中的格式标记（如%s, %d, {0}, $1等占位符）
+3. 原文中的<0>、<1>等标记代表占位符、颜色代码或换行，必须原样保留在译文的对应位置，不要修改、删除或增加
 4. 不要翻译命令名称和技术术语
 5. 翻译要简洁、准确、符合中文表达习惯
-6. 直接输出翻译结果，每行一个翻译，不要有多余的解释
-
-以下是需要翻译的文本：
+6. 每行输出一个翻译，行首保留原文的[编号]，不要有多余的解释
 """
         
-        for text in texts:
-            prompt += f"{text}\n"
+        terms = self._job_glossary.find_terms(texts) if self._job_glossary is not None else {}
+        if terms:
+            prompt += "\n术语表（原文中出现以下名称时，必须使用对应的官方译名）：\n"
+            for term, translation in terms.items():
+                prompt += f"{term} = {translation}\n"
+        
+        prompt += "\n以下是需要翻译的文本，每行以[编号]开头：\n"
         
-        prompt += "\n请按照原文顺序，直接输出翻译结果，每行一个翻译："
+        for i, text in enumerate(texts, start=1):
+            prompt += f"[{i}] {text}\n"
+        
+        prompt += "\n请按照以下格式输出翻译结果，每行一个，不要遗漏或合并编号：\n[1] 第一条的翻译\n[2] 第二条的翻译"
         
         return prompt
     
-    def _call_translation_api(self, prompt, original_texts):
+    def _parse_translation_response(self, content, count):
+        """
+        按编号解析模型输出的翻译结果
+        
+        支持 "[1] 译文"、"1. 译文"、"1：译文" 等行格式，以及 {"1": "译文"} 形式的JSON。
+        编号超出范围、重复或译文为空的行会被忽略。
+        
+        Args:
+            content: 模型输出的文本
+            count: 本次请求的原文数量
+            
+        Returns:
+            翻译结果 {批次内序号(从0开始): 译文}
+        """
+        result = {}
+        if not content:
+            return result
+        
+        def add(number, text):
+            if not isinstance(text, str):
+                return
+            text = text.strip()
+            try:
+                index = int(number) - 1
+            except (TypeError, ValueError):
+                return
+            if 0 <= index < count and text and index not in result:
+                result[index] = text
+        
+        # 尝试解析JSON格式的输出（可能包含在代码块中）
+        stripped = content.strip()
+        if stripped.startswith("```"):
+            stripped = stripped.strip("`")
+            if stripped.startswith("json"):
+                stripped = stripped[4:]
+            stripped = stripped.strip()
+        if stripped.startswith("{") or stripped.startswith("["):
+            try:
+                data = json.loads(stripped)
+                if isinstance(data, dict):
+                    for number, text in data.items():
+                        add(number, text)
+                elif isinstance(data, list):
+                    for item in data:
+                        if isinstance(item, dict):
+                            add(item.get("id"), item.get("text") or item.get("translation"))
+                if result:
+                    return result
+            except ValueError:
+                pass
+        
+        # 按行解析带编号的输出，没有方括号编号时再尝试 "1. 译文" 格式
+        lines = [line.strip() for line in content.split("\n") if line.strip()]
+        for pattern in (RESPONSE_LINE_PATTERN, RESPONSE_BARE_LINE_PATTERN):
+            for line in lines:
+                match = pattern.match(line)
+                if match:
+                    add(match.group(1), match.group(2))
+            if result:
+                break
+        
+        # 没有编号的行不按顺序对应（合并或拆分的行会使译文错位），缺失的文本由补充请求重新翻译
+        return result
+    
+    def _call_translation_api(self, prompt, expected_count=None, on_line=None):
+        """
+        调用翻译API，并在运行报告中记录请求耗时和模型生成统计
+        
+        Args:
+            prompt: 翻译提示
+            expected_count: 本次请求的原文数量
+            on_line: 流式接收时每收到完整的一行译文调用 on_line(编号, 译文)
+            
+        Returns:
+            (模型输出的文本内容, 使用的模型)
+        """
+        # 使用多个节点时，选择正在进行的请求最少的节点
+        endpoint = self.endpoint_pool.acquire() if self.endpoint_pool is not None else None
+        endpoint_url = endpoint.url if endpoint is not None else None
+        model = endpoint.model if endpoint is not None else self.model
+        usage = {}
+        start = time.perf_counter()
+        try:
+            content = self._send_translation_request(prompt, expected_count, usage, endpoint, on_line)
+        except Exception as e:
+            error_kind = get_error_kind(e)
+            if endpoint is not None:
+                self.endpoint_pool.release(endpoint, error_kind)
+            self.report.record_request(time.perf_counter() - start, expected_count, error_kind=error_kind, endpoint=endpoint_url)
+            raise
+        if endpoint is not None:
+            self.endpoint_pool.release(endpoint)
+        self.report.record_request(time.perf_counter() - start, expected_count, usage=usage, endpoint=endpoint_url)
+        return content, model
+    
+    def _send_translation_request(self, prompt, expected_count=None, usage=None, endpoint=None, on_line=None):
         """
-        调用翻译API
+        发送翻译请求
+        
+        Args:
+            prompt: 翻译提示
+            expected_count: 本次请求的原文数量（流式模式下用于报告进度）
+            usage: 用于接收模型生成统计（eval_count等）的字典
+            endpoint: 使用的翻译节点（endpoint_pool.Endpoint），为None时使用api_url和model
+            on_line: 流式接收时每收到完整的一行译文调用 on_line(编号, 译文)
+            
+        Returns:
+            模型输出的文本内容
         """
+        if endpoint is not None:
+            api_url, model, api_key = endpoint.url, endpoint.model, endpoint.api_key
+        else:
+            api_url, model, api_key = self.api_url, self.model, self.api_key
+        
         # 打印API调用信息，便于调试
-        print(f"正在调用翻译API...")
-        print(f"使用模型: {self.model}")
+        self._debug(f"正在调用翻译API...")
+        self._debug(f"使用模型: {model}")
         
         # 确保API URL是正确的
-        api_url = self.api_url
         # 移除可能的尾部斜杠
         if api_url.endswith("/"):
             api_url = api_url[:-1]
         
-        print(f"使用API端点: {api_url}")
+        self._debug(f"使用API端点: {api_url}")
         
         # 准备请求头
         headers = {
             "Content-Type": "application/json"
         }
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
         
         # 准备请求数据 - 按照Ollama API格式
         data = {
-            "model": self.model,
-            "prompt": f"你是一个专业的Minecraft游戏翻译专家，擅长将游戏文本翻译成简体中文。\n\n{prompt}",
-            "stream": False
+            "model": model,
+            "prompt": f"{SYSTEM_PROMPT}\n\n{prompt}",
+            "stream": bool(self.stream_response)
         }
         
         try:
             # 发送POST请求
-            print(f"发送请求到: {api_url}")
-            response = requests.post(api_url, headers=headers, json=data, timeout=60)
+            self._debug(f"发送请求到: {api_url}")
+            if self.stream_response:
+                # 流式模式下读取超时即空闲超时：只要模型持续输出就不会超时
+                response = self._get_session().post(
+                    api_url,
+                    headers=headers,
+                    json=data,
+                    timeout=(self.connect_timeout, self.stream_idle_timeout),
+                    stream=True
+                )
+            else:
+                response = self._get_session().post(
+                    api_url,
+                    headers=headers,
+                    json=data,
+                    timeout=(self.connect_timeout, self.read_timeout)
+                )
             
             # 检查响应状态
             if response.status_code != 200:
                 error_msg = f"API返回错误状态码: {response.status_code} - {response.reason}"
                 if response.text:
                     error_msg += f"\n响应内容: {response.text[:200]}..."
-                raise Exception(error_msg)
+                if response.status_code == 429:
+                    retry_after = response.headers.get("Retry-After")
+                    raise TranslationAPIError(
+                        error_msg,
+                        kind=ERROR_RATE_LIMITED,
+                        retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+                    )
+                if response.status_code >= 500:
+                    raise TranslationAPIError(error_msg, kind=ERROR_SERVER)
+                raise TranslationAPIError(error_msg, kind=ERROR_CLIENT)
+            
+            # 流式响应逐块读取
+            if self.stream_response:
+                with response:
+                    return self._read_stream_response(response, expected_count, usage, on_line)
             
             # 解析JSON响应
             try:
                 result = response.json()
-                print("成功解析API响应为JSON")
+                self._debug("成功解析API响应为JSON")
             except ValueError as json_err:
                 # 如果返回的是HTML而不是JSON，可能是API URL错误
                 if "<!doctype html>" in response.text.lower():
-                    raise Exception(f"API URL可能指向了Web界面而不是API端点。请检查API URL配置。\n响应内容: {response.text[:200]}...")
+                    raise TranslationAPIError(f"API URL可能指向了Web界面而不是API端点。请检查API URL配置。\n响应内容: {response.text[:200]}...", kind=ERROR_CLIENT)
                 else:
-                    raise Exception(f"无法解析API响应为JSON: {json_err}\n响应内容: {response.text[:200]}...")
+                    raise TranslationAPIError(f"无法解析API响应为JSON: {json_err}\n响应内容: {response.text[:200]}...", kind=ERROR_MALFORMED)
             
             # 处理翻译结果 - 根据API响应格式提取内容
             content = ""
@@ -543,11 +1585,11 @@ class MinecraftTranslator:
             if "response" in result:
                 # 标准Ollama格式
                 content = result["response"]
-                print("使用Ollama响应格式解析结果")
+                self._debug("使用Ollama响应格式解析结果")
             elif "results" in result and len(result["results"]) > 0:
                 # OpenWebUI格式
                 content = result["results"][0]["text"]
-                print("使用OpenWebUI响应格式解析结果")
+                self._debug("使用OpenWebUI响应格式解析结果")
             elif "choices" in result and len(result["choices"]) > 0:
                 # OpenAI格式
                 if "message" in result["choices"][0]:
@@ -556,34 +1598,130 @@ class MinecraftTranslator:
                     content = result["choices"][0]["text"]
                 else:
                     print(f"警告: 未知的API响应格式: {result}")
-                    return original_texts
             else:
                 print(f"警告: 无法识别的API响应格式: {result}")
-                return original_texts
             
-            # 解析翻译结果
-            lines = [line.strip() for line in content.split("\n") if line.strip()]
-            
-            # 过滤掉可能的非翻译行（如解释性文本）
-            translated_texts = []
-            for line in lines:
-                if not line.startswith("原文") and not line.startswith("翻译") and not line.startswith("注"):
-                    translated_texts.append(line)
-            
-            # 确保翻译结果数量与原文数量一致
-            if len(translated_texts) < len(original_texts):
-                print(f"警告: 翻译结果数量 ({len(translated_texts)}) 少于原文数量 ({len(original_texts)})")
-                # 对于缺失的翻译，使用原文
-                while len(translated_texts) < len(original_texts):
-                    translated_texts.append(original_texts[len(translated_texts)])
-            
-            return translated_texts[:len(original_texts)]
+            if usage is not None:
+                usage.update(extract_usage(result))
+            return content or ""
             
+        except requests.exceptions.Timeout as e:
+            self._debug(f"调用翻译API超时: {str(e)}")
+            raise TranslationAPIError(f"调用翻译API超时: {str(e)}", kind=ERROR_TIMEOUT)
+        except requests.exceptions.ConnectionError as e:
+            self._debug(f"无法连接翻译API: {str(e)}")
+            raise TranslationAPIError(f"无法连接翻译API: {str(e)}", kind=ERROR_CONNECTION)
         except Exception as e:
             error_msg = str(e)
-            print(f"调用翻译API时出错: {error_msg}")
-            # 将错误信息传递给上层函数
-            raise Exception(f"调用翻译API时出错: {error_msg}")
+            self._debug(f"调用翻译API时出错: {error_msg}")
+            # 将错误信息和错误类型传递给上层函数
+            raise TranslationAPIError(
+                f"调用翻译API时出错: {error_msg}",
+                kind=get_error_kind(e),
+                retry_after=getattr(e, "retry_after", None)
+            )
+    
+    def _read_stream_response(self, response, expected_count=None, usage=None, on_line=None):
+        """
+        读取流式响应（Ollama的NDJSON或OpenAI兼容接口的SSE），
+        每收到完整的一行翻译就报告一次进度，并交给on_line(编号, 译文)处理（如写入检查点）
+        
+        Ollama在最后一个数据块中返回eval_count等统计，会写入usage
+        Returns:
+            拼接后的模型输出文本
+        """
+        content_parts = []
+        pending_line = ""
+        completed = 0
+        last_report = 0.0
+        
+        try:
+            for raw_line in response.iter_lines():
+                if not raw_line:
+                    continue
+                line = raw_line.decode('utf-8', errors='ignore').strip()
+                
+                # OpenAI兼容接口使用SSE格式
+                if line.startswith("data:"):
+                    line = line[5:].strip()
+                    if line == "[DONE]":
+                        break
+                
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    raise TranslationAPIError(f"无法解析流式响应: {line[:200]}", kind=ERROR_MALFORMED)
+                
+                if chunk.get("error"):
+                    raise TranslationAPIError(f"API返回错误: {chunk['error']}", kind=ERROR_SERVER)
+                
+                # 提取本次输出的文本片段
+                piece = chunk.get("response", "")
+                if not piece and chunk.get("choices"):
+                    choice = chunk["choices"][0]
+                    piece = (choice.get("delta") or {}).get("content") or choice.get("text") or ""
+                
+                if piece:
+                    content_parts.append(piece)
+                    pending_line += piece
+                    # 统计已经完整输出的翻译行
+                    while "\n" in pending_line:
+                        done_line, pending_line = pending_line.split("\n", 1)
+                        match = RESPONSE_LINE_PATTERN.match(done_line.strip())
+                        if match:
+                            completed += 1
+                            if on_line is not None:
+                                on_line(int(match.group(1)), match.group(2))
+                            # 限制进度消息频率，避免刷屏
+                            now = time.monotonic()
+                            if now - last_report >= STREAM_PROGRESS_INTERVAL:
+                                last_report = now
+                                total = f"/{expected_count}" if expected_count else ""
+                                self.update_progress(None, f"流式接收翻译: 已完成 {completed}{total} 条")
+                
+                if usage is not None:
+                    usage.update(extract_usage(chunk))
+                
+                if chunk.get("done"):
+                    break
+        except requests.exceptions.ConnectionError as e:
+            # requests在读取流时将读取超时包装为ConnectionError
+            if "timed out" in str(e).lower():
+                raise TranslationAPIError(f"流式响应超过 {self.stream_idle_timeout} 秒没有新数据", kind=ERROR_TIMEOUT)
+            raise
+        
+        return "".join(content_parts)
+    
+    def _get_session(self):
+        """
+        获取共享的HTTP会话（带连接池和keep-alive，线程安全）
+        """
+        pool_size = max(self.pool_size or 0, self.max_workers)
+        with self._session_lock:
+            # 并发数调大后重建会话，保证每个线程都能拿到连接
+            if self._session is None or self._session_pool_size != pool_size:
+                if self._session is not None:
+                    self._session.close()
+                session = requests.Session()
+                # 每个主机使用一个连接池，节点较多时保留所有节点的连接池，避免keep-alive连接被淘汰
+                host_count = len(self.endpoint_pool.endpoints) if self.endpoint_pool is not None else 1
+                adapter = HTTPAdapter(pool_connections=max(4, host_count), pool_maxsize=pool_size, pool_block=True)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+                self._session_pool_size = pool_size
+            return self._session
+    
+    def close(self):
+        """
+        关闭HTTP会话，释放连接池中的连接
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        if self.endpoint_pool is not None and self._owns_endpoint_pool:
+            self.endpoint_pool.close()
     
     def _create_resourcepack_metadata(self, pack_dir):
         """
@@ -603,6 +1741,27 @@ class MinecraftTranslator:
         # 创建assets目录
         os.makedirs(os.path.join(pack_dir, "assets"), exist_ok=True)
     
+    def write_resourcepack(self, pack_entries, output_path):
+        """
+        把中文语言文件写入资源包
+        
+        Args:
+            pack_entries: 资源包中的文件 {条目名称: 字节内容}
+            output_path: 资源包路径
+        """
+        pack_dir = tempfile.mkdtemp(prefix="minecraft_translator_")
+        try:
+            with self.report.stage("package"):
+                self._create_resourcepack_metadata(pack_dir)
+                for name, data in pack_entries.items():
+                    file_path = os.path.join(pack_dir, *name.split("/"))
+                    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                    with open(file_path, 'wb') as f:
+                        f.write(data)
+                jar_utils.write_directory_zip(pack_dir, output_path, self.output_codec)
+        finally:
+            shutil.rmtree(pack_dir, ignore_errors=True)
+    
     def _create_output_path(self, input_path, suffix):
         """
         创建输出文件路径
@@ -616,20 +1775,162 @@ class MinecraftTranslator:
         
         return os.path.join(dir_name, new_name)
     
-    def _is_chinese(self, text):
+    def _get_output_cache_key(self, lang_files, options):
+        """
+        生成MOD语言文件的输出缓存键，未启用输出缓存时返回None
+        
+        Args:
+            lang_files: [(条目名称, 语言文件字节内容, 已有中文语言文件字节内容或None)]
+            options: 翻译选项
+        """
+        if self.output_cache is None:
+            return None
+        return make_output_key(lang_files, self._get_model_key(), PROMPT_VERSION, options, self._job_glossary)
+    
+    def _triage(self, text):
+        """
+        对文本分类（triage.classify）并计入任务统计
+        """
+        kind = classify(text)
+        counts = self.job_stats["triage"]
+        counts[kind] = counts.get(kind, 0) + 1
+        return kind
+    
+    def _reset_job_stats(self, job_type=None, source=None):
+        """
+        重置任务统计信息（每次翻译任务开始时调用）
+        
+        Args:
+            job_type: 任务类型（mod或minecraft）
+            source: 要翻译的MOD文件或版本文件夹路径
+        """
+        # 任务内已翻译的文本 {原文: 译文}，用于跨键、跨文件去重
+        self._job_translations = {}
+        # 任务内重试后仍未能翻译的原文
+        self._failed_texts = set()
+        self.job_stats = {
+            "total_strings": 0,
+            "unique_strings": 0,
+            "reused_strings": 0,
+            "glossary_hits": 0,
+            "resumed_strings": 0,
+            "output_cache_hits": 0,
+            # 语言文件中各类文本的数量（只有需要翻译的文本会发送给模型）
+            "triage": {},
+            "untranslated_keys": []
+        }
+        # 本次任务使用的术语表（翻译Minecraft版本时可能使用该版本自带的中文翻译）
+        self._job_glossary = self.glossary
+        # 本次任务的运行报告
+        self.report = RunReport(job_type, source, self.model, self.api_url)
+        # 本次任务的检查点日志
+        self._journal = None
+    
+    def _run_job(self, func, *args):
+        """
+        执行翻译任务，结束后生成运行报告
+        
+        设置了检查点目录时，每个完成的批次都会写入检查点；任务失败或有文本未能翻译时保留检查点，
+        重新运行同一任务时从中断处继续，只有所有文本都翻译成功后才删除检查点。
+        
+        Returns:
+            func的返回值（输出文件路径）
+        """
+        self._open_checkpoint()
+        try:
+            output_path = func(*args)
+        except Exception as e:
+            if self._journal is not None:
+                self._journal.close()
+                if self._journal.translations:
+                    self.update_progress(None, f"已完成的 {len(self._journal.translations)} 个翻译已保存到检查点，重新运行该任务时将从中断处继续")
+            self._finish_report("failed", error=str(e))
+            raise
+        if self._journal is not None:
+            if self._failed_texts or self.job_stats["untranslated_keys"]:
+                self._journal.close()
+                self.update_progress(None, "有文本未能翻译，检查点已保留，重新运行该任务时只需翻译这些文本")
+            else:
+                self._journal.remove()
+        self._finish_report("ok", output=output_path)
+        return output_path
+    
+    def _open_checkpoint(self):
+        """
+        打开本次任务的检查点日志，读取上次中断时已完成的翻译
+        """
+        if not self.checkpoint_dir:
+            return
+        job_id = make_job_id(self.report.job_type, self.report.source, self._get_model_key(), PROMPT_VERSION)
+        self._journal = CheckpointJournal(os.path.join(self.checkpoint_dir, f"{job_id}.jsonl"))
+        try:
+            resumed = self._journal.load()
+        except OSError as e:
+            print(f"读取检查点时出错: {str(e)}")
+            return
+        if resumed:
+            self.update_progress(None, f"发现未完成任务的检查点，已恢复 {len(resumed)} 个翻译")
+    
+    def _finish_report(self, status, output=None, error=None):
+        """
+        结束运行报告，设置了报告目录时保存为JSON文件
+        """
+        self.report.finish(status, output=output, error=error, job_stats=self.job_stats)
+        self.last_report_path = None
+        if not self.report_dir:
+            return
+        try:
+            self.last_report_path = self.report.save(self.report_dir)
+            self.update_progress(None, f"运行报告已保存: {self.last_report_path}")
+        except OSError as e:
+            print(f"保存运行报告时出错: {str(e)}")
+    
+    def log_job_summary(self):
+        """
+        输出任务统计摘要
+        """
+        total = self.job_stats["total_strings"]
+        unique = self.job_stats["unique_strings"]
+        dedup_ratio = 1 - unique / total if total else 0.0
+        self.job_stats["dedup_ratio"] = dedup_ratio
+        self.update_progress(None, f"任务统计: 共 {total} 个待翻译文本，去重后 {unique} 个，去重率 {dedup_ratio:.1%}")
+        if self.job_stats["reused_strings"]:
+            self.update_progress(None, f"增量翻译: 沿用已有中文翻译 {self.job_stats['reused_strings']} 个")
+        if self.job_stats["resumed_strings"]:
+            self.update_progress(None, f"断点续传: 从检查点恢复 {self.job_stats['resumed_strings']} 个")
+        if self.job_stats["output_cache_hits"]:
+            self.update_progress(None, f"输出缓存: {self.job_stats['output_cache_hits']} 个MOD的语言文件未变化，直接使用缓存的汉化结果")
+        if self.job_stats["glossary_hits"]:
+            self.update_progress(None, f"原版术语表: 直接使用官方译文 {self.job_stats['glossary_hits']} 个")
+        triage = self.job_stats["triage"]
+        if triage:
+            counts = "，".join(f"{label} {triage[kind]}" for kind, label in TRIAGE_LABELS.items() if triage.get(kind))
+            self.update_progress(None, f"文本分类: {counts}")
+        
+        untranslated = self.job_stats["untranslated_keys"]
+        if untranslated:
+            self.update_progress(None, f"警告: {len(untranslated)} 个键未能翻译，保留原文:")
+            for key in untranslated[:UNTRANSLATED_REPORT_LIMIT]:
+                self.update_progress(None, f"  {key}")
+            if len(untranslated) > UNTRANSLATED_REPORT_LIMIT:
+                self.update_progress(None, f"  ……等共 {len(untranslated)} 个（完整列表见任务统计）")
+    
+    def _debug(self, message):
         """
-        检查文本是否包含中文字符
+        输出调试信息（仅在详细模式下）
         """
-        for char in text:
-            if '\u4e00' <= char <= '\u9fff':
-                return True
-        return False
+        if self.verbose:
+            print(message)
     
-    def _update_progress(self, progress=None, message=None):
+    def update_progress(self, progress=None, message=None):
         """
-        更新进度
+        更新进度（可能在多个翻译线程中同时调用）
         """
-        if self.progress_callback:
-            self.progress_callback(progress if progress is not None else 0, message)
-        elif message:
-            print(message)
\ No newline at end of file
+        with self._progress_lock:
+            # 未指定进度时沿用上一次的进度，避免进度条在批次消息中回退
+            if progress is not None:
+                self._last_progress = progress
+            if self.progress_callback:
+                self.progress_callback(self._last_progress, message)
+            elif message:
+                print(message)
\ No newline at end of file
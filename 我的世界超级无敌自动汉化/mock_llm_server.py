@@ -0,0 +1,250 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 提示中原文部分的起止标记（与MinecraftTranslator._create_translation_prompt一致）
+TEXT_START_MARKER = "以下是需要翻译的文本"
+TEXT_END_MARKER = "\n\n请按照"
+
+# 带编号的原文行
+TEXT_LINE_PATTERN = re.compile(r'^\[(\d+)\] (.*)$')
+
+# 模拟翻译结果的前缀
+TRANSLATION_PREFIX = "译·"
+
+def extract_texts(prompt):
+    """
+    从翻译提示中提取需要翻译的原文
+
+    Returns:
+        [(编号, 原文)] 列表
+    """
+    if TEXT_START_MARKER not in prompt:
+        return []
+    body = prompt.split(TEXT_START_MARKER, 1)[1]
+    body = body.split(TEXT_END_MARKER, 1)[0]
+    texts = []
+    for line in body.split("\n"):
+        match = TEXT_LINE_PATTERN.match(line)
+        if match:
+            texts.append((match.group(1), match.group(2)))
+    return texts
+
+def fake_translate(text):
+    """
+    生成模拟译文
+    """
+    return f"{TRANSLATION_PREFIX}{text}"
+
+class MockLLMServer:
+    """
+    模拟LLM翻译后端，用于基准测试
+
+    支持Ollama /api/generate、OpenAI和OpenWebUI三种响应格式以及流式响应，
+    可以配置响应延迟和失败率。
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 failure_rate=0.0, response_format="ollama", per_text_latency=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.response_format = response_format
+        # 每条原文额外增加的延迟，模拟生成时间与输出长度相关
+        self.per_text_latency = per_text_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def reset_stats(self):
+        """
+        重置请求统计
+        """
+        with self._lock:
+            self.stats = {
+                "requests": 0,
+                "failures": 0,
+                "texts": 0,
+                "in_flight": 0,
+                "max_in_flight": 0
+            }
+
+    def start(self):
+        """
+        在后台线程中启动服务器
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止服务器
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def _should_fail(self):
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def _delay(self, text_count):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        delay = max(0.0, self.latency + jitter + self.per_text_latency * text_count)
+        if delay:
+            time.sleep(delay)
+
+    def build_response(self, content, eval_seconds=0.0):
+        """
+        按配置的格式构建响应体（包含模拟的生成token统计）
+        """
+        eval_count = max(1, len(content) // 4)
+        if self.response_format == "openai":
+            return {
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {"completion_tokens": eval_count}
+            }
+        if self.response_format == "openwebui":
+            return {"results": [{"text": content}]}
+        return {
+            "model": "mock", "response": content, "done": True,
+            "eval_count": eval_count, "eval_duration": int(eval_seconds * 1e9)
+        }
+
+    def build_stream_chunk(self, piece):
+        """
+        构建流式响应中的一个数据块（Ollama为NDJSON，OpenAI为SSE）
+        """
+        if self.response_format == "openai":
+            payload = {"choices": [{"delta": {"content": piece}}]}
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+        payload = {"model": "mock", "response": piece, "done": False}
+        return (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def build_stream_end(self, eval_count=0, eval_seconds=0.0):
+        """
+        构建流式响应的结束标记（Ollama在最后一个数据块中返回生成统计）
+        """
+        if self.response_format == "openai":
+            return b"data: [DONE]\n\n"
+        payload = {
+            "model": "mock", "response": "", "done": True,
+            "eval_count": eval_count, "eval_duration": int(eval_seconds * 1e9)
+        }
+        return (json.dumps(payload) + "\n").encode("utf-8")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, lines):
+                # HTTP/1.0下不设置Content-Length，数据发送完毕后关闭连接
+                self.send_response(200)
+                content_type = "text/event-stream" if server.response_format == "openai" else "application/x-ndjson"
+                self.send_header("Content-Type", content_type)
+                self.end_headers()
+                start = time.perf_counter()
+                for line in lines:
+                    if server.per_text_latency:
+                        time.sleep(server.per_text_latency)
+                    self.wfile.write(server.build_stream_chunk(line + "\n"))
+                    self.wfile.flush()
+                eval_count = max(1, sum(len(line) + 1 for line in lines) // 4)
+                self.wfile.write(server.build_stream_end(eval_count, time.perf_counter() - start))
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length).decode("utf-8"))
+                except ValueError:
+                    self._send_json(400, {"error": "invalid json"})
+                    return
+
+                with server._lock:
+                    server.stats["requests"] += 1
+                    server.stats["in_flight"] += 1
+                    server.stats["max_in_flight"] = max(server.stats["max_in_flight"], server.stats["in_flight"])
+
+                try:
+                    prompt = request.get("prompt", "")
+                    texts = extract_texts(prompt)
+                    stream = bool(request.get("stream"))
+                    # 流式响应只等待首个数据块的延迟，每行的延迟在发送时计算
+                    start = time.perf_counter()
+                    server._delay(0 if stream else len(texts))
+
+                    if server._should_fail():
+                        with server._lock:
+                            server.stats["failures"] += 1
+                        self._send_json(500, {"error": "mock failure"})
+                        return
+
+                    with server._lock:
+                        server.stats["texts"] += len(texts)
+                    lines = [f"[{number}] {fake_translate(text)}" for number, text in texts]
+                    if stream:
+                        self._send_stream(lines)
+                    else:
+                        self._send_json(200, server.build_response("\n".join(lines), time.perf_counter() - start))
+                finally:
+                    with server._lock:
+                        server.stats["in_flight"] -= 1
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="模拟LLM翻译后端")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.2, help="每个请求的基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟的随机波动范围（秒）")
+    parser.add_argument("--per-text-latency", type=float, default=0.0, help="每条原文增加的延迟（秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="请求失败的概率（0~1）")
+    parser.add_argument("--format", default="ollama", choices=["ollama", "openai", "openwebui"], help="响应格式")
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        response_format=args.format,
+        per_text_latency=args.per_text_latency
+    )
+    print(f"模拟翻译后端已启动: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
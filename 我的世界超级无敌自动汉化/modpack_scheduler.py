@@ -0,0 +1,226 @@
+import os
+import json
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+# 同时写出汉化JAR的线程数
+WRITER_WORKERS = 2
+
+def format_untranslated_error(count):
+    """
+    有键未能翻译时MOD的失败原因
+    """
+    return f"{count} 个键未能翻译，已保留原文"
+
+class ModState:
+    """
+    整合包中单个MOD的翻译状态
+    """
+    def __init__(self, path):
+        self.path = path
+        self.name = os.path.basename(path)
+        # MOD中的语言文件（minecraft_translator.ModLanguageFiles）
+        self.mod_files = None
+        # 尚未翻译完成的原文
+        self.pending = set()
+        self.string_count = 0
+        # 未能翻译（保留原文）的键数量，大于0时MOD记为失败
+        self.untranslated = 0
+        self.submitted = False
+
+class ModpackScheduler:
+    """
+    整合包批量汉化的全局批次调度
+
+    先读取所有MOD的语言文件，把需要翻译的文本放入同一个队列，跨文件、跨MOD打包成完整的批次，
+    避免每个小MOD单独发送只有几条文本的请求；某个MOD的文本全部翻译完成后立即写出它的汉化JAR。
+
+    指定resourcepack_path时不生成汉化JAR，所有MOD的中文语言文件合并写入一个资源包，原JAR保持不变；
+    资源包只通过resourcepack事件报告一次，各MOD的结果中不再重复记录输出路径。
+    """
+    def __init__(self, translator, options=None, on_event=None, output_suffix="_汉化版", resourcepack_path=None):
+        self.translator = translator
+        self.options = options or {}
+        # 每个MOD完成或失败时的回调 on_event(事件, **字段)，可能在写出线程中调用
+        self.on_event = on_event
+        self.output_suffix = output_suffix
+        self.resourcepack_path = resourcepack_path
+        # 资源包模式下收集的各MOD的中文语言文件 {MOD路径: {条目名称: 字节内容}}
+        self._collected = {}
+        self.results = {}
+        self._states = []
+        self._translations = {}
+        # 原文 -> 等待该原文的MOD列表
+        self._waiting = {}
+        self._lock = threading.Lock()
+        self._writer = None
+        self._futures = []
+
+    def run(self, mod_paths, progress_callback=None):
+        """
+        汉化整合包中的所有MOD
+
+        Returns:
+            结果列表，顺序与mod_paths一致
+        """
+        source = os.path.commonpath([os.path.abspath(path) for path in mod_paths]) if mod_paths else ""
+        try:
+            self.translator.run_job("modpack", source, self._run, mod_paths, progress_callback=progress_callback)
+        except Exception as e:
+            # 翻译中止时，尚未写出的MOD全部记为失败
+            for path in mod_paths:
+                if path not in self.results:
+                    self._fail(path, e)
+        return [self.results[path] for path in mod_paths]
+
+    def _run(self, mod_paths):
+        translator = self.translator
+        translator.update_progress(5, f"读取 {len(mod_paths)} 个MOD的语言文件")
+        for path in mod_paths:
+            try:
+                self._states.append(self._prepare_mod(path))
+            except Exception as e:
+                self._fail(path, e)
+
+        # 所有MOD的文本放入同一个翻译队列
+        text_dict = {}
+        for state in self._states:
+            texts = state.mod_files.get_texts(f"{state.name}/")
+            for text in texts.values():
+                if text not in state.pending:
+                    state.pending.add(text)
+                    self._waiting.setdefault(text, []).append(state)
+            state.string_count = len(texts)
+            text_dict.update(texts)
+        translator.update_progress(20, f"共 {len(text_dict)} 个文本需要翻译，来自 {len(self._states)} 个MOD")
+
+        with ThreadPoolExecutor(max_workers=WRITER_WORKERS) as writer:
+            self._writer = writer
+            # 不需要调用API的MOD（没有新文本）直接写出
+            self._on_batch_done({})
+            translator.translate_texts(text_dict, on_batch_done=self._on_batch_done)
+            for future in list(self._futures):
+                future.result()
+
+        if self.resourcepack_path:
+            outputs = [self.resourcepack_path] if self._write_resourcepack() else []
+        else:
+            outputs = [result["output"] for result in self.results.values() if result["ok"]]
+
+        translator.log_job_summary()
+        return outputs
+
+    def _prepare_mod(self, path):
+        """
+        读取MOD中的语言文件，筛选需要翻译的文本
+        """
+        state = ModState(path)
+        with zipfile.ZipFile(path, 'r') as zip_ref:
+            state.mod_files = self.translator.load_mod_lang_files(zip_ref, self.options)
+        return state
+
+    def _on_batch_done(self, translations):
+        """
+        一个批次翻译完成：记录结果，文本全部完成的MOD交给写出线程
+        """
+        ready = []
+        with self._lock:
+            self._translations.update(translations)
+            for text in translations:
+                for state in self._waiting.pop(text, ()):
+                    state.pending.discard(text)
+            for state in self._states:
+                if not state.submitted and not state.pending:
+                    state.submitted = True
+                    ready.append(state)
+        for state in ready:
+            self._futures.append(self._writer.submit(self._write_mod, state))
+
+    def _write_mod(self, state):
+        """
+        生成MOD的中文语言文件并写出汉化JAR
+        """
+        translator = self.translator
+        try:
+            with self._lock:
+                translations = {text: self._translations[text] for text in state.mod_files.get_texts().values()
+                                if text in self._translations}
+            replacements, state.untranslated = translator.build_mod_payload(state.mod_files, translations)
+
+            if self.resourcepack_path:
+                self._collect(state, replacements)
+                return
+            output_path = translator.write_mod_jar(state.path, replacements, self.output_suffix)
+        except Exception as e:
+            self._fail(state.path, e)
+            return
+        finally:
+            # 写出后释放语言数据
+            state.mod_files = None
+
+        self._done(state, output_path)
+
+    def _done(self, state, output_path=None):
+        translator = self.translator
+        error = format_untranslated_error(state.untranslated) if state.untranslated else None
+        with self._lock:
+            if error:
+                self.results[state.path] = {"mod": state.path, "ok": False, "output": output_path, "error": error}
+            else:
+                self.results[state.path] = {"mod": state.path, "ok": True, "output": output_path}
+            done = len(self.results)
+        translator.update_progress(20 + 75 * done / max(1, len(self._states)), f"{state.name} 汉化完成 ({done} 个MOD)")
+        if not self.on_event:
+            return
+        fields = {"output": output_path} if output_path else {}
+        if error:
+            self.on_event("error", mod=state.name, error=error, strings=state.string_count, **fields)
+        else:
+            self.on_event("done", mod=state.name, strings=state.string_count, **fields)
+
+    def _collect(self, state, replacements):
+        """
+        资源包模式：收集MOD的中文语言文件，全部翻译完成后统一写入资源包
+        """
+        with self._lock:
+            self._collected[state.path] = replacements
+
+    def _write_resourcepack(self):
+        """
+        将收集的中文语言文件写入资源包
+
+        按MOD的顺序合并（与写出线程的完成顺序无关，相同输入生成相同的资源包），
+        多个MOD使用同一命名空间时合并其中的键。
+
+        Returns:
+            是否写出了资源包
+        """
+        translator = self.translator
+        states = [state for state in self._states if state.path in self._collected]
+        if not states:
+            return False
+        pack_entries = {}
+        for state in states:
+            for name, data in self._collected[state.path].items():
+                if name in pack_entries:
+                    merged = json.loads(pack_entries[name].decode('utf-8'))
+                    merged.update(json.loads(data.decode('utf-8')))
+                    data = json.dumps(merged, ensure_ascii=False, indent=4).encode('utf-8')
+                pack_entries[name] = data
+
+        translator.update_progress(95, f"打包汉化资源包: {os.path.basename(self.resourcepack_path)}")
+        translator.write_resourcepack(pack_entries, self.resourcepack_path)
+
+        self._collected = {}
+        if self.on_event:
+            self.on_event("resourcepack", output=self.resourcepack_path, mods=len(states))
+        for state in states:
+            self._done(state)
+        return True
+
+    def _fail(self, path, error):
+        with self._lock:
+            self.results[path] = {"mod": path, "ok": False, "error": str(error)}
+        if self.on_event:
+            self.on_event("error", mod=os.path.basename(path), error=str(error))
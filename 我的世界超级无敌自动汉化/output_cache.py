@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+import threading
+
+def make_output_key(lang_files, model, prompt_version, options, glossary=None):
+    """
+    根据MOD的语言文件内容和翻译设置生成输出缓存的键
+
+    Args:
+        lang_files: [(条目名称, 语言文件字节内容, 已有中文语言文件字节内容或None)]
+        model: 模型名称
+        prompt_version: 提示词版本
+        options: 翻译选项（包括键过滤规则）
+        glossary: 使用的术语表（glossary.Glossary），术语表不同时译文可能不同
+    """
+    digest = hashlib.sha256()
+    header = {
+        "model": model,
+        "prompt_version": prompt_version,
+        "options": options or {},
+        "glossary": glossary.fingerprint() if glossary is not None else None
+    }
+    digest.update(json.dumps(header, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    for name, data, existing_data in sorted(lang_files, key=lambda item: item[0]):
+        for part in (name.encode('utf-8'), data, existing_data or b""):
+            # 每段前写入长度，避免不同的拼接方式得到相同的摘要
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+    return digest.hexdigest()
+
+class OutputCache:
+    """
+    按内容寻址的汉化输出缓存
+
+    以 语言文件内容 + 模型 + 提示词版本 + 翻译选项 的摘要作为键，保存翻译生成的中文语言文件。
+    重新汉化没有变化的MOD时直接使用缓存的语言文件写出汉化JAR，不再请求翻译API。
+    条目数量超出max_entries时按最后使用时间淘汰最久未使用的条目。
+    """
+    def __init__(self, cache_dir, max_entries=2000):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 缓存中的条目数量，第一次写入时统计
+        self._count = None
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """
+        查找缓存的语言文件
+
+        Returns:
+            {条目名称: 字节内容}，未命中时返回None
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        # 更新修改时间作为最后使用时间，淘汰时保留最近使用的条目
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return {name: content.encode('utf-8') for name, content in entries.items()}
+
+    def put(self, key, replacements):
+        """
+        保存生成的语言文件 {条目名称: 字节内容}
+        """
+        path = self._get_path(key)
+        entries = {name: data.decode('utf-8') for name, data in replacements.items()}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            is_new = not os.path.exists(path)
+            # 先写入临时文件再替换，避免中断时留下不完整的缓存
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"保存输出缓存时出错: {str(e)}")
+            return
+
+        with self._lock:
+            if self._count is None:
+                self._count = len(self._list_entries())
+            elif is_new:
+                self._count += 1
+            self._evict()
+
+    def _list_entries(self):
+        """
+        列出缓存中的所有条目 [(最后使用时间, 文件路径)]
+        """
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        return entries
+
+    def _evict(self):
+        """
+        超出容量时淘汰最久未使用的条目（调用方需持有锁）
+        """
+        if not self.max_entries or self.max_entries <= 0 or self._count <= self.max_entries:
+            return
+
+        # 一次多淘汰一部分，避免每次写入都要遍历缓存目录
+        entries = sorted(self._list_entries())
+        target = int(self.max_entries * 0.9)
+        for _, path in entries[:max(0, len(entries) - target)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._count = min(len(entries), target)
@@ -0,0 +1,58 @@
+import re
+from collections import Counter
+
+# 需要保护的格式标记：
+#   %s、%d、%1$s、%.2f、%% 等printf风格占位符
+#   {0}、{name} 等格式化占位符
+#   §6、§l 等颜色/格式代码
+#   换行符（会破坏按行输出的翻译格式）
+#   $1 等编号占位符，以及原文中本身就出现的 <0> 形式标记（避免与替身标记混淆）
+PLACEHOLDER_PATTERN = re.compile(
+    r'%(?:\d+\$)?[-#+0,(]*\d*(?:\.\d+)?[sSdfbBhHcCxXoeEgGn%]'
+    r'|\{\d*\}|\{[A-Za-z_][A-Za-z0-9_.]*\}'
+    r'|§[0-9a-fk-orA-FK-OR]'
+    r'|\r?\n'
+    r'|\$\d+'
+    r'|<\d+>'
+)
+
+# 译文中的替身标记，兼容模型输出的全角尖括号和多余空格
+SENTINEL_PATTERN = re.compile(r'[<＜]\s*(\d+)\s*[>＞]')
+
+def mask_placeholders(text):
+    """
+    将文本中的格式标记替换为 <0>、<1> 等简短的替身标记
+
+    Returns:
+        (替换后的文本, 原格式标记列表)，列表下标即替身标记中的编号
+    """
+    tokens = []
+
+    def replace(match):
+        tokens.append(match.group(0))
+        return f"<{len(tokens) - 1}>"
+
+    masked = PLACEHOLDER_PATTERN.sub(replace, text)
+    return masked, tokens
+
+def restore_placeholders(text, tokens):
+    """
+    将译文中的替身标记还原为原格式标记
+
+    译文中替身标记的集合必须与原文完全一致（每个编号恰好出现一次），
+    否则说明模型丢失、重复或编造了格式标记，返回None。
+
+    Args:
+        text: 模型输出的译文
+        tokens: mask_placeholders返回的原格式标记列表
+
+    Returns:
+        还原后的译文，校验失败时返回None
+    """
+    found = Counter(int(number) for number in SENTINEL_PATTERN.findall(text))
+    if found != Counter(range(len(tokens))):
+        return None
+
+    if not tokens:
+        return text
+    return SENTINEL_PATTERN.sub(lambda match: tokens[int(match.group(1))], text)
@@ -0,0 +1,91 @@
+import time
+import random
+
+# 错误类型
+ERROR_TIMEOUT = "timeout"
+ERROR_CONNECTION = "connection"
+ERROR_SERVER = "server_error"
+ERROR_RATE_LIMITED = "rate_limited"
+ERROR_MALFORMED = "malformed"
+ERROR_CLIENT = "client_error"
+
+# 可以重试的错误类型
+RETRYABLE_ERRORS = (ERROR_TIMEOUT, ERROR_CONNECTION, ERROR_SERVER, ERROR_RATE_LIMITED, ERROR_MALFORMED)
+
+# 重试仍失败时，可以通过拆分批次缓解的错误类型（批次过大导致超时或输出混乱）
+SPLITTABLE_ERRORS = (ERROR_TIMEOUT, ERROR_SERVER, ERROR_MALFORMED)
+
+class TranslationAPIError(Exception):
+    """
+    翻译API调用失败
+
+    Attributes:
+        kind: 错误类型（timeout、connection、server_error、rate_limited、malformed、client_error）
+        retry_after: 服务器建议的重试等待时间（秒），没有时为None
+    """
+    def __init__(self, message, kind=ERROR_CLIENT, retry_after=None):
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after
+
+def get_error_kind(error):
+    """
+    获取异常的错误类型，未分类的异常视为客户端错误（不重试）
+    """
+    return getattr(error, "kind", ERROR_CLIENT)
+
+class RetryPolicy:
+    """
+    指数退避重试策略
+
+    第n次重试前等待 base_delay * 2^(n-1) 秒（不超过max_delay），
+    并在此基础上加入随机抖动，避免多个并发请求同时重试。
+    """
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=30.0, jitter=0.5, sleep=time.sleep):
+        # 总尝试次数（包含第一次请求）
+        self.attempts = max(1, int(attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # 抖动比例，0表示不抖动，0.5表示在 [50%, 100%] 的退避时间内随机
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self._sleep = sleep
+        self._random = random.Random()
+
+    def is_retryable(self, error):
+        return get_error_kind(error) in RETRYABLE_ERRORS
+
+    def get_delay(self, retry_number, error=None):
+        """
+        计算第retry_number次重试前的等待时间
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+        if self.jitter:
+            delay *= 1 - self.jitter * self._random.random()
+
+        # 服务器返回了Retry-After时至少等待该时间
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, min(float(retry_after), self.max_delay))
+        return delay
+
+    def call(self, func, on_retry=None):
+        """
+        调用func，遇到可重试的错误时按退避策略重试
+
+        Args:
+            func: 无参数的可调用对象
+            on_retry: 重试前的回调 on_retry(retry_number, error, delay)
+
+        Returns:
+            func的返回值，重试次数用完后抛出最后一次的异常
+        """
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return func()
+            except Exception as e:
+                if attempt >= self.attempts or not self.is_retryable(e):
+                    raise
+                delay = self.get_delay(attempt, e)
+                if on_retry:
+                    on_retry(attempt, e, delay)
+                self._sleep(delay)
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+from datetime import datetime
+
+from triage import TRIAGE_LABELS
+
+# 阶段名称及其在报告中的中文说明
+STAGE_LABELS = {
+    "extract": "解压MOD",
+    "read_jar": "读取JAR",
+    "find_files": "查找语言文件",
+    "parse_json": "解析语言文件",
+    "translate": "翻译（含API请求）",
+    "write_json": "生成语言文件",
+    "write_jar": "打包MOD",
+    "package": "打包资源包"
+}
+
+def _percentile(values, ratio):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[int(round((len(ordered) - 1) * ratio))]
+
+def extract_usage(result):
+    """
+    从API响应中提取模型生成统计
+
+    Ollama返回eval_count、eval_duration等字段（时间单位为纳秒），
+    OpenAI兼容接口返回usage.prompt_tokens和usage.completion_tokens。
+
+    Returns:
+        {prompt_tokens, output_tokens, prompt_eval_seconds, eval_seconds}，缺少的字段不包含
+    """
+    usage = {}
+    if not isinstance(result, dict):
+        return usage
+    if "eval_count" in result:
+        usage["output_tokens"] = result["eval_count"]
+    if "prompt_eval_count" in result:
+        usage["prompt_tokens"] = result["prompt_eval_count"]
+    if result.get("eval_duration"):
+        usage["eval_seconds"] = result["eval_duration"] / 1e9
+    if result.get("prompt_eval_duration"):
+        usage["prompt_eval_seconds"] = result["prompt_eval_duration"] / 1e9
+
+    openai_usage = result.get("usage")
+    if isinstance(openai_usage, dict):
+        if "completion_tokens" in openai_usage:
+            usage["output_tokens"] = openai_usage["completion_tokens"]
+        if "prompt_tokens" in openai_usage:
+            usage["prompt_tokens"] = openai_usage["prompt_tokens"]
+    return usage
+
+class RunReport:
+    """
+    单次翻译任务的运行报告：各阶段耗时、每次API请求的延迟和模型生成统计
+
+    各阶段耗时可能在多个线程中同时记录，所有修改都加锁。
+    """
+    def __init__(self, job_type=None, source=None, model=None, api_url=None):
+        self.job_type = job_type
+        self.source = source
+        self.model = model
+        self.api_url = api_url
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.elapsed = None
+        self.status = "running"
+        self.output = None
+        self.error = None
+        self.job_stats = {}
+        # 各阶段累计耗时 {阶段: {"seconds": 秒, "count": 次数}}
+        self.stages = {}
+        # 每次API请求的记录
+        self.requests = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        记录一个阶段的耗时，同名阶段的耗时累加
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start)
+
+    def add_stage_time(self, name, seconds):
+        with self._lock:
+            stage = self.stages.setdefault(name, {"seconds": 0.0, "count": 0})
+            stage["seconds"] += seconds
+            stage["count"] += 1
+
+    def record_request(self, latency, texts=None, error_kind=None, usage=None, endpoint=None):
+        """
+        记录一次API请求
+
+        Args:
+            latency: 请求耗时（秒，包含读取完整响应）
+            texts: 本次请求的原文数量
+            error_kind: 请求失败时的错误类型
+            usage: extract_usage返回的模型生成统计
+            endpoint: 处理请求的翻译节点（使用多个节点时）
+        """
+        record = {"latency": round(latency, 4), "texts": texts, "ok": error_kind is None}
+        if endpoint is not None:
+            record["endpoint"] = endpoint
+        if error_kind is not None:
+            record["error_kind"] = error_kind
+        if usage:
+            record.update(usage)
+        with self._lock:
+            self.requests.append(record)
+
+    def finish(self, status, output=None, error=None, job_stats=None):
+        """
+        结束任务并记录结果
+        """
+        self.elapsed = time.perf_counter() - self._start
+        self.status = status
+        self.output = output
+        self.error = error
+        if job_stats is not None:
+            self.job_stats = dict(job_stats)
+
+    def summarize_requests(self):
+        """
+        汇总API请求的延迟和吞吐量
+        """
+        with self._lock:
+            requests = list(self.requests)
+
+        latencies = [r["latency"] for r in requests if r["ok"]]
+        output_tokens = sum(r.get("output_tokens", 0) for r in requests)
+        eval_seconds = sum(r.get("eval_seconds", 0.0) for r in requests)
+        errors = {}
+        for r in requests:
+            if not r["ok"]:
+                errors[r["error_kind"]] = errors.get(r["error_kind"], 0) + 1
+        
+        # 各翻译节点的请求数、失败数和平均延迟
+        endpoints = {}
+        for r in requests:
+            if "endpoint" not in r:
+                continue
+            stats = endpoints.setdefault(r["endpoint"], {"count": 0, "failed": 0, "latency_total": 0.0})
+            stats["count"] += 1
+            if r["ok"]:
+                stats["latency_total"] += r["latency"]
+            else:
+                stats["failed"] += 1
+        for stats in endpoints.values():
+            succeeded = stats["count"] - stats["failed"]
+            latency_total = stats.pop("latency_total")
+            stats["latency_mean"] = round(latency_total / succeeded, 4) if succeeded else 0.0
+
+        return {
+            "count": len(requests),
+            "failed": len(requests) - len(latencies),
+            "errors": errors,
+            "texts": sum(r["texts"] or 0 for r in requests if r["ok"]),
+            "latency_mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_p95": _percentile(latencies, 0.95),
+            "latency_max": max(latencies) if latencies else 0.0,
+            "prompt_tokens": sum(r.get("prompt_tokens", 0) for r in requests),
+            "output_tokens": output_tokens,
+            # 模型生成速度（仅Ollama返回eval_duration时可用）
+            "output_tokens_per_sec": round(output_tokens / eval_seconds, 2) if eval_seconds else None,
+            "endpoints": endpoints
+        }
+
+    def to_dict(self):
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self._start
+        total_strings = self.job_stats.get("total_strings", 0)
+        with self._lock:
+            stages = {
+                name: {"seconds": round(stage["seconds"], 4), "count": stage["count"]}
+                for name, stage in self.stages.items()
+            }
+            requests = list(self.requests)
+        return {
+            "job_type": self.job_type,
+            "source": self.source,
+            "output": self.output,
+            "status": self.status,
+            "error": self.error,
+            "model": self.model,
+            "api_url": self.api_url,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "elapsed": round(elapsed, 4),
+            "strings_per_sec": round(total_strings / elapsed, 2) if elapsed else 0.0,
+            "stages": stages,
+            "request_summary": self.summarize_requests(),
+            "requests": requests,
+            "job_stats": self.job_stats
+        }
+
+    def save(self, report_dir):
+        """
+        将报告以JSON格式保存到report_dir
+
+        Returns:
+            报告文件路径
+        """
+        os.makedirs(report_dir, exist_ok=True)
+        name = os.path.splitext(os.path.basename(self.source or "job"))[0]
+        timestamp = datetime.fromtimestamp(self.started_at).strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(report_dir, f"{self.job_type or 'job'}_{name}_{timestamp}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+        return path
+
+def load_report(path):
+    """
+    读取保存的运行报告
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def format_report(report):
+    """
+    将运行报告（to_dict或load_report的结果）格式化为便于阅读的文本行
+    """
+    lines = [f"运行报告: {report.get('source')} ({report.get('status')})，"
+             f"总耗时 {report['elapsed']:.2f} 秒，{report.get('strings_per_sec', 0):.1f} 文本/秒"]
+
+    elapsed = report["elapsed"] or 1.0
+    for name, stage in sorted(report["stages"].items(), key=lambda item: -item[1]["seconds"]):
+        label = STAGE_LABELS.get(name, name)
+        lines.append(f"  {label}: {stage['seconds']:.3f} 秒 ({stage['seconds'] / elapsed:.0%})")
+
+    triage = report.get("job_stats", {}).get("triage")
+    if triage:
+        lines.append("  文本分类: " + "，".join(f"{label} {triage[kind]}" for kind, label in TRIAGE_LABELS.items() if triage.get(kind)))
+    
+    summary = report["request_summary"]
+    if summary["count"]:
+        line = (f"  API请求 {summary['count']} 次（失败 {summary['failed']} 次），"
+                f"延迟 平均 {summary['latency_mean']:.2f}s / P50 {summary['latency_p50']:.2f}s / "
+                f"P95 {summary['latency_p95']:.2f}s")
+        if summary["output_tokens_per_sec"]:
+            line += f"，生成速度 {summary['output_tokens_per_sec']:.1f} token/s"
+        lines.append(line)
+        for url, stats in summary.get("endpoints", {}).items():
+            lines.append(f"    {url}: {stats['count']} 次（失败 {stats['failed']} 次），平均延迟 {stats['latency_mean']:.2f}s")
+    return lines
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("用法: python run_report.py <报告文件>...", file=sys.stderr)
+        return 2
+    for path in argv:
+        for line in format_report(load_report(path)):
+            print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
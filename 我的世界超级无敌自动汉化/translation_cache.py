@@ -0,0 +1,204 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+
+def create_cache_from_config(config):
+    """
+    根据配置创建翻译缓存，未启用或创建失败时返回None
+    """
+    if not config.get("use_cache", True):
+        return None
+    try:
+        return TranslationCache(
+            config.get_cache_path(),
+            max_entries=int(config.get("cache_max_entries", 200000))
+        )
+    except Exception as e:
+        print(f"初始化翻译缓存时出错: {str(e)}")
+        return None
+
+class TranslationCache:
+    """
+    持久化翻译记忆缓存
+
+    以 原文 + 模型 + 提示词版本 作为键，将翻译结果保存在SQLite数据库中，
+    跨MOD、跨版本重复出现的文本可以直接复用，无需再次调用翻译API。
+    """
+    def __init__(self, db_path, max_entries=200000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # 确保缓存目录存在
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # 翻译在后台线程中进行，允许跨线程使用同一个连接（由锁保护）
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS translations (
+                    cache_key TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    translation TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_translations_last_used ON translations (last_used)"
+            )
+            self._conn.commit()
+
+    def _make_key(self, text, model, prompt_version):
+        """
+        生成缓存键
+        """
+        raw = f"{model}\x00{prompt_version}\x00{text}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts, model, prompt_version):
+        """
+        批量查询缓存
+
+        Args:
+            texts: 原文列表
+            model: 模型名称，也可以是模型列表（任一模型的译文都可以使用，靠前的模型优先）
+            prompt_version: 提示词版本
+
+        Returns:
+            命中的翻译字典 {原文: 译文}
+        """
+        found = {}
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return found
+
+        models = [model] if isinstance(model, str) else list(model)
+        # 缓存键 -> (原文, 模型的优先顺序)
+        key_to_text = {
+            self._make_key(text, name, prompt_version): (text, rank)
+            for rank, name in enumerate(models)
+            for text in unique_texts
+        }
+        ranks = {}
+        keys = list(key_to_text.keys())
+        now = time.time()
+
+        with self._lock:
+            # SQLite对参数数量有限制，分段查询
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i+500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT cache_key, translation FROM translations WHERE cache_key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for cache_key, translation in rows:
+                    text, rank = key_to_text[cache_key]
+                    if text not in ranks or rank < ranks[text]:
+                        found[text] = translation
+                        ranks[text] = rank
+
+                # 更新最近使用时间，用于淘汰
+                hit_keys = [row[0] for row in rows]
+                if hit_keys:
+                    self._conn.executemany(
+                        "UPDATE translations SET last_used = ? WHERE cache_key = ?",
+                        [(now, cache_key) for cache_key in hit_keys]
+                    )
+            self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(unique_texts) - len(found)
+
+        return found
+
+    def put_many(self, translations, model, prompt_version):
+        """
+        批量写入缓存
+
+        Args:
+            translations: 翻译字典 {原文: 译文}
+            model: 模型名称
+            prompt_version: 提示词版本
+        """
+        if not translations:
+            return
+
+        now = time.time()
+        rows = [
+            (self._make_key(source, model, prompt_version), source, translation, model, prompt_version, now)
+            for source, translation in translations.items()
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations "
+                "(cache_key, source, translation, model, prompt_version, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """
+        超出容量时淘汰最久未使用的条目（调用方需持有锁）
+        """
+        if not self.max_entries or self.max_entries <= 0:
+            return
+
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        # 一次多淘汰一部分，避免每次写入都触发淘汰
+        target = int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM translations WHERE cache_key IN "
+            "(SELECT cache_key FROM translations ORDER BY last_used ASC LIMIT ?)",
+            (count - target,)
+        )
+
+    def get_stats(self):
+        """
+        获取缓存统计信息
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries
+        }
+
+    def reset_stats(self):
+        """
+        重置命中统计
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+        self.reset_stats()
+
+    def close(self):
+        """
+        关闭数据库连接
+        """
+        with self._lock:
+            self._conn.close()
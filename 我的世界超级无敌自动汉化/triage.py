@@ -0,0 +1,71 @@
+import re
+
+from placeholders import PLACEHOLDER_PATTERN
+
+# 文本分类：只有可翻译的文本会发送给模型，其余保留原文
+TRIAGE_CJK = "cjk"
+TRIAGE_NON_LINGUISTIC = "non_linguistic"
+TRIAGE_ACRONYM = "acronym"
+TRIAGE_TRANSLATABLE = "translatable"
+
+TRIAGE_LABELS = {
+    TRIAGE_CJK: "已是中日文",
+    TRIAGE_NON_LINGUISTIC: "非语言文本",
+    TRIAGE_ACRONYM: "缩写",
+    TRIAGE_TRANSLATABLE: "需要翻译"
+}
+
+# 中日文字符：汉字（基本区、扩展A区、兼容汉字、扩展B区及以后）、假名、中日文标点和全角标点
+CJK_PATTERN = re.compile(
+    r'[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+    r'\uff01-\uff0f\uff1a-\uff20\uff3b-\uff40\uff5b-\uff65\U00020000-\U0003134f]'
+)
+
+# 去掉格式标记后仍需要识别的非语言文本（整段匹配）：
+#   不含英文字母的文本（数字、符号、"%s: %s" 这样只有格式的文本）
+#   网址、命名空间ID（minecraft:stone）、点分隔的键名、带扩展名的资源路径、snake_case和camelCase标识符
+#   （没有扩展名、斜杠分隔的 on/off/auto 是界面文本，不当作路径）
+#   带单位的数值（100 mB、20 RF/t、x64）
+NON_LINGUISTIC_PATTERN = re.compile(
+    r'[^A-Za-z]*'
+    r'|\s*(?:https?://|www\.)\S+\s*'
+    r'|[a-z0-9_.\-]+:[a-z0-9_./\-]+'
+    r'|[a-z0-9_\-]+(?:\.[a-z0-9_\-]+){2,}'
+    r'|[a-z0-9_\-]+(?:/[a-z0-9_\-]+)+\.[a-z0-9]+'
+    r'|[a-z0-9]+(?:_[a-z0-9]+)+'
+    r'|[a-z]+(?:[A-Z][a-z0-9]*)+'
+    r'|\s*[+\-~]?\d[\d.,]*\s*(?:mB|B|RF|FE|EU|J|kJ|W|kW|MW|t|s|ms|K|x)(?:/t|/s)?\s*'
+    r'|\s*[x×]\s*\d+\s*'
+)
+
+# 全大写的缩写（RF、JEI、EMC），通常是能量单位或MOD名称，保留原文
+ACRONYM_PATTERN = re.compile(r'\s*[A-Z][A-Z0-9]{1,5}\s*')
+
+# 全大写但需要翻译的常见界面用词
+UI_WORDS = frozenset((
+    "OK", "ON", "OFF", "YES", "NO", "MAX", "MIN", "ALL", "NONE", "AND", "OR", "NEW", "AUTO",
+    "LOW", "HIGH", "TOP", "LEFT", "RIGHT", "UP", "DOWN", "IN", "OUT", "ADD", "SET", "END",
+    "OPEN", "SAVE", "LOAD", "BACK", "NEXT", "DONE", "HELP", "INFO", "ERROR", "RESET",
+    "CLEAR", "EMPTY", "FULL", "START", "STOP", "CLOSE", "EXIT", "MODE", "TIME", "SPEED"
+))
+
+def classify(text):
+    """
+    在发送给模型之前对语言文件中的文本分类
+
+    TRIAGE_CJK: 含有汉字、假名或中日文标点，已经是本地化的文本
+    TRIAGE_NON_LINGUISTIC: 去掉格式标记后是符号、ID、路径、标识符或带单位的数值
+    TRIAGE_ACRONYM: 只有一个全大写的缩写（不识别其他专有名词，人名、地名等仍交给模型）
+    TRIAGE_TRANSLATABLE: 其余需要翻译的文本
+
+    Returns:
+        TRIAGE_CJK、TRIAGE_NON_LINGUISTIC、TRIAGE_ACRONYM或TRIAGE_TRANSLATABLE
+    """
+    if CJK_PATTERN.search(text):
+        return TRIAGE_CJK
+    stripped = PLACEHOLDER_PATTERN.sub(" ", text)
+    if NON_LINGUISTIC_PATTERN.fullmatch(stripped):
+        return TRIAGE_NON_LINGUISTIC
+    if ACRONYM_PATTERN.fullmatch(stripped) and stripped.strip() not in UI_WORDS:
+        return TRIAGE_ACRONYM
+    return TRIAGE_TRANSLATABLE